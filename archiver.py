@@ -0,0 +1,148 @@
+"""
+ディベートログのアーカイブ
+終了したディベートの発言記録と評価をgzip圧縮のJSON Linesとして日別ファイルに保存する。
+書き込みは上限付きキューを介してバックグラウンドで行い、イベントループではディスクI/Oを行わない。
+"""
+
+import asyncio
+import gzip
+import json
+import os
+import re
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterator, List, Optional
+
+
+# 日別ファイル名（例: debates-2026-01-10.jsonl.gz、複数プロセスの場合は debates-2026-01-10.shard0.jsonl.gz）
+ARCHIVE_FILE_PATTERN = re.compile(r'^debates-(\d{4}-\d{2}-\d{2})(?:\.[\w-]+)?\.jsonl\.gz$')
+
+# 保存期間切れファイルの削除間隔（秒）
+SWEEP_INTERVAL = 24 * 60 * 60
+
+# 1回の書き込みでまとめる最大件数
+WRITE_BATCH_SIZE = 100
+
+
+def archive_filename(day: date, suffix: Optional[str] = None) -> str:
+    """日付に対応するアーカイブファイル名（suffixはプロセスごとの識別子）"""
+    if suffix:
+        return f"debates-{day.isoformat()}.{suffix}.jsonl.gz"
+    return f"debates-{day.isoformat()}.jsonl.gz"
+
+
+def iter_archive_files(directory: str) -> List[str]:
+    """ディレクトリ内のアーカイブファイルを日付順に列挙"""
+    if not os.path.isdir(directory):
+        return []
+    return sorted(
+        os.path.join(directory, name)
+        for name in os.listdir(directory)
+        if ARCHIVE_FILE_PATTERN.match(name)
+    )
+
+
+def read_archive(path: str) -> Iterator[Dict]:
+    """アーカイブファイルの記録を1件ずつ読み込む"""
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+class TranscriptArchiver:
+    """
+    ディベートログのアーカイバ
+
+    submit() で受け取った記録を上限付きのasyncio.Queueに積み、
+    ワーカーがまとめてスレッドプールで書き出す。キューが満杯のときは
+    submit() が空きを待つため、メモリ使用量は上限を超えない。
+
+    複数プロセスで同じディレクトリに書き込む場合は、プロセスごとに異なるfile_suffixを
+    指定する（gzipファイルへの同時追記を避けるため）。
+    """
+
+    def __init__(self, directory: str, retention_days: int, queue_size: int = 1000,
+                 file_suffix: Optional[str] = None):
+        self.directory = directory
+        self.retention_days = retention_days
+        self.file_suffix = file_suffix
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self._tasks: List[asyncio.Task] = []
+
+    def start(self):
+        """書き込みワーカーと保存期間切れファイルの削除タスクを開始"""
+        self._tasks.append(asyncio.create_task(self._write_loop()))
+        self._tasks.append(asyncio.create_task(self._sweep_loop()))
+
+    async def close(self):
+        """キューに残った記録を書き出してから停止"""
+        await self._queue.join()
+        for task in self._tasks:
+            task.cancel()
+        self._tasks.clear()
+
+    async def submit(self, record: Dict):
+        """記録をアーカイブ待ちキューに追加"""
+        await self._queue.put(record)
+
+    async def _write_loop(self):
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < WRITE_BATCH_SIZE and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            try:
+                await asyncio.to_thread(self.write_batch, batch)
+            except Exception as e:
+                # JSONにできない値を含む記録などで失敗しても、ワーカーは止めない
+                # （止まるとキューが満杯になり submit() と close() が戻らなくなる）
+                print(f"⚠️ ディベートログ{len(batch)}件の保存に失敗しました: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _sweep_loop(self):
+        while True:
+            try:
+                removed = await asyncio.to_thread(self.sweep)
+                if removed:
+                    print(f"保存期間を過ぎたディベートログを{removed}件削除しました")
+            except OSError as e:
+                print(f"⚠️ ディベートログの削除に失敗しました: {e}")
+            await asyncio.sleep(SWEEP_INTERVAL)
+
+    def write_batch(self, records: List[Dict]):
+        """記録を終了日ごとのファイルに追記（スレッドから呼び出す）"""
+        os.makedirs(self.directory, exist_ok=True)
+
+        by_day: Dict[str, List[str]] = {}
+        for record in records:
+            try:
+                day = datetime.fromisoformat(record['ended_at']).date()
+                line = json.dumps(record, ensure_ascii=False, separators=(',', ':'))
+            except (KeyError, TypeError, ValueError) as e:
+                # 不正な記録だけを除き、同じバッチの他の記録は保存する
+                print(f"⚠️ ディベートログを保存できない記録を除外しました: {e}")
+                continue
+            by_day.setdefault(archive_filename(day, self.file_suffix), []).append(line)
+
+        # gzipは追記するとメンバーが連結されるが、読み込み時は1本のストリームとして扱える
+        for filename, lines in by_day.items():
+            with gzip.open(os.path.join(self.directory, filename), 'at', encoding='utf-8') as f:
+                f.write('\n'.join(lines) + '\n')
+
+    def sweep(self, today: Optional[date] = None) -> int:
+        """保存期間を過ぎたファイルをまとめて削除し、削除件数を返す"""
+        cutoff = (today or date.today()) - timedelta(days=self.retention_days)
+        removed = 0
+        for path in iter_archive_files(self.directory):
+            day = date.fromisoformat(ARCHIVE_FILE_PATTERN.match(os.path.basename(path)).group(1))
+            if day >= cutoff:
+                # ファイルは日付順に並んでいるため、以降はすべて保存期間内
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                # 別プロセスが先に削除した
+                continue
+            removed += 1
+        return removed
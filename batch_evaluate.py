@@ -0,0 +1,326 @@
+"""
+アーカイブ済みディベートの一括評価（オフライン）
+アーカイブの全発言を1発言1行の配列にまとめ、evaluate_debate と同じ素点の積算と正規化を
+NumPyで一括計算する。評価基準（EVALUATION_CRITERIA）の重みを振った比較もできる。
+
+素点（文字数・句点・接続詞・感嘆符）の抽出は文字列メソッドで1発言ずつ行い、
+積算・正規化・重み付けを配列演算で行う。既定の重みでは evaluate_debate と完全に一致する。
+
+使い方:
+    python batch_evaluate.py                                  # LOG_DIRECTORY のアーカイブを評価
+    python batch_evaluate.py --verify                         # evaluate_debate との一致を確認
+    python batch_evaluate.py --sweep clarity=0.5,1,2 --sweep calmness=0,1
+    python batch_evaluate.py --output scores.csv              # 発言者ごとの評価をCSVに出力
+"""
+
+import argparse
+import csv
+import itertools
+import sys
+import time
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # 任意の依存パッケージ
+    np = None
+
+from archiver import iter_archive_files, read_archive
+from config import EVALUATION_CRITERIA, LOG_DIRECTORY
+from scoring import STRUCTURE_WORDS, evaluate_debate
+
+
+# 評価項目（EVALUATION_CRITERIA の順）
+CRITERIA = tuple(EVALUATION_CRITERIA)
+
+# 総評で「互角」とする合計スコアの差（end_debate と同じ）
+EVEN_MARGIN = 3
+
+
+class DebateBatch:
+    """
+    複数ディベートの素点の配列
+
+    発言者は「ディベートごとの初出順」に並べたグループとして扱う
+    （evaluate_debate の正規化は発言者の初出順に依存するため）。
+    """
+
+    def __init__(self):
+        self.records: List[Dict] = []
+        self.entry_counts = array('q')     # ディベートごとの発言数
+        self.group_starts = array('q')     # ディベートごとの先頭グループ
+        self.group_counts = array('q')     # ディベートごとの発言者数
+        self.group_debates = array('q')    # グループ → ディベート
+        self.group_author_ids: List[int] = []
+        self.group_names: List[str] = []
+        # 発言ごとの素点
+        self.message_groups = array('q')
+        self.consistency = array('q')
+        self.clarity = array('q')
+        self.structure = array('q')
+        self.calmness = array('q')
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def add(self, record: Dict):
+        """アーカイブの記録1件（ディベート1回分）を追加"""
+        debate = len(self.records)
+        self.records.append({key: value for key, value in record.items() if key != 'log'})
+        start = len(self.group_author_ids)
+        slots: Dict[int, int] = {}
+
+        for entry in record['log']:
+            author_id = entry['author_id']
+            group = slots.get(author_id)
+            if group is None:
+                group = slots[author_id] = len(self.group_author_ids)
+                self.group_author_ids.append(author_id)
+                self.group_names.append(entry['author_name'])
+                self.group_debates.append(debate)
+
+            content = entry['content']
+            self.message_groups.append(group)
+            self.consistency.append(2 if len(content) > 50 else 0)
+            self.clarity.append(min(content.count('。'), 5))
+            self.structure.append(sum(1 for word in STRUCTURE_WORDS if word in content))
+            # scoring.DebateScorer と同じく '!' を2回数える
+            self.calmness.append(max(10 - (content.count('!') + content.count('!')) * 2, 0))
+
+        self.entry_counts.append(len(record['log']))
+        self.group_starts.append(start)
+        self.group_counts.append(len(slots))
+
+    @classmethod
+    def from_records(cls, records: Iterable[Dict]) -> 'DebateBatch':
+        batch = cls()
+        for record in records:
+            batch.add(record)
+        return batch
+
+
+def _as_int64(values: array) -> 'np.ndarray':
+    return np.asarray(values, dtype=np.int64)
+
+
+class BatchScores:
+    """DebateBatch の評価結果（発言者グループごとの各項目の点数）"""
+
+    def __init__(self, batch: DebateBatch):
+        self.batch = batch
+        group_count = len(batch.group_author_ids)
+        groups = _as_int64(batch.message_groups)
+
+        def totals(values: array):
+            if not values:
+                return np.zeros(group_count)
+            return np.bincount(groups, weights=_as_int64(values), minlength=group_count)
+
+        counts = _as_int64(batch.group_counts)
+        starts = _as_int64(batch.group_starts)
+        entry_counts = _as_int64(batch.entry_counts)
+        debates = _as_int64(batch.group_debates)
+
+        self.scores: Dict[str, np.ndarray] = {
+            'consistency': _normalize_relative(totals(batch.consistency), starts, counts),
+            'clarity': _normalize_relative(totals(batch.clarity), starts, counts),
+            'structure': _normalize_relative(totals(batch.structure), starts, counts),
+        }
+        if group_count:
+            self.scores['calmness'] = np.minimum(10, totals(batch.calmness) / entry_counts[debates] * 2)
+        else:
+            self.scores['calmness'] = np.zeros(0)
+        self.totals = self.weighted_totals({name: 1.0 for name in CRITERIA})
+
+    def weighted_totals(self, weights: Dict[str, float]) -> np.ndarray:
+        """重み付き合計（evaluate_debate と同じ加算順）"""
+        total = None
+        for name in CRITERIA:
+            weight = weights.get(name, 1.0)
+            values = self.scores[name] if weight == 1.0 else self.scores[name] * weight
+            total = values if total is None else total + values
+        return total
+
+    def debate_scores(self, debate: int) -> Dict:
+        """evaluate_debate と同じ形式の評価結果"""
+        batch = self.batch
+        start = batch.group_starts[debate]
+        result = {}
+        for group in range(start, start + batch.group_counts[debate]):
+            result[batch.group_author_ids[group]] = {
+                'name': batch.group_names[group],
+                **{name: float(self.scores[name][group]) for name in CRITERIA},
+                'total': float(self.totals[group]),
+            }
+        return result
+
+    def verdicts(self, totals: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        2名以上のディベートについて、(ディベート番号, 1位のグループ, 1位と2位の差) を返す
+        同点の場合は end_debate と同じく初出順が先の発言者を1位とする
+        """
+        batch = self.batch
+        counts = _as_int64(batch.group_counts)
+        starts = _as_int64(batch.group_starts)
+        debates, leaders, margins = [], [], []
+        for size in np.unique(counts[counts >= 2]):
+            selected = np.nonzero(counts == size)[0]
+            matrix = totals[starts[selected, None] + np.arange(size)]
+            ordered = np.sort(matrix, axis=1)
+            debates.append(selected)
+            leaders.append(starts[selected] + np.argmax(matrix, axis=1))
+            margins.append(ordered[:, -1] - ordered[:, -2])
+        if not debates:
+            empty = np.zeros(0, np.int64)
+            return empty, empty, np.zeros(0)
+        return np.concatenate(debates), np.concatenate(leaders), np.concatenate(margins)
+
+
+def _normalize_relative(values: np.ndarray, starts: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """
+    scoring._normalize_relative をディベートごとに一括適用
+
+    同じ発言者数のディベートをまとめて (ディベート数, 発言者数) の行列にし、
+    発言者の順に「正規化済みの接頭辞の最大値」と「未正規化の接尾辞の最大値」で正規化する。
+    """
+    result = values.astype(float)
+    for size in np.unique(counts):
+        if size == 0:
+            continue
+        selected = np.nonzero(counts == size)[0]
+        index = starts[selected, None] + np.arange(size)
+        matrix = values[index].astype(float)
+        suffix_max = np.maximum.accumulate(matrix[:, ::-1], axis=1)[:, ::-1]
+
+        normalized = np.empty_like(matrix)
+        prefix_max = None
+        for i in range(size):
+            current_max = suffix_max[:, i] if prefix_max is None else np.maximum(prefix_max, suffix_max[:, i])
+            positive = current_max > 0
+            scaled = np.minimum(10, (matrix[:, i] / np.where(positive, current_max, 1)) * 10)
+            normalized[:, i] = np.where(positive, scaled, matrix[:, i])
+            prefix_max = normalized[:, i] if prefix_max is None else np.maximum(prefix_max, normalized[:, i])
+
+        result[index] = normalized
+    return result
+
+
+def load_archives(directory: str) -> DebateBatch:
+    """ディレクトリ内の全アーカイブを読み込む"""
+    batch = DebateBatch()
+    for path in iter_archive_files(directory):
+        for record in read_archive(path):
+            if record.get('log'):
+                batch.add(record)
+    return batch
+
+
+def verify(batch: DebateBatch, scores: BatchScores, directory: str) -> int:
+    """evaluate_debate の結果と比較し、一致しなかったディベート数を返す"""
+    mismatches = 0
+    debate = 0
+    for path in iter_archive_files(directory):
+        for record in read_archive(path):
+            if not record.get('log'):
+                continue
+            if evaluate_debate(record['log']) != scores.debate_scores(debate):
+                mismatches += 1
+                if mismatches <= 5:
+                    print(f"❌ 不一致: channel_id={record.get('channel_id')} ended_at={record.get('ended_at')}")
+            debate += 1
+    return mismatches
+
+
+def parse_sweeps(specs: List[str]) -> List[Dict[str, float]]:
+    """'clarity=0.5,1,2' 形式の指定から重みの組み合わせを作る"""
+    axes = []
+    for spec in specs:
+        name, _, values = spec.partition('=')
+        if name not in CRITERIA or not values:
+            raise SystemExit(f"重みの指定が不正です: {spec}（項目: {', '.join(CRITERIA)}）")
+        axes.append([(name, float(value)) for value in values.split(',')])
+    return [dict(combination) for combination in itertools.product(*axes)]
+
+
+def print_sweep(scores: BatchScores, combinations: List[Dict[str, float]]):
+    """重みの組み合わせごとに、既定の重みとの判定の一致率などを表示"""
+    debates, default_leaders, default_margins = scores.verdicts(scores.totals)
+    if not len(debates):
+        print("2名以上が発言したディベートがありません")
+        return
+    default_even = default_margins < EVEN_MARGIN
+
+    print(f"{'重み':<48} {'1位一致':>8} {'総評一致':>8} {'互角率':>7} {'平均差':>7}")
+    for weights in [{}] + combinations:
+        _, leaders, margins = scores.verdicts(scores.weighted_totals(weights))
+        even = margins < EVEN_MARGIN
+        same_leader = leaders == default_leaders
+        # 総評: 互角同士、または同じ発言者が上回った場合に一致
+        same_verdict = (even & default_even) | (~even & ~default_even & same_leader)
+        label = ', '.join(f"{name}={weights.get(name, 1.0):g}" for name in CRITERIA) if weights else '既定'
+        print(
+            f"{label:<48} {same_leader.mean():>8.1%} {same_verdict.mean():>8.1%} "
+            f"{even.mean():>7.1%} {margins.mean():>7.2f}"
+        )
+
+
+def write_csv(path: str, scores: BatchScores):
+    batch = scores.batch
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['ended_at', 'channel_id', 'author_id', 'name', *CRITERIA, 'total'])
+        for group, author_id in enumerate(batch.group_author_ids):
+            record = batch.records[batch.group_debates[group]]
+            writer.writerow([
+                record.get('ended_at'), record.get('channel_id'), author_id, batch.group_names[group],
+                *(f"{scores.scores[name][group]:.4f}" for name in CRITERIA),
+                f"{scores.totals[group]:.4f}",
+            ])
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description='アーカイブ済みディベートの一括評価')
+    parser.add_argument('--directory', default=LOG_DIRECTORY, help='アーカイブのディレクトリ')
+    parser.add_argument('--verify', action='store_true', help='evaluate_debate との一致を確認')
+    parser.add_argument('--sweep', action='append', default=[], metavar='項目=重み,...',
+                        help='重みを振る評価項目（複数指定で全組み合わせ）')
+    parser.add_argument('--output', help='発言者ごとの評価を書き出すCSVのパス')
+    args = parser.parse_args(argv)
+
+    if np is None:
+        print("❌ このツールには numpy が必要です: pip install numpy")
+        sys.exit(1)
+
+    combinations = parse_sweeps(args.sweep)
+
+    started = time.perf_counter()
+    batch = load_archives(args.directory)
+    loaded = time.perf_counter()
+    scores = BatchScores(batch)
+    scored = time.perf_counter()
+    print(
+        f"ディベート {len(batch)}件・発言 {len(batch.message_groups)}件を読み込みました"
+        f"（読み込み {loaded - started:.2f}秒 / 評価 {(scored - loaded) * 1000:.1f}ms）"
+    )
+
+    if args.verify:
+        started = time.perf_counter()
+        mismatches = verify(batch, scores, args.directory)
+        print(
+            f"evaluate_debate との比較: 不一致 {mismatches}件"
+            f"（evaluate_debate の再計算を含む {time.perf_counter() - started:.2f}秒）"
+        )
+        if mismatches:
+            sys.exit(1)
+
+    if combinations:
+        print_sweep(scores, combinations)
+
+    if args.output:
+        write_csv(args.output, scores)
+        print(f"評価を書き出しました: {args.output}")
+
+
+if __name__ == '__main__':
+    main()
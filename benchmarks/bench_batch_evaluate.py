@@ -0,0 +1,86 @@
+"""
+一括評価のベンチマーク
+合成したアーカイブ（既定: 5,000件）を一時ディレクトリに書き出し、evaluate_debate を1件ずつ
+呼び出す場合と batch_evaluate の一括評価・重みの全組み合わせ評価を比較する。結果の一致も確認する。
+
+使い方:
+    python benchmarks/bench_batch_evaluate.py [ディベート数]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import corpus  # noqa: E402
+from archiver import TranscriptArchiver, iter_archive_files, read_archive  # noqa: E402
+from batch_evaluate import BatchScores, DebateBatch, load_archives, parse_sweeps  # noqa: E402
+from scoring import evaluate_debate  # noqa: E402
+
+
+def write_archives(directory: str, count: int, seed: int = 0):
+    rng = random.Random(seed)
+    archiver = TranscriptArchiver(directory, retention_days=3650)
+    started = datetime(2026, 1, 1)
+    records = []
+    for i in range(count):
+        # 一部は発言者1名のみ（途中で強制終了）や3名以上の記録にする
+        roll = rng.random()
+        debater_ids = (1001, 1002) if roll < 0.9 else ((1001,) if roll < 0.95 else (1001, 1002, 1003))
+        log = corpus.debate_log(rng, message_limit=rng.randint(1, 10), debater_ids=debater_ids)
+        records.append({
+            'channel_id': i,
+            'topic': corpus.topic(rng),
+            'ended_at': (started + timedelta(minutes=i * 7)).isoformat(),
+            'end_reason': 'completed',
+            'log': log,
+        })
+    archiver.write_batch(records)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    directory = tempfile.mkdtemp(prefix='debate-archive-')
+    write_archives(directory, count)
+    records = [record for path in iter_archive_files(directory) for record in read_archive(path)]
+    messages = sum(len(record['log']) for record in records)
+    print(f"ディベート: {len(records)}件  発言: {messages}件")
+
+    started = time.perf_counter()
+    expected = [evaluate_debate(record['log']) for record in records]
+    reference = time.perf_counter() - started
+    print(f"evaluate_debate（1件ずつ）:   {reference * 1000:8.1f}ms")
+
+    started = time.perf_counter()
+    batch = DebateBatch.from_records(records)
+    extracted = time.perf_counter() - started
+    started = time.perf_counter()
+    scores = BatchScores(batch)
+    scored = time.perf_counter() - started
+    print(f"一括評価: 素点の抽出        {extracted * 1000:8.1f}ms")
+    print(f"一括評価: 積算・正規化      {scored * 1000:8.1f}ms")
+
+    mismatches = sum(1 for i, result in enumerate(expected) if scores.debate_scores(i) != result)
+    print(f"evaluate_debate との不一致: {mismatches}件")
+
+    combinations = parse_sweeps(['consistency=0.5,1,2', 'clarity=0.5,1,2', 'structure=0.5,1,2', 'calmness=0,0.5,1'])
+    started = time.perf_counter()
+    for weights in combinations:
+        scores.verdicts(scores.weighted_totals(weights))
+    sweep = time.perf_counter() - started
+    print(
+        f"重みの全組み合わせ {len(combinations)}通り: {sweep * 1000:8.1f}ms"
+        f"（evaluate_debate で再計算する場合の目安 {reference * len(combinations):.1f}秒）"
+    )
+
+    started = time.perf_counter()
+    load_archives(directory)
+    print(f"アーカイブの読み込み＋素点の抽出: {(time.perf_counter() - started) * 1000:8.1f}ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""
+設定の再読み込みのベンチマーク
+禁止ワードを大量に含む設定ファイル（既定: 20,000件）を書き出し、発言のチェックを続けながら
+再読み込みを繰り返す。再読み込みにかかる時間と、その間のイベントループの遅延を、
+設定の構築をイベントループ上で直接行った場合と比較する。
+
+使い方:
+    python benchmarks/bench_config_reload.py [禁止ワード数] [再読み込み回数]
+"""
+
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import corpus  # noqa: E402
+from live_config import ConfigWatcher, build_runtime_config, load_overrides  # noqa: E402
+from load_harness import percentile  # noqa: E402
+
+# 発言チェックの間隔（秒）
+TICK = 0.001
+
+
+class Target:
+    def __init__(self, runtime):
+        self.runtime = runtime
+        self.checked = 0
+
+    def apply(self, runtime):
+        self.runtime = runtime
+
+
+async def check_messages(target: Target, messages, lags, stop: asyncio.Event):
+    """一定間隔で発言をチェックし、予定時刻からの遅れを記録"""
+    loop = asyncio.get_running_loop()
+    i = 0
+    while not stop.is_set():
+        expected = loop.time() + TICK
+        await asyncio.sleep(TICK)
+        lags.append(loop.time() - expected)
+        target.runtime.moderation_engine.find(messages[i % len(messages)])
+        target.checked += 1
+        i += 1
+
+
+async def measure(path: str, reloads: int, inline: bool, messages):
+    watcher = ConfigWatcher(path, interval=3600, on_reload=lambda runtime: None)
+    target = Target(watcher.load_initial())
+    watcher.on_reload = target.apply
+    lags = []
+    stop = asyncio.Event()
+    checker = asyncio.create_task(check_messages(target, messages, lags, stop))
+    await asyncio.sleep(0.1)
+
+    latencies = []
+    for version in range(1, reloads + 1):
+        started = time.perf_counter()
+        if inline:
+            target.apply(build_runtime_config(load_overrides(path), version))
+        else:
+            await watcher.reload()
+        latencies.append(time.perf_counter() - started)
+        await asyncio.sleep(0.05)
+
+    stop.set()
+    await checker
+    return latencies, lags, target.checked
+
+
+def main():
+    word_count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    reloads = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    rng = random.Random(0)
+    words = [''.join(rng.choice('アイウエオカキクケコサシスセソタチツテト') for _ in range(rng.randint(3, 6)))
+             for _ in range(word_count)]
+    path = os.path.join(tempfile.mkdtemp(prefix='debate-config-'), 'live_config.json')
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'prohibited_words': words}, f, ensure_ascii=False)
+    messages = corpus.messages(200, seed=1)
+
+    print(f"禁止ワード: {word_count}件  再読み込み: {reloads}回")
+    print(f"{'構築':<14} {'再読み込み p50':>14} {'max':>9} {'ループ遅延 p99':>14} {'max':>9} {'チェック数':>9}")
+    for label, inline in (('ループ上で直接', True), ('スレッド', False)):
+        latencies, lags, checked = asyncio.run(measure(path, reloads, inline, messages))
+        print(
+            f"{label:<14} {percentile(latencies, 0.5) * 1e3:>12.1f}ms {max(latencies) * 1e3:>7.1f}ms "
+            f"{percentile(lags, 0.99) * 1e3:>12.2f}ms {max(lags) * 1e3:>7.2f}ms {checked:>9}"
+        )
+
+
+if __name__ == '__main__':
+    main()
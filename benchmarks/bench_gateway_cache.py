@@ -0,0 +1,95 @@
+"""
+ゲートウェイモードのベンチマーク
+通常モードと軽量モード（LEAN_GATEWAY_MODE）で、サーバー参加時（GUILD_CREATE）の
+メンバーキャッシュ構築にかかる時間とメモリを比較する
+
+通常モードでは起動時のチャンキングで全メンバーが届くため、ここでは全メンバーを
+含むGUILD_CREATEで近似する。実環境での起動時間と常駐メモリは on_ready のログで確認できる。
+
+使い方:
+    python benchmarks/bench_gateway_cache.py [メンバー数]
+"""
+
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import discord  # noqa: E402
+
+from bot import build_gateway_options  # noqa: E402
+
+GUILD_ID = 10 ** 17
+
+
+def guild_payload(member_count: int) -> dict:
+    """メンバー数member_countのサーバーのGUILD_CREATEペイロード"""
+    return {
+        'id': str(GUILD_ID),
+        'name': 'ベンチマーク',
+        'owner_id': str(GUILD_ID + 1),
+        'member_count': member_count,
+        'features': [],
+        'emojis': [],
+        'stickers': [],
+        'roles': [{
+            'id': str(GUILD_ID), 'name': '@everyone', 'permissions': '0', 'position': 0,
+            'color': 0, 'hoist': False, 'managed': False, 'mentionable': False,
+        }],
+        'channels': [],
+        'threads': [],
+        'voice_states': [],
+        'presences': [],
+        'members': [
+            {
+                'user': {
+                    'id': str(GUILD_ID + i + 1), 'username': f'user{i}', 'discriminator': '0',
+                    'avatar': None, 'global_name': f'参加者{i}',
+                },
+                'roles': [],
+                'joined_at': '2024-01-01T00:00:00+00:00',
+                'deaf': False,
+                'mute': False,
+                'flags': 0,
+            }
+            for i in range(member_count)
+        ],
+    }
+
+
+def bench(lean: bool, member_count: int):
+    # 時間はtracemallocの影響を受けないよう別のクライアントで計測
+    client = discord.Client(**build_gateway_options(lean))
+    payload = guild_payload(member_count)
+    started = time.perf_counter()
+    client._connection._add_guild_from_data(payload)
+    elapsed = time.perf_counter() - started
+
+    client = discord.Client(**build_gateway_options(lean))
+    payload = guild_payload(member_count)
+    gc.collect()
+    tracemalloc.start()
+    guild = client._connection._add_guild_from_data(payload)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    name = "軽量" if lean else "通常"
+    print(
+        f"{name}モード: キャッシュ済みメンバー {len(guild.members):>6}  "
+        f"構築 {elapsed * 1000:8.1f}ms  保持メモリ {current / 1024 / 1024:7.2f}MB  "
+        f"({current / max(member_count, 1):.0f}B/メンバー)"
+    )
+
+
+def main():
+    member_count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    print(f"メンバー数: {member_count}")
+    bench(False, member_count)
+    bench(True, member_count)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""
+参加登録の集中時のベンチマーク
+1つの募集に多数の参加ボタンのクリック（既定: 2,000件、うち1割は重複）を一定の間隔で流し込み、
+クリックごとの処理時間と、募集メッセージの編集・送信のAPI呼び出し回数を計測する。
+
+使い方:
+    python benchmarks/bench_join_burst.py [クリック数] [1秒あたりのクリック数]
+"""
+
+import asyncio
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import bot as debate_bot  # noqa: E402
+from load_harness import ADMIN_ID, FakeChannel, FakeInteraction, FakeMember, percentile  # noqa: E402
+
+
+async def run(clicks: int, rate: float):
+    bot = debate_bot.bot
+    channel = FakeChannel(1, latency=0.0)
+    interaction = FakeInteraction(FakeMember(ADMIN_ID, administrator=True), channel)
+    await debate_bot.create_debate.callback(interaction, 3, 5, 500)
+    view = interaction.view
+    session = bot.active_sessions[channel.id]
+
+    rng = random.Random(0)
+    user_ids = [10 ** 6 + i for i in range(int(clicks * 0.9))]
+    user_ids += rng.sample(user_ids, clicks - len(user_ids))
+    rng.shuffle(user_ids)
+
+    latencies = []
+    started = time.perf_counter()
+    for i, user_id in enumerate(user_ids):
+        delay = started + i / rate - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        click = FakeInteraction(FakeMember(user_id), channel)
+        t = time.perf_counter()
+        await view.join_button.callback(click)
+        latencies.append(time.perf_counter() - t)
+    elapsed = time.perf_counter() - started
+
+    await debate_bot.close_recruitment(session)
+    await asyncio.sleep(0)
+    await bot.outbound.drain()
+    debate_bot.remove_session(channel.id)
+
+    print(f"クリック: {clicks}件（{clicks / elapsed:,.0f}件/秒）  参加者: {len(session.participants)}名")
+    print(
+        f"処理時間: p50 {percentile(latencies, 0.5) * 1e6:.0f}µs  p99 {percentile(latencies, 0.99) * 1e6:.0f}µs  "
+        f"max {max(latencies) * 1e6:.0f}µs"
+    )
+    print(f"チャンネルへのAPI呼び出し: {bot.outbound.api_calls}（要求 {bot.outbound.requested}）")
+
+
+def main():
+    clicks = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    rate = float(sys.argv[2]) if len(sys.argv) > 2 else 500.0
+    asyncio.run(run(clicks, rate))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""
+メトリクス記録のオーバーヘッド
+ヒストグラム・カウンターの記録1回あたりの時間と、on_messageでの計測全体
+（時刻取得2回＋ヒストグラム記録）のコストを計測する。出力とHTTPエンドポイントの応答時間も確認する。
+
+使い方:
+    python benchmarks/bench_metrics.py
+"""
+
+import asyncio
+import os
+import sys
+import time
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from metrics import MetricsServer, Registry  # noqa: E402
+
+NUMBER = 1_000_000
+
+
+def per_op(statement, number: int = NUMBER) -> float:
+    """1回あたりの時間（ns、5回の最良値）"""
+    return min(timeit.repeat(statement, number=number, repeat=5)) / number * 1e9
+
+
+def main():
+    registry = Registry()
+    histogram = registry.histogram('bench_seconds', 'ベンチマーク')
+    counter = registry.counter('bench_total', 'ベンチマーク')
+    labeled = registry.counter('bench_labeled_total', 'ベンチマーク', ['kind'])
+    for i in range(10):
+        labeled.labels(f'kind{i}').inc()
+    perf_counter = time.perf_counter
+
+    def instrumented():
+        started = perf_counter()
+        histogram.observe(perf_counter() - started)
+
+    baseline = per_op(lambda: None)
+    results = [
+        ('Histogram.observe', per_op(lambda: histogram.observe(0.0003))),
+        ('Counter.inc', per_op(lambda: counter.inc())),
+        ('labels(kind).inc', per_op(lambda: labeled.labels('kind3').inc())),
+        ('時刻取得2回＋observe', per_op(instrumented)),
+    ]
+    print(f"空の呼び出し: {baseline:.0f}ns（以下はこれを差し引いた値）")
+    for name, value in results:
+        print(f"{name:<24} {value - baseline:>7.0f}ns")
+
+    for _ in range(100000):
+        histogram.observe(0.0003)
+    render = per_op(registry.render, number=1000)
+    print(f"{'render()':<24} {render / 1000:>7.1f}µs")
+
+    asyncio.run(bench_endpoint(registry))
+
+
+async def bench_endpoint(registry: Registry):
+    server = MetricsServer(registry, '127.0.0.1', 0)
+    await server.start()
+    port = server._server.sockets[0].getsockname()[1]
+
+    started = time.perf_counter()
+    for _ in range(100):
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        writer.write(b'GET /metrics HTTP/1.1\r\nHost: localhost\r\n\r\n')
+        await writer.drain()
+        response = await reader.read()
+        writer.close()
+    elapsed = (time.perf_counter() - started) / 100
+
+    status = response.split(b'\r\n', 1)[0].decode()
+    print(f"{'GET /metrics':<24} {elapsed * 1e3:>7.2f}ms（{status}、{len(response)}バイト）")
+    await server.close()
+
+
+if __name__ == '__main__':
+    main()
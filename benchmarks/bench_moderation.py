@@ -0,0 +1,107 @@
+"""
+禁止コンテンツチェックのベンチマーク
+従来の逐次チェックとModerationEngineを禁止ワード数10〜10,000で比較する
+
+使い方:
+    python benchmarks/bench_moderation.py
+"""
+
+import os
+import random
+import re
+import sys
+import timeit
+from typing import List, Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from config import PROHIBITED_WORDS, ATTACK_PATTERNS  # noqa: E402
+from moderation import ModerationEngine  # noqa: E402
+
+
+KANA = 'あいうえおかきくけこさしすせそたちつてとなにぬねのはひふへほまみむめもやゆよらりるれろわをん'
+SENTENCES = [
+    '電子書籍は持ち運びが容易であり、学習の継続性を高めます。',
+    'しかし、紙の本は記憶の定着に優れているという研究もあります。',
+    'なぜなら、ページをめくる身体的な動作が記憶の手がかりになるからです。',
+    'したがって、目的に応じて使い分けることが合理的だと考えます。',
+    'また、コストの観点からも比較する必要があるでしょう。',
+    'つまり、どちらか一方が常に優れているわけではありません。',
+]
+
+SIZES = [10, 100, 1000, 10000]
+
+
+def legacy_check_prohibited_content(text: str, words: List[str]) -> tuple[bool, Optional[str]]:
+    """従来のcheck_prohibited_content（比較用）"""
+    for word in words:
+        if word in text.lower():
+            return False, f"禁止ワード「{word}」が含まれています"
+
+    for pattern in ATTACK_PATTERNS:
+        if re.search(pattern, text):
+            return False, "人格攻撃的な表現が含まれています"
+
+    return True, None
+
+
+def build_wordlist(size: int, rng: random.Random) -> List[str]:
+    """既定の禁止ワードに合成語を足して指定件数の禁止ワードリストを作成"""
+    words = list(PROHIBITED_WORDS)[:size]
+    seen = set(words)
+    while len(words) < size:
+        word = ''.join(rng.choice(KANA) for _ in range(rng.randint(3, 6)))
+        if word not in seen:
+            seen.add(word)
+            words.append(word)
+    return words
+
+
+def build_messages(count: int, rng: random.Random) -> List[str]:
+    """ディベート発言を模した合成メッセージ（一部に禁止ワードを含む）"""
+    messages = []
+    for i in range(count):
+        text = ''.join(rng.choice(SENTENCES) for _ in range(rng.randint(2, 8)))
+        if i % 10 == 0:
+            text += rng.choice(PROHIBITED_WORDS)
+        elif i % 10 == 1:
+            text = 'お前は' + text
+        messages.append(text)
+    return messages
+
+
+def main():
+    rng = random.Random(42)
+    messages = build_messages(200, rng)
+    print(f"メッセージ数: {len(messages)}  平均文字数: {sum(map(len, messages)) / len(messages):.0f}")
+    print(f"{'words':>7} {'legacy µs/msg':>14} {'engine µs/msg':>14} {'speedup':>8} {'build ms':>9}")
+
+    for size in SIZES:
+        words = build_wordlist(size, rng)
+
+        build_time = timeit.timeit(lambda: ModerationEngine(words, ATTACK_PATTERNS), number=1)
+        engine = ModerationEngine(words, ATTACK_PATTERNS)
+
+        # 従来の関数が検出するものはすべて検出することを確認
+        for text in messages:
+            if not legacy_check_prohibited_content(text, words)[0]:
+                assert not engine.check(text)[0], text
+
+        repeat = max(1, 2000 // size)
+        legacy = min(timeit.repeat(
+            lambda: [legacy_check_prohibited_content(t, words) for t in messages],
+            number=repeat, repeat=3
+        )) / (repeat * len(messages))
+        current = min(timeit.repeat(
+            lambda: [engine.check(t) for t in messages],
+            number=repeat, repeat=3
+        )) / (repeat * len(messages))
+
+        print(
+            f"{size:>7} {legacy * 1e6:>14.2f} {current * 1e6:>14.2f} "
+            f"{legacy / current:>7.1f}x {build_time * 1e3:>9.1f}"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,152 @@
+"""
+送信パイプラインのベンチマーク
+ローカルの擬似HTTP層（チャンネル別レート制限と429応答を再現）に対して、
+通知ごとに直接送信する従来方式とOutboundDispatcherのAPI呼び出し数・429発生数を比較する
+
+使い方:
+    python benchmarks/bench_outbound.py
+"""
+
+import asyncio
+import os
+import random
+import sys
+import time
+from collections import deque
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from outbound import OutboundDispatcher, PRIORITY_MODERATION  # noqa: E402
+
+
+# 実時間を短縮するため、Discordの制限（送信5回/5秒・削除5回/1秒）を1/10に縮めて再現する
+SEND_LIMIT, SEND_PERIOD = 5, 0.5
+DELETE_LIMIT, DELETE_PERIOD = 5, 0.1
+LATENCY = 0.002
+
+EVENTS = 200           # 受理された発言の数
+EVENT_INTERVAL = 0.01  # 発言の到着間隔（秒）
+
+
+class RateLimited(Exception):
+    def __init__(self, retry_after: float):
+        self.retry_after = retry_after
+
+
+class FakeHTTP:
+    """ルートごとに固定ウィンドウのレート制限を持つ擬似HTTP層"""
+
+    def __init__(self):
+        self.calls = 0
+        self.rate_limited = 0
+        self._windows = {}
+
+    async def request(self, route: tuple, limit: int, period: float):
+        self.calls += 1
+        now = time.monotonic()
+        window = self._windows.setdefault(route, deque())
+        while window and window[0] <= now - period:
+            window.popleft()
+        if len(window) >= limit:
+            self.rate_limited += 1
+            raise RateLimited(window[0] + period - now)
+        window.append(now)
+        await asyncio.sleep(LATENCY)
+
+    async def request_with_retry(self, route: tuple, limit: int, period: float):
+        """429を受けたらretry_after待って再送する（discord.pyの挙動）"""
+        while True:
+            try:
+                await self.request(route, limit, period)
+                return
+            except RateLimited as e:
+                await asyncio.sleep(e.retry_after)
+
+
+class FakeChannel:
+    def __init__(self, http: FakeHTTP, channel_id: int):
+        self.http = http
+        self.id = channel_id
+
+    async def send(self, content=None, embeds=None):
+        await self.http.request_with_retry(('send', self.id), SEND_LIMIT, SEND_PERIOD)
+
+
+class FakeMessage:
+    def __init__(self, channel: FakeChannel):
+        self.channel = channel
+
+    async def delete(self):
+        await self.channel.http.request_with_retry(('delete', self.channel.id), DELETE_LIMIT, DELETE_PERIOD)
+
+
+def generate_events(seed: int = 1):
+    """1発言ごとに発生する通知の組み合わせ（制限到達通知・次の発言者通知・違反警告＋削除）"""
+    rng = random.Random(seed)
+    events = []
+    for i in range(EVENTS):
+        if i % 7 == 0:
+            events.append(('violation',))
+        elif rng.random() < 0.3:
+            events.append(('limit', 'next'))
+        else:
+            events.append(('next',))
+    return events
+
+
+async def run_direct(events):
+    """従来方式: on_message内で通知ごとにawait channel.send()"""
+    http = FakeHTTP()
+    channel = FakeChannel(http, 1)
+
+    async def handle(event):
+        if event == ('violation',):
+            await channel.send("⚠️ 警告")
+            await FakeMessage(channel).delete()
+            return
+        for notice in event:
+            await channel.send(notice)
+
+    started = time.monotonic()
+    tasks = []
+    for event in events:
+        tasks.append(asyncio.create_task(handle(event)))
+        await asyncio.sleep(EVENT_INTERVAL)
+    await asyncio.gather(*tasks)
+    return http, time.monotonic() - started
+
+
+async def run_dispatcher(events):
+    """OutboundDispatcher経由"""
+    http = FakeHTTP()
+    channel = FakeChannel(http, 1)
+    dispatcher = OutboundDispatcher(
+        channel_limit=SEND_LIMIT, channel_period=SEND_PERIOD,
+        delete_limit=DELETE_LIMIT, delete_period=DELETE_PERIOD
+    )
+
+    started = time.monotonic()
+    for event in events:
+        if event == ('violation',):
+            dispatcher.post(channel, "⚠️ 警告", priority=PRIORITY_MODERATION)
+            dispatcher.delete(FakeMessage(channel))
+        else:
+            for notice in event:
+                dispatcher.post(channel, notice)
+        await asyncio.sleep(EVENT_INTERVAL)
+    await dispatcher.drain()
+    return http, time.monotonic() - started
+
+
+async def main():
+    events = generate_events()
+    notices = sum(2 if event == ('violation',) else len(event) for event in events)
+    print(f"発言数: {len(events)}  通知・削除の要求数: {notices}")
+    print(f"{'方式':<12} {'API呼び出し':>10} {'429':>6} {'所要時間':>9}")
+    for name, runner in (('直接送信', run_direct), ('Dispatcher', run_dispatcher)):
+        http, elapsed = await runner(events)
+        print(f"{name:<12} {http.calls:>10} {http.rate_limited:>6} {elapsed:>8.2f}s")
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
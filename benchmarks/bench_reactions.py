@@ -0,0 +1,116 @@
+"""
+観客のリアクション集計のベンチマーク
+多数のチャンネル（既定: 50）で進行中のディベートに、1チャンネルあたり毎分数千件（既定: 3,000件、
+うち1割は取り消し）のリアクションを一定時間流し込み、リアクションごとの処理時間と、
+スコアボードの送信・編集のAPI呼び出し回数、イベントループの遅延を計測する。
+
+使い方:
+    python benchmarks/bench_reactions.py [チャンネル数] [1チャンネルあたり毎分のリアクション数] [秒数]
+"""
+
+import asyncio
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import bot as debate_bot  # noqa: E402
+from bot import DebateSession, MemberRef  # noqa: E402
+from load_harness import GUILD_ID, FakeChannel, Monitor, percentile  # noqa: E402
+
+EMOJIS = ('👍', '👏', '🔥', '💡', '🤔', '<:debate:123456789012345678>')
+
+# 1チャンネルあたりのディベーターの発言（応援の対象）
+MESSAGES_PER_SESSION = 6
+
+
+class FakeReactionPayload:
+    def __init__(self, channel_id: int, message_id: int, user_id: int, emoji: str):
+        self.channel_id = channel_id
+        self.message_id = message_id
+        self.user_id = user_id
+        self.emoji = emoji
+
+
+def make_sessions(count: int):
+    debaters = [MemberRef(1001, 'ディベーターA'), MemberRef(1002, 'ディベーターB')]
+    sessions = []
+    for channel_id in range(1, count + 1):
+        session = DebateSession(FakeChannel(channel_id, latency=0.002), 3, 5, 500, guild_id=GUILD_ID)
+        session.set_debaters(debaters)
+        session.is_active = True
+        session.is_recruiting = False
+        for i in range(MESSAGES_PER_SESSION):
+            session.reactions.track(channel_id * 100 + i, debaters[i % 2].id)
+        sessions.append(session)
+    return sessions
+
+
+async def run(channels: int, per_minute: int, duration: float):
+    bot = debate_bot.bot
+    sessions = make_sessions(channels)
+    for session in sessions:
+        bot.active_sessions[session.channel.id] = session
+
+    rng = random.Random(0)
+    rate = channels * per_minute / 60
+    total = int(rate * duration)
+    latencies = []
+    monitor = Monitor(interval=0.01)
+    monitor.start()
+    started = time.perf_counter()
+    for i in range(total):
+        delay = started + i / rate - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        session = sessions[i % channels]
+        channel_id = session.channel.id
+        payload = FakeReactionPayload(
+            channel_id,
+            channel_id * 100 + rng.randrange(MESSAGES_PER_SESSION + 1),  # 一部はBotのメッセージへのリアクション（集計しない）
+            10 ** 6 + rng.randrange(500),
+            rng.choice(EMOJIS)
+        )
+        handler = debate_bot.on_raw_reaction_remove if rng.random() < 0.1 else debate_bot.on_raw_reaction_add
+        t = time.perf_counter()
+        await handler(payload)
+        latencies.append(time.perf_counter() - t)
+    elapsed = time.perf_counter() - started
+
+    # 予約済みのスコアボード更新を反映
+    await asyncio.sleep(debate_bot.SCOREBOARD_UPDATE_INTERVAL + 0.1)
+    await monitor.stop()
+    await bot.outbound.drain()
+
+    counted = sum(session.reactions.total for session in sessions)
+    sent = sum(session.channel.sent for session in sessions)
+    edited = sum(session.channel.edited for session in sessions)
+    print(
+        f"チャンネル: {channels}  リアクション: {total}件（{total / elapsed:,.0f}件/秒、"
+        f"1チャンネルあたり毎分{per_minute}件）  集計後の合計: {counted}件"
+    )
+    print(
+        f"処理時間: p50 {percentile(latencies, 0.5) * 1e6:.1f}µs  p99 {percentile(latencies, 0.99) * 1e6:.1f}µs  "
+        f"max {max(latencies) * 1e6:.0f}µs"
+    )
+    print(
+        f"スコアボードのAPI呼び出し: 送信 {sent}  編集 {edited}  "
+        f"（リアクション1,000件あたり {(sent + edited) / total * 1000:.1f}回）"
+    )
+    print(
+        f"イベントループ遅延: p50 {percentile(monitor.lags, 0.5) * 1e3:.2f}ms  "
+        f"p99 {percentile(monitor.lags, 0.99) * 1e3:.2f}ms  max {max(monitor.lags, default=0) * 1e3:.2f}ms"
+    )
+
+
+def main():
+    channels = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    per_minute = int(sys.argv[2]) if len(sys.argv) > 2 else 3000
+    duration = float(sys.argv[3]) if len(sys.argv) > 3 else 20.0
+    asyncio.run(run(channels, per_minute, duration))
+
+
+if __name__ == '__main__':
+    main()
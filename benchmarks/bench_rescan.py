@@ -0,0 +1,74 @@
+"""
+モデレーション再検査のベンチマーク
+合成したアーカイブ（既定: 20,000件）を一時ディレクトリに書き出し、1プロセスで順に
+find_all する場合と rescan_archives のワーカー数ごとの処理速度を比較する。集計の一致も確認する。
+
+使い方:
+    python benchmarks/bench_rescan.py [ディベート数]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from bench_batch_evaluate import write_archives  # noqa: E402
+from config import ATTACK_PATTERNS, PROHIBITED_WORDS  # noqa: E402
+from moderation import ModerationEngine  # noqa: E402
+from rescan_archives import iter_chunks, rescan  # noqa: E402
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# 追加を検討しているルールの例（合成コーパスの発言に一致する）
+CANDIDATE_WORDS = ['見落とし', 'ストリーミング']
+CANDIDATE_PATTERNS = [r'相手側の.{0,4}主張']
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    directory = tempfile.mkdtemp(prefix='debate-archive-')
+    write_archives(directory, count)
+    words = list(PROHIBITED_WORDS) + CANDIDATE_WORDS
+    patterns = list(ATTACK_PATTERNS) + CANDIDATE_PATTERNS
+
+    # 基準: 1プロセスで全発言を順に検査
+    engine = ModerationEngine(words, patterns)
+    debates = messages = 0
+    sequential = {}
+    started = time.perf_counter()
+    for chunk in iter_chunks(directory, 2000):
+        debates += len(chunk)
+        for _, contents in chunk:
+            messages += len(contents)
+            for content in contents:
+                for hit in engine.find_all(content):
+                    key = (hit.kind, hit.index)
+                    sequential[key] = sequential.get(key, 0) + 1
+    reference = time.perf_counter() - started
+    print(f"ディベート: {debates}件  発言: {messages}件")
+    print(f"1プロセスで順に検査:   {reference:6.2f}秒  {messages / reference:10,.0f}発言/秒")
+
+    workers = 1
+    while workers <= (os.cpu_count() or 1):
+        started = time.perf_counter()
+        report = rescan(directory, words, patterns, workers=workers)
+        elapsed = time.perf_counter() - started
+        same = {key: stats[0] for key, stats in report.hits.items()} == sequential
+        print(
+            f"ワーカー {workers:>2}:           {elapsed:6.2f}秒  {report.messages / elapsed:10,.0f}発言/秒"
+            f"  （{reference / elapsed:.2f}倍、集計{'一致' if same else '不一致'}）"
+        )
+        workers *= 2
+
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        print(f"親プロセスの最大RSS: {peak:.1f}MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""
+締切スケジューラのベンチマーク
+10,000件の募集締切を保留した状態で、登録・延長・取り消し・発火のコストと
+締切ごとにasyncio.sleepで待機するタスクを並べた場合のメモリを比較する
+
+使い方:
+    python benchmarks/bench_scheduler.py [締切数]
+"""
+
+import asyncio
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from scheduler import DeadlineScheduler  # noqa: E402
+
+
+async def noop():
+    pass
+
+
+def per_op(elapsed: float, count: int) -> str:
+    return f"{elapsed / count * 1e6:.2f}µs/op"
+
+
+async def bench_scheduler(count: int):
+    scheduler = DeadlineScheduler()
+    base = time.time() + 3600
+
+    started = time.perf_counter()
+    for i in range(count):
+        scheduler.schedule(('recruit', i), base + i, noop)
+    print(f"登録:         {per_op(time.perf_counter() - started, count)}")
+
+    started = time.perf_counter()
+    for i in range(count):
+        scheduler.extend(('recruit', i), 60)
+    print(f"延長:         {per_op(time.perf_counter() - started, count)}")
+
+    started = time.perf_counter()
+    for i in range(0, count, 2):
+        scheduler.cancel(('recruit', i))
+    print(f"取り消し:     {per_op(time.perf_counter() - started, count // 2)}")
+
+    # 残りの締切をすべて過去に移して発火させる
+    remaining = len(scheduler)
+    now = time.time()
+    started = time.perf_counter()
+    for i in range(1, count, 2):
+        scheduler.reschedule(('recruit', i), now)
+    while len(scheduler):
+        await asyncio.sleep(0)
+    await asyncio.sleep(0)
+    print(f"変更＋発火:   {per_op(time.perf_counter() - started, remaining)}")
+
+
+async def measure_memory(count: int):
+    """締切を保留したときのメモリ（スケジューラ vs 締切ごとのsleepタスク）"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    scheduler = DeadlineScheduler()
+    base = time.time() + 3600
+    for i in range(count):
+        scheduler.schedule(('recruit', i), base + i, noop)
+    scheduler_bytes = tracemalloc.get_traced_memory()[0] - before
+    for i in range(count):
+        scheduler.cancel(('recruit', i))
+
+    async def sleeper(delay: float):
+        await asyncio.sleep(delay)
+
+    before = tracemalloc.get_traced_memory()[0]
+    tasks = [asyncio.create_task(sleeper(3600 + i)) for i in range(count)]
+    await asyncio.sleep(0)
+    task_bytes = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    print(f"メモリ（スケジューラ）:   {scheduler_bytes / count:.0f} bytes/締切")
+    print(f"メモリ（sleepタスク）:    {task_bytes / count:.0f} bytes/締切")
+
+
+async def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    print(f"締切数: {count}")
+    await bench_scheduler(count)
+    await measure_memory(count)
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
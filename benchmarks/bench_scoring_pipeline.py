@@ -0,0 +1,115 @@
+"""
+評価パイプラインの負荷試験
+多数のディベート（既定: 100件）を同時に終了させ、CPUを使う評価ステージ（1件あたり約20ms）を
+イベントループ上・スレッドプール・プロセスプールで実行した場合のイベントループの遅延と、
+全件の結果が出るまでの時間を比較する。時間切れのステージがヒューリスティック評価に
+置き換わることも確認する。
+
+Pythonで書かれたCPU処理はスレッドでもGILを奪い合うため、ループの遅延を抑えるには
+プロセスプールを使う。スレッドプールは外部APIの呼び出しなどI/O待ちの多い処理向け。
+
+使い方:
+    python benchmarks/bench_scoring_pipeline.py [同時に終了するディベート数]
+"""
+
+import asyncio
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import corpus  # noqa: E402
+import bot as debate_bot  # noqa: E402
+from bot import DebateSession, MemberRef  # noqa: E402
+from load_harness import GUILD_ID, FakeChannel, Monitor, percentile  # noqa: E402
+from scorer_pipeline import MODE_INLINE, MODE_PROCESS, MODE_THREAD, ScoringPipeline, ScoringStage  # noqa: E402
+from scoring import evaluate_debate  # noqa: E402
+
+# 評価ステージ1回あたりのCPU時間の目安（秒）
+STAGE_COST = 0.02
+
+
+class BusyStage(ScoringStage):
+    """重い評価を模して一定時間CPUを使い、ヒューリスティック評価を返すステージ"""
+
+    name = 'busy'
+
+    def evaluate(self, log, scores):
+        deadline = time.thread_time() + STAGE_COST
+        while time.thread_time() < deadline:
+            pass
+        return evaluate_debate(log)
+
+
+class StalledStage(ScoringStage):
+    """応答しない外部APIを模して時間切れになるステージ"""
+
+    name = 'stalled'
+
+    def evaluate(self, log, scores):
+        time.sleep(self.timeout * 2)
+        return scores
+
+
+def make_sessions(count: int):
+    rng = random.Random(0)
+    debaters = [MemberRef(1001, 'ディベーターA'), MemberRef(1002, 'ディベーターB')]
+    sessions = []
+    for channel_id in range(1, count + 1):
+        session = DebateSession(FakeChannel(channel_id, latency=0.0), 3, 5, 500, guild_id=GUILD_ID)
+        session.set_debaters(debaters)
+        session.is_active = True
+        session.is_recruiting = False
+        for turn in range(10):
+            session.log_message(debaters[turn % 2], corpus.message(rng, violation_rate=0.0))
+            session.current_turn += 1
+        sessions.append(session)
+    return sessions
+
+
+async def measure(pipeline: ScoringPipeline, count: int):
+    bot = debate_bot.bot
+    bot.scoring = pipeline
+    sessions = make_sessions(count)
+    for session in sessions:
+        bot.active_sessions[session.channel.id] = session
+
+    monitor = Monitor(interval=0.005)
+    monitor.start()
+    await asyncio.sleep(0.05)
+    started = time.perf_counter()
+    await asyncio.gather(*(debate_bot.end_debate(session) for session in sessions))
+    elapsed = time.perf_counter() - started
+    await monitor.stop()
+    await bot.outbound.drain()
+    pipeline.close(wait=True)
+    return elapsed, monitor.lags, len(bot.active_sessions)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    workers = max(2, os.cpu_count() or 1)
+    print(f"同時に終了するディベート: {count}件  ステージのCPU時間: {STAGE_COST * 1000:.0f}ms/件")
+    print(f"{'実行方法':<24} {'全件の完了':>10} {'ループ遅延 p50':>14} {'p99':>9} {'max':>9}")
+    # (表示名, ステージ, スレッド数)
+    scenarios = [
+        ('なし（ヒューリスティックのみ）', [], workers),
+        ('inline', [BusyStage(MODE_INLINE)], workers),
+        (f'thread（{workers}スレッド）', [BusyStage(MODE_THREAD, timeout=60)], workers),
+        (f'process（{workers}プロセス）', [BusyStage(MODE_PROCESS, timeout=60)], workers),
+        ('thread・時間切れ0.2秒', [StalledStage(MODE_THREAD, timeout=0.2)], count),
+    ]
+    for label, stages, thread_workers in scenarios:
+        pipeline = ScoringPipeline(stages, thread_workers=thread_workers, process_workers=workers)
+        elapsed, lags, remaining = asyncio.run(measure(pipeline, count))
+        print(
+            f"{label:<24} {elapsed:>9.2f}秒 {percentile(lags, 0.5) * 1e3:>12.2f}ms "
+            f"{percentile(lags, 0.99) * 1e3:>7.2f}ms {max(lags, default=0) * 1e3:>7.2f}ms"
+            f"{'' if remaining == 0 else f'  （未終了 {remaining}件）'}"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""
+DebateSessionのメモリ使用量ベンチマーク
+従来の辞書ベースの発言ログと列指向のTranscriptをtracemallocで比較する
+
+使い方:
+    python benchmarks/bench_session_memory.py
+"""
+
+import os
+import sys
+import tracemalloc
+from datetime import datetime
+from typing import Dict, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from bot import DebateSession  # noqa: E402
+
+
+SESSIONS = 1000
+MESSAGES_PER_SESSION = [10, 50, 200]
+
+
+class FakeMember:
+    """ディベーターの代用"""
+
+    def __init__(self, user_id: int):
+        self.id = user_id
+        self.display_name = f"debater{user_id}"
+
+
+class LegacySession:
+    """従来のDebateSession（比較用）"""
+
+    def __init__(self, channel, recruit_time: int, message_limit: int, max_chars: int):
+        self.channel = channel
+        self.recruit_time = recruit_time
+        self.message_limit = message_limit
+        self.max_chars = max_chars
+
+        self.participants: List = []
+        self.debaters: List = []
+        self.topic: str = ""
+        self.current_turn: int = 0
+        self.debate_log: List[Dict] = []
+        self.violations: Dict[int, int] = {}
+        self.is_active: bool = False
+        self.is_recruiting: bool = True
+
+    def log_message(self, author, content: str):
+        self.debate_log.append({
+            'author_id': author.id,
+            'author_name': author.display_name,
+            'content': content,
+            'timestamp': datetime.now().isoformat(),
+            'turn': self.current_turn
+        })
+
+
+def measure(session_class, message_count: int) -> int:
+    """セッションを生成して発言を記録し、確保されたバイト数を返す"""
+    members = [FakeMember(i) for i in range(SESSIONS * 2)]
+    contents = [f"{i}番目の発言です。しかし、電子書籍は持ち運びに優れています。" for i in range(message_count)]
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    sessions = []
+    for i in range(SESSIONS):
+        session = session_class(channel=None, recruit_time=3, message_limit=5, max_chars=500)
+        debaters = members[i * 2:i * 2 + 2]
+        for turn in range(message_count):
+            session.log_message(debaters[turn % 2], contents[turn])
+            session.current_turn += 1
+        sessions.append(session)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return after - before
+
+
+def main():
+    print(f"セッション数: {SESSIONS}（本文文字列はセッション間で共有）")
+    print(f"{'messages':>9} {'legacy B/session':>17} {'current B/session':>18} {'reduction':>10}")
+    for message_count in MESSAGES_PER_SESSION:
+        legacy = measure(LegacySession, message_count)
+        current = measure(DebateSession, message_count)
+        print(
+            f"{message_count:>9} {legacy / SESSIONS:>17.0f} {current / SESSIONS:>18.0f} "
+            f"{(1 - current / legacy) * 100:>9.1f}%"
+        )
+
+
+if __name__ == '__main__':
+    main()
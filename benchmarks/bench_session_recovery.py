@@ -0,0 +1,104 @@
+"""
+セッション復元時間のベンチマーク
+10,000セッション分のイベントをSQLiteに書き込み、
+イベントログのみ／スナップショット取得後の2通りで復元時間を計測する
+
+使い方:
+    python benchmarks/bench_session_recovery.py [セッション数]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from bot import DebateSession  # noqa: E402
+from session_store import (  # noqa: E402
+    SessionStore,
+    paused_gc,
+    new_state,
+    EVENT_CREATE,
+    EVENT_MESSAGE,
+    EVENT_JOIN,
+    EVENT_START,
+    EVENT_TURN,
+    EVENT_VIOLATION,
+)
+
+
+JOINS_PER_SESSION = 5
+TURNS_PER_SESSION = 10
+
+
+class FakeChannel:
+    """チャンネルの代用"""
+
+    def __init__(self, channel_id: int):
+        self.id = channel_id
+
+
+def generate_events(session_count: int):
+    """募集→参加→開始→発言→違反までのイベント列を生成"""
+    now = time.time()
+    content = "電子書籍は持ち運びが容易です。しかし、紙の本は記憶の定着に優れています。"
+    for channel_id in range(1, session_count + 1):
+        yield channel_id, EVENT_CREATE, new_state(channel_id, 1, 3, 5, 500, now + 180)
+        yield channel_id, EVENT_MESSAGE, {'m': channel_id * 10}
+        users = [[channel_id * 100 + i, f"user{i}"] for i in range(JOINS_PER_SESSION)]
+        for user in users:
+            yield channel_id, EVENT_JOIN, {'u': user}
+        yield channel_id, EVENT_START, {'d': users[:2], 't': "紙の本と電子書籍、どちらが学習に向いているか"}
+        for turn in range(TURNS_PER_SESSION):
+            author = users[turn % 2]
+            yield channel_id, EVENT_TURN, {'e': [author[0], author[1], content, turn, now], 'ct': turn + 1}
+        yield channel_id, EVENT_VIOLATION, {'u': users[0][0]}
+
+
+def restore(store: SessionStore):
+    """復元してDebateSessionを構築し、(状態の復元秒, セッション構築秒, セッション) を返す"""
+    with paused_gc():
+        started = time.perf_counter()
+        states = store.recover()
+        recovered = time.perf_counter()
+        sessions = {
+            channel_id: DebateSession.from_state(FakeChannel(channel_id), state)
+            for channel_id, state in states.items()
+        }
+        built = time.perf_counter()
+    return recovered - started, built - recovered, sessions
+
+
+def main():
+    session_count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = SessionStore(os.path.join(directory, 'sessions.db'))
+
+        started = time.perf_counter()
+        store.record_many(generate_events(session_count))
+        store.flush().result()
+        print(f"イベント書き込み: {store.pending_events()}件 {time.perf_counter() - started:.2f}s")
+
+        recover_time, build_time, sessions = restore(store)
+        print(
+            f"イベントログから復元: {len(sessions)}セッション "
+            f"{(recover_time + build_time) * 1000:.0f}ms（再生 {recover_time * 1000:.0f}ms + 構築 {build_time * 1000:.0f}ms）"
+        )
+
+        started = time.perf_counter()
+        store.snapshot({channel_id: s.to_state() for channel_id, s in sessions.items()}, store.flush())
+        print(f"スナップショット保存: {(time.perf_counter() - started) * 1000:.0f}ms")
+
+        recover_time, build_time, sessions = restore(store)
+        print(
+            f"スナップショットから復元: {len(sessions)}セッション "
+            f"{(recover_time + build_time) * 1000:.0f}ms（読込 {recover_time * 1000:.0f}ms + 構築 {build_time * 1000:.0f}ms）"
+        )
+
+        store.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""
+トーナメントの負荷試験
+多数の参加者（既定: 1,024名）でトーナメントを作成し、試合ごとのスレッドで同時に進行させる。
+各試合はディベーターが交互に発言して終了し、勝者が次の試合に進む。
+同時に進行した試合数の最大値、イベントループの遅延、実行中のタスク数（試合ごとの監視タスクがないこと）を出力する。
+
+使い方:
+    python benchmarks/bench_tournament.py [参加者数] [同時進行数の上限]
+"""
+
+import asyncio
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import corpus  # noqa: E402
+import bot as debate_bot  # noqa: E402
+from load_harness import ADMIN_ID, FakeChannel, FakeInteraction, FakeMember, FakeMessage, Monitor, percentile  # noqa: E402
+
+# REST呼び出し（送信・スレッド作成）の遅延（秒）
+LATENCY = 0.002
+
+
+async def run(players: int, max_parallel: int):
+    bot = debate_bot.bot
+    hub = FakeChannel(1, LATENCY)
+    interaction = FakeInteraction(FakeMember(ADMIN_ID, administrator=True), hub)
+    await debate_bot.create_tournament.callback(interaction, 3, 1, 500, max_parallel)
+    tournament = bot.tournaments[hub.id]
+    view = interaction.view
+    for user_id in range(10 ** 6, 10 ** 6 + players):
+        await view.join_button.callback(FakeInteraction(FakeMember(user_id), hub))
+
+    rng = random.Random(0)
+    monitor = Monitor(interval=0.01)
+    monitor.start()
+    started = time.perf_counter()
+    bot.scheduler.fire_now(('tournament', hub.id))
+    await asyncio.sleep(0)
+
+    peak_running = peak_tasks = messages = 0
+    while hub.id in bot.tournaments:
+        peak_running = max(peak_running, len(tournament.running))
+        peak_tasks = max(peak_tasks, len(asyncio.all_tasks()))
+        # 進行中の全試合で、現在の発言者が1回ずつ発言する
+        for session in [s for s in bot.active_sessions.values() if s.tournament is tournament and s.is_active]:
+            author = FakeMember(session.get_current_debater().id)
+            await debate_bot.on_message(FakeMessage(0, session.channel, author, corpus.message(rng, violation_rate=0.0)))
+            messages += 1
+        await asyncio.sleep(LATENCY)
+    elapsed = time.perf_counter() - started
+    await monitor.stop()
+    await bot.outbound.drain()
+
+    bracket = tournament.bracket
+    matches = sum(1 for round_matches in bracket.rounds for match in round_matches if match.reason != 'bye')
+    print(f"参加者: {players}名  ラウンド: {bracket.round_count}  試合: {matches}  発言: {messages}")
+    print(f"所要時間: {elapsed:.2f}秒  同時進行の最大: {peak_running}試合（上限 {max_parallel}）")
+    print(f"実行中のタスク数の最大: {peak_tasks}  優勝: {bracket.champion.display_name}")
+    print(
+        f"イベントループ遅延: p50 {percentile(monitor.lags, 0.5) * 1e3:.2f}ms  "
+        f"p99 {percentile(monitor.lags, 0.99) * 1e3:.2f}ms  max {max(monitor.lags, default=0) * 1e3:.2f}ms"
+    )
+
+
+def main():
+    players = int(sys.argv[1]) if len(sys.argv) > 1 else 1024
+    max_parallel = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    asyncio.run(run(players, max_parallel))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,152 @@
+"""
+ターンの持ち時間のベンチマーク
+多数のセッション（既定: 10,000件）の持ち時間を1つの締切スケジューラで管理し、次の2点を計測する。
+
+1. 発言の受理ごとの持ち時間の登録し直し（セッション数を変えて1回あたりの処理時間を比較）
+2. 全セッションのディベーターが同時に発言しなくなった場合のリマインド・パスの一斉発火
+   （予定時刻からの遅れ、イベントループの遅延、実行中のタスク数）
+
+使い方:
+    python benchmarks/bench_turn_deadlines.py [セッション数]
+"""
+
+import asyncio
+import gc
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import bot as debate_bot  # noqa: E402
+from bot import DebateSession, MemberRef  # noqa: E402
+from load_harness import GUILD_ID, FakeChannel, Monitor, percentile  # noqa: E402
+from outbound import OutboundDispatcher  # noqa: E402
+from scheduler import DeadlineScheduler  # noqa: E402
+
+# 一斉発火の計測に使う持ち時間とリマインドのタイミング（秒）
+TIME_LIMIT = 2
+REMINDER_BEFORE = 1
+
+
+def make_sessions(count: int):
+    debaters = [MemberRef(1001, 'ディベーターA'), MemberRef(1002, 'ディベーターB')]
+    sessions = []
+    for channel_id in range(1, count + 1):
+        session = DebateSession(FakeChannel(channel_id, latency=0.0), 3, 3, 500, guild_id=GUILD_ID)
+        session.set_debaters(debaters)
+        session.is_active = True
+        session.is_recruiting = False
+        sessions.append(session)
+    return sessions
+
+
+def reset(sessions):
+    bot = debate_bot.bot
+    bot.scheduler = DeadlineScheduler()
+    bot.active_sessions.clear()
+    for session in sessions:
+        bot.active_sessions[session.channel.id] = session
+
+
+async def measure_reschedule(count: int, operations: int = 100000):
+    """発言の受理を模して、ランダムなセッションの持ち時間を登録し直す"""
+    sessions = make_sessions(count)
+    reset(sessions)
+    for session in sessions:
+        debate_bot.schedule_turn_deadline(session)
+
+    rng = random.Random(0)
+    order = [rng.choice(sessions) for _ in range(operations)]
+    latencies = []
+    for session in order:
+        session.current_turn += 1
+        t = time.perf_counter()
+        debate_bot.schedule_turn_deadline(session)
+        latencies.append(time.perf_counter() - t)
+    scheduled = len(debate_bot.bot.scheduler)
+    for session in sessions:
+        debate_bot.bot.scheduler.cancel(('turn', session.channel.id))
+    reset([])
+    return latencies, scheduled
+
+
+async def measure_expiry(count: int):
+    """全セッションの持ち時間を同時に切らし、リマインドとパスの発火を計測"""
+    bot = debate_bot.bot
+    # 送信のレート制限は計測の対象外のため緩める（実際の制限では通知の送信完了まで数分かかる）
+    bot.outbound = OutboundDispatcher(channel_limit=10 ** 6, global_limit=10 ** 6)
+    sessions = make_sessions(count)
+    reset(sessions)
+
+    fired = {'remind': [], 'expire': []}
+    remind_turn, expire_turn = debate_bot.remind_turn, debate_bot.expire_turn
+    started = {}
+
+    # 最初のターンの発火のみ記録（パスの後は次のディベーターの持ち時間が始まる）
+    async def timed_remind(session, turn, deadline):
+        if turn == 0:
+            fired['remind'].append(time.time() - (deadline - REMINDER_BEFORE))
+        await remind_turn(session, turn, deadline)
+
+    async def timed_expire(session, turn):
+        if turn == 0:
+            fired['expire'].append(time.time() - (started[session.channel.id] + TIME_LIMIT))
+        await expire_turn(session, turn)
+
+    debate_bot.remind_turn, debate_bot.expire_turn = timed_remind, timed_expire
+    monitor = Monitor(interval=0.01)
+    monitor.start()
+    for session in sessions:
+        started[session.channel.id] = time.time()
+        debate_bot.schedule_turn_deadline(session)
+    base_tasks = len(asyncio.all_tasks())
+
+    await asyncio.sleep(TIME_LIMIT + 1.0)
+    await monitor.stop()
+    debate_bot.remind_turn, debate_bot.expire_turn = remind_turn, expire_turn
+    forfeits = sum(sum(session.forfeits.values()) for session in sessions)
+    # パスの後に登録された次のターンの持ち時間は計測しない
+    for session in sessions:
+        session.is_active = False
+    await asyncio.sleep(0.1)
+    for session in sessions:
+        bot.scheduler.cancel(('turn', session.channel.id))
+    await bot.outbound.drain()
+    reset([])
+    return fired, forfeits, base_tasks, monitor.lags
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    debate_bot.TURN_TIME_LIMIT = TIME_LIMIT
+    debate_bot.TURN_REMINDER_BEFORE = REMINDER_BEFORE
+
+    print("発言の受理ごとの持ち時間の登録し直し（100,000回）")
+    print(f"{'セッション数':>12} {'p50':>9} {'p99':>9} {'登録中の締切':>12}")
+    for sessions in sorted({count // 10, count, count * 10}):
+        latencies, scheduled = asyncio.run(measure_reschedule(sessions))
+        print(
+            f"{sessions:>12,} {percentile(latencies, 0.5) * 1e6:>7.2f}µs "
+            f"{percentile(latencies, 0.99) * 1e6:>7.2f}µs {scheduled:>12,}"
+        )
+
+    # 前の計測で生成したセッションを回収してから計測する
+    gc.collect()
+    fired, forfeits, base_tasks, lags = asyncio.run(measure_expiry(count))
+    print(f"\n全{count:,}セッションの一斉持ち時間切れ（持ち時間 {TIME_LIMIT}秒、リマインドは残り{REMINDER_BEFORE}秒）")
+    print(f"登録直後のタスク数: {base_tasks}（ターンごとの待機タスクはない）  パス: {forfeits:,}件")
+    for label, delays in (('リマインド', fired['remind']), ('パス', fired['expire'])):
+        print(
+            f"{label}: {len(delays):,}件  予定時刻からの遅れ p50 {percentile(delays, 0.5) * 1e3:.1f}ms  "
+            f"p99 {percentile(delays, 0.99) * 1e3:.1f}ms  max {max(delays, default=0) * 1e3:.1f}ms"
+        )
+    print(
+        f"イベントループ遅延: p50 {percentile(lags, 0.5) * 1e3:.2f}ms  "
+        f"p99 {percentile(lags, 0.99) * 1e3:.2f}ms  max {max(lags, default=0) * 1e3:.2f}ms"
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""
+禁止コンテンツ判定キャッシュのベンチマーク
+合成コーパスの発言列（既定: 50,000件）に、直近の発言のそのままの再送・全角/半角だけを変えた再送を
+一定の割合（既定: 30%）で混ぜ、判定キャッシュの有無で1件あたりの処理時間とヒット率を比較する。
+すべての発言でキャッシュ経由の判定がキャッシュなしの判定と一致することと、
+禁止ワードを変更したルールセットでは以前の判定が使われないことも確認する。
+
+使い方:
+    python benchmarks/bench_verdict_cache.py [発言数] [再送の割合]
+"""
+
+import os
+import random
+import sys
+import time
+import unicodedata
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import corpus  # noqa: E402
+from config import ATTACK_PATTERNS, MODERATION_CACHE_SIZE, PROHIBITED_WORDS  # noqa: E402
+from load_harness import percentile  # noqa: E402
+from moderation import ModerationEngine  # noqa: E402
+from verdict_cache import VerdictCache  # noqa: E402
+
+# 全角カタカナ→半角カタカナの変換表（NFKC正規化で元に戻る）
+HALF_WIDTH = str.maketrans({
+    unicodedata.normalize('NFKC', chr(code)): chr(code)
+    for code in range(0xFF66, 0xFF9E)
+    if len(unicodedata.normalize('NFKC', chr(code))) == 1
+})
+
+
+def make_stream(count: int, resend_rate: float, seed: int = 0):
+    """そのままの再送と全角/半角だけを変えた再送を混ぜた発言列"""
+    rng = random.Random(seed)
+    stream = []
+    for _ in range(count):
+        if stream and rng.random() < resend_rate:
+            text = rng.choice(stream[-20:])
+            if rng.random() < 0.5:
+                text = text.translate(HALF_WIDTH)
+        else:
+            text = corpus.message(rng)
+        stream.append(text)
+    return stream
+
+
+def measure(find, stream):
+    latencies = []
+    for text in stream:
+        t = time.perf_counter()
+        find(text)
+        latencies.append(time.perf_counter() - t)
+    return latencies
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    resend_rate = float(sys.argv[2]) if len(sys.argv) > 2 else 0.3
+    stream = make_stream(count, resend_rate)
+    engine = ModerationEngine(PROHIBITED_WORDS, ATTACK_PATTERNS)
+
+    checked = VerdictCache(MODERATION_CACHE_SIZE)
+    mismatches = sum(1 for text in stream if checked.find(engine, text) != engine.find(text))
+    print(f"発言: {count:,}件（再送 {resend_rate:.0%}）  キャッシュ上限: {MODERATION_CACHE_SIZE:,}キー  判定の不一致: {mismatches}件")
+
+    cache = VerdictCache(MODERATION_CACHE_SIZE)
+    print(f"{'判定':<16} {'p50':>9} {'p99':>9} {'合計':>9} {'ヒット率':>8}")
+    for label, find, ratio in (
+        ('キャッシュなし', engine.find, lambda: '-'),
+        ('キャッシュあり', lambda text: cache.find(engine, text), lambda: f"{cache.hit_ratio:.1%}"),
+    ):
+        latencies = measure(find, stream)
+        print(
+            f"{label:<16} {percentile(latencies, 0.5) * 1e6:>7.2f}µs {percentile(latencies, 0.99) * 1e6:>7.2f}µs "
+            f"{sum(latencies) * 1e3:>7.1f}ms {ratio():>8}"
+        )
+
+    # 禁止ワードを追加したルールセットでは、同じ本文でも以前の判定は使われない
+    updated = ModerationEngine(PROHIBITED_WORDS + ['効率'], ATTACK_PATTERNS)
+    hits_before = cache.hits
+    changed = sum(1 for text in stream[:1000] if cache.find(updated, text) != updated.find(text))
+    print(
+        f"ルールセット変更後の最初の1,000件: 判定の不一致 {changed}件  "
+        f"ヒット {cache.hits - hits_before}件（変更後に判定した発言の再送のみ）"
+    )
+
+
+if __name__ == '__main__':
+    main()
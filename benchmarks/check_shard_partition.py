@@ -0,0 +1,143 @@
+"""
+シャード分割時のセッション永続化の確認
+1つのデータベースを共有する2プロセス分のSessionStore（シャード数2、シャード0と1）に、ゲートウェイの代わりに
+サーバーIDからシャードを求めて各イベントを担当側へ振り分け、書き込みとスナップショット（全セッション、
+または前回以降にイベントを記録したセッションのみ）を交互に行う。
+最後に各ストアを開き直して復元し、担当シャードのセッションだけを過不足なく復元できること、
+シャードを指定しない1プロセス構成では全セッションを復元できることを確認する（不一致があれば終了コード1）。
+
+使い方:
+    python benchmarks/check_shard_partition.py [セッション数]
+"""
+
+import copy
+import os
+import random
+import sys
+import tempfile
+import time
+from typing import Dict, List, Set
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from session_store import (  # noqa: E402
+    SessionStore,
+    apply_event,
+    new_state,
+    EVENT_CREATE,
+    EVENT_END,
+    EVENT_JOIN,
+    EVENT_START,
+    EVENT_TURN,
+    EVENT_VIOLATION,
+)
+
+SHARD_COUNT = 2
+
+
+def shard_for(guild_id) -> int:
+    """サーバーを担当するシャード（Discordと同じ計算式、サーバー外はシャード0）"""
+    return ((guild_id or 0) >> 22) % SHARD_COUNT
+
+
+class FakeGateway:
+    """
+    ゲートウェイの代用
+    各サーバーのイベントを、そのサーバーのシャードを担当するプロセスのストアにだけ届ける
+    """
+
+    def __init__(self, stores: List[SessionStore]):
+        self.stores = stores
+        self.expected: List[Dict[int, Dict]] = [{} for _ in stores]
+        # 前回のスナップショット以降にイベントを記録したチャンネル（シャードごと）
+        self.pending: List[Set[int]] = [set() for _ in stores]
+        self.guilds: Dict[int, int] = {}  # channel_id: guild_id
+
+    def dispatch(self, channel_id: int, kind: str, payload: Dict):
+        if kind == EVENT_CREATE:
+            self.guilds[channel_id] = payload['g']
+        shard_id = shard_for(self.guilds[channel_id])
+        apply_event(self.expected[shard_id], channel_id, kind, copy.deepcopy(payload))
+        self.stores[shard_id].record(channel_id, kind, payload)
+        self.pending[shard_id].add(channel_id)
+
+    def snapshot(self, shard_id: int, full: bool):
+        store = self.stores[shard_id]
+        flushed = store.flush()
+        expected = self.expected[shard_id]
+        changed = self.pending[shard_id]
+        self.pending[shard_id] = set()
+        if full:
+            store.snapshot(copy.deepcopy(expected), flushed)
+        else:
+            states = {channel_id: expected[channel_id] for channel_id in changed if channel_id in expected}
+            store.snapshot(copy.deepcopy(states), flushed, changed)
+
+
+def play(gateway: FakeGateway, session_count: int, rng: random.Random):
+    """募集から終了までのイベントを複数セッションで交互に発生させ、途中でスナップショットを取る"""
+    now = time.time()
+    open_channels: List[int] = []
+    for channel_id in range(1, session_count + 1):
+        # サーバーIDの上位ビット（作成時刻）をばらつかせ、両方のシャードに割り振られるようにする
+        guild_id = rng.choice([None, rng.randrange(1, 1 << 20) << 22 | rng.randrange(1 << 22)])
+        gateway.dispatch(channel_id, EVENT_CREATE, new_state(channel_id, guild_id, 3, 5, 500, now + 180))
+        open_channels.append(channel_id)
+
+        for _ in range(rng.randint(1, 4)):
+            target = rng.choice(open_channels)
+            kind = rng.choice([EVENT_JOIN, EVENT_START, EVENT_TURN, EVENT_VIOLATION, EVENT_END])
+            if kind == EVENT_JOIN:
+                payload = {'u': [rng.randrange(10 ** 6), 'user']}
+            elif kind == EVENT_START:
+                payload = {'d': [[1, 'A'], [2, 'B']], 't': '議題'}
+            elif kind == EVENT_TURN:
+                payload = {'e': [1, 'A', '発言', 0, now], 'ct': rng.randint(1, 10)}
+            elif kind == EVENT_VIOLATION:
+                payload = {'u': 1}
+            else:
+                payload = {}
+                open_channels.remove(target)
+            gateway.dispatch(target, kind, payload)
+            if not open_channels:
+                break
+
+        if rng.random() < 0.05:
+            gateway.snapshot(rng.randrange(SHARD_COUNT), full=rng.random() < 0.2)
+
+
+def main():
+    session_count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    rng = random.Random(0)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'sessions.db')
+        stores = [SessionStore(path, [shard_id], SHARD_COUNT) for shard_id in range(SHARD_COUNT)]
+        gateway = FakeGateway(stores)
+        play(gateway, session_count, rng)
+        for store in stores:
+            store.close()
+
+        failed = False
+        for shard_id in range(SHARD_COUNT):
+            store = SessionStore(path, [shard_id], SHARD_COUNT)
+            recovered = store.recover()
+            store.close()
+            expected = gateway.expected[shard_id]
+            ok = recovered == expected
+            failed |= not ok
+            print(f"シャード{shard_id}: 復元 {len(recovered)}件 / 期待 {len(expected)}件  {'一致' if ok else '不一致'}")
+
+        store = SessionStore(path)
+        recovered = store.recover()
+        store.close()
+        expected = {channel_id: state for states in gateway.expected for channel_id, state in states.items()}
+        ok = recovered == expected
+        failed |= not ok
+        print(f"シャード指定なし: 復元 {len(recovered)}件 / 期待 {len(expected)}件  {'一致' if ok else '不一致'}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
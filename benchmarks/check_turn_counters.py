@@ -0,0 +1,134 @@
+"""
+発言回数カウンターの等価性の確認
+ランダムなディベート（既定: 300件）を偽のDiscordオブジェクトで on_message に通して再生し、
+発言を受理するたびに、DebateSession の発言回数カウンター（get_turn_count・get_remaining_turns）と
+対戦相手の対応（get_opponent）を、以前の実装と同じ発言ログの走査による値と比較する。
+あわせて、発言制限による終了のタイミングが以前の判定（発言者と相手の走査による回数が
+どちらも上限に達したら終了）と一致することを確認する（不一致があれば終了コード1）。
+
+違反・文字数超過・発言者違いの発言と、持ち時間切れによるパス（expire_turn）も混ぜる。
+パスは発言ログに残らないため、走査による回数には再生側で数えたパスの回数を加える。
+
+使い方:
+    python benchmarks/check_turn_counters.py [ディベート数]
+"""
+
+import asyncio
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import corpus  # noqa: E402
+import bot as debate_bot  # noqa: E402
+from bot import DebateSession, MemberRef  # noqa: E402
+from load_harness import GUILD_ID, FakeChannel, FakeMember, FakeMessage  # noqa: E402
+from outbound import OutboundDispatcher  # noqa: E402
+
+DEBATER_IDS = (1001, 1002)
+OUTSIDER_ID = 1003
+
+# 1ディベートあたりの操作数の上限（発言制限に達しない場合はここで打ち切る）
+MAX_STEPS = 60
+
+
+def scanned_turn_count(session: DebateSession, user_id: int, passes) -> int:
+    """以前の実装と同じく発言ログを走査して数えた発言回数（パスを含む）"""
+    return sum(1 for entry in session.debate_log if entry['author_id'] == user_id) + passes.get(user_id, 0)
+
+
+async def replay(seed: int) -> list:
+    """1件のディベートを再生し、見つかった不一致の説明を返す"""
+    bot = debate_bot.bot
+    rng = random.Random(seed)
+    channel = FakeChannel(seed + 1, latency=0.0)
+    message_limit = rng.randint(1, 6)
+    session = DebateSession(channel, 3, message_limit, 500, guild_id=GUILD_ID)
+    debaters = [MemberRef(user_id, f'ディベーター{user_id}') for user_id in DEBATER_IDS]
+    rng.shuffle(debaters)
+    session.participants = {debater.id: debater for debater in debaters}
+    session.set_debaters(debaters)
+    session.is_recruiting = False
+    session.is_active = True
+    bot.active_sessions[channel.id] = session
+
+    mismatches = []
+    passes = {}
+    for step in range(MAX_STEPS):
+        before_log = len(session.transcript)
+        before_violations = sum(session.violations.values())
+        current = session.get_current_debater()
+
+        action = rng.random()
+        if action < 0.1:
+            # 持ち時間切れ
+            author_id = current.id
+            passes[author_id] = passes.get(author_id, 0) + 1
+            await debate_bot.expire_turn(session, session.current_turn)
+        else:
+            if action < 0.2:
+                author_id = OUTSIDER_ID
+            elif action < 0.3:
+                author_id = session.get_opponent(current.id).id
+            else:
+                author_id = current.id
+            if rng.random() < 0.05:
+                content = 'あ' * 600
+            else:
+                content = corpus.message(rng, violation_rate=0.15)
+            await debate_bot.on_message(FakeMessage(step, channel, FakeMember(author_id), content))
+        await bot.outbound.drain()
+
+        accepted = len(session.transcript) > before_log or action < 0.1
+        ended = not session.is_active or channel.id not in bot.active_sessions
+        if accepted:
+            author_count = scanned_turn_count(session, author_id, passes)
+            other = debaters[1] if author_id == debaters[0].id else debaters[0]
+            other_count = scanned_turn_count(session, other.id, passes)
+            expected_end = author_count >= message_limit and other_count >= message_limit
+            if ended != expected_end:
+                mismatches.append(f"seed={seed} step={step}: 終了 {ended}（以前の判定 {expected_end}）")
+        elif ended and sum(session.violations.values()) == before_violations:
+            mismatches.append(f"seed={seed} step={step}: 発言を受理せずに終了")
+
+        for debater in debaters:
+            scanned = scanned_turn_count(session, debater.id, passes)
+            if session.get_turn_count(debater.id) != scanned:
+                mismatches.append(
+                    f"seed={seed} step={step}: {debater.id} の発言回数 {session.get_turn_count(debater.id)}（走査 {scanned}）"
+                )
+            if session.get_remaining_turns(debater.id) != message_limit - scanned:
+                mismatches.append(f"seed={seed} step={step}: {debater.id} の残り回数が不一致")
+            expected_opponent = debaters[1] if debater is debaters[0] else debaters[0]
+            if session.get_opponent(debater.id) is not expected_opponent:
+                mismatches.append(f"seed={seed} step={step}: {debater.id} の対戦相手が不一致")
+        if ended:
+            break
+
+    if channel.id in bot.active_sessions:
+        debate_bot.remove_session(channel.id)
+    return mismatches
+
+
+async def run(count: int):
+    bot = debate_bot.bot
+    # 送信のレート制限で待たないようにする
+    bot.outbound = OutboundDispatcher(channel_limit=10 ** 6, delete_limit=10 ** 6, global_limit=10 ** 6)
+    mismatches = []
+    for seed in range(count):
+        mismatches.extend(await replay(seed))
+    return mismatches
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    mismatches = asyncio.run(run(count))
+    for mismatch in mismatches[:20]:
+        print(mismatch)
+    print(f"ディベート: {count}件  不一致: {len(mismatches)}件")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+ベンチマーク用の合成コーパス
+議題リストと定型表現を組み合わせて、日本語のディベート発言を再現性のある形で生成する
+（句点・接続詞・感嘆符の頻度、文字数の分布、禁止ワードや伏せ字の混入を含む）
+"""
+
+import os
+import random
+import sys
+from typing import Dict, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from config import DEBATE_TOPICS, PROHIBITED_WORDS  # noqa: E402
+from scoring import STRUCTURE_WORDS  # noqa: E402
+
+
+SUBJECTS = ['電子書籍', '紙の本', 'リモートワーク', '出社勤務', '朝型生活', '夜型生活', '自炊', '外食',
+            'ストリーミング', '物理メディア', '独学', '学校での学習', 'オンライン購入', '実店舗']
+CLAIMS = [
+    '{s}は長期的に見てコストを抑えられます',
+    '{s}の方が集中しやすい環境を作れます',
+    '{s}には習慣化しやすいという利点があります',
+    '{s}は人との交流が生まれやすい点で優れています',
+    '{s}を選ぶ人が増えているという調査結果があります',
+    '{s}では自分のペースで進められることが大きいです',
+    '{s}は初期費用がかかるという欠点を見落としてはいけません',
+    '{s}の利点は環境によって大きく変わります',
+]
+OPENERS = ['私は', '確かに', '一方で', '例えば', 'ご指摘の点について、', '相手側の主張に対して、', '']
+CLOSERS = ['と考えます', 'と言えるでしょう', 'のではないでしょうか', 'ことは明らかです', '']
+EMPHASIS = ['', '', '', '', '!', '!', '!!', '！']
+# 禁止ワードの別表記（伏せ字・区切り・半角カナ）
+OBFUSCATIONS = ['バ○カ', 'バ・カ', 'ア ホ', 'ﾊﾞｶ', 'ク＊ズ']
+
+
+def sentence(rng: random.Random) -> str:
+    """1文を生成"""
+    parts = [rng.choice(OPENERS)]
+    if rng.random() < 0.35:
+        parts.append(rng.choice(STRUCTURE_WORDS) + '、')
+    parts.append(rng.choice(CLAIMS).format(s=rng.choice(SUBJECTS)))
+    parts.append(rng.choice(CLOSERS))
+    return ''.join(parts) + rng.choice(('。', '。', '。', '')) + rng.choice(EMPHASIS)
+
+
+def message(rng: random.Random, max_chars: int = 500, violation_rate: float = 0.05) -> str:
+    """1発言を生成（文字数は1〜12文で、最大max_chars文字）"""
+    text = ''.join(sentence(rng) for _ in range(rng.randint(1, 12)))[:max_chars]
+    if rng.random() < violation_rate:
+        insert = rng.choice(PROHIBITED_WORDS + OBFUSCATIONS + ['お前は', '貴様'])
+        position = rng.randint(0, len(text))
+        text = (text[:position] + insert + text[position:])[:max_chars]
+    return text
+
+
+def messages(count: int, seed: int = 0, **kwargs) -> List[str]:
+    """count件の発言を生成"""
+    rng = random.Random(seed)
+    return [message(rng, **kwargs) for _ in range(count)]
+
+
+def debate_log(rng: random.Random, message_limit: int = 5, debater_ids=(1001, 1002)) -> List[Dict]:
+    """ディベーターが順番に発言したディベートログ（evaluate_debateの入力形式）"""
+    log = []
+    for turn in range(message_limit * len(debater_ids)):
+        author_id = debater_ids[turn % len(debater_ids)]
+        log.append({
+            'author_id': author_id,
+            'author_name': f'ディベーター{author_id}',
+            'content': message(rng, violation_rate=0.0),
+            'turn': turn,
+            'timestamp': f'2026-01-10T12:{turn // 60:02d}:{turn % 60:02d}',
+        })
+    return log
+
+
+def topic(rng: random.Random) -> str:
+    return rng.choice(DEBATE_TOPICS)
@@ -0,0 +1,423 @@
+"""
+イベント再生による負荷試験
+偽のチャンネル・メンバー・メッセージ・インタラクションを使い、生成（または記録済み）の
+イベント列を create_debate → ParticipantView.join_button → 募集締切 → on_message
+（→ end_debate）/ stop_debate の順に多数のチャンネルで同時に再生する。
+イベント種別ごとの処理時間のパーセンタイル、イベントループの遅延、メモリの増加を出力する。
+
+使い方:
+    python benchmarks/load_harness.py [--channels 2000] [--ramp 10] [--think 0.5]
+    python benchmarks/load_harness.py --record events.jsonl   # 生成したイベント列を保存
+    python benchmarks/load_harness.py --replay events.jsonl   # 保存したイベント列を再生
+
+イベント列の形式（1行1イベント、tはチャンネルの開始からの秒数）:
+    {"t": 0.0, "c": 1, "type": "create", "u": 1, "limit": 5}
+    {"t": 0.4, "c": 1, "type": "join", "u": 2}
+    {"t": 2.0, "c": 1, "type": "close"}
+    {"t": 2.5, "c": 1, "type": "message", "role": "turn", "text": "..."}
+    {"t": 9.0, "c": 1, "type": "stop", "u": 1}
+roleは再生時に解決する（turn: 現在の発言者 / other: もう一方のディベーター / outsider: ディベーター以外）
+
+送信はOutboundDispatcher（実際のレート制限設定）を通るため、終了時の送信キューの排出には時間がかかる。
+常駐メモリはGC後もアロケータが解放しない分を含むため、増加量はリークの上限の目安として扱う。
+"""
+
+import argparse
+import asyncio
+import gc
+import itertools
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import corpus  # noqa: E402
+import bot as debate_bot  # noqa: E402
+from archiver import TranscriptArchiver  # noqa: E402
+from session_store import SessionStore  # noqa: E402
+
+GUILD_ID = 10 ** 17
+ADMIN_ID = 1
+EVENT_TYPES = ('create', 'join', 'close', 'message', 'stop')
+
+_message_ids = itertools.count(10 ** 15)
+_thread_ids = itertools.count(10 ** 12)
+
+
+# ===========================
+# 偽のDiscordオブジェクト
+# ===========================
+
+class FakePermissions:
+    def __init__(self, administrator: bool):
+        self.administrator = administrator
+
+
+class FakeGuild:
+    def __init__(self, guild_id: int):
+        self.id = guild_id
+        self.roles = []
+
+
+GUILD = FakeGuild(GUILD_ID)
+
+
+class FakeMember:
+    def __init__(self, user_id: int, administrator: bool = False):
+        self.id = user_id
+        self.display_name = f'ユーザー{user_id}'
+        self.mention = f'<@{user_id}>'
+        self.bot = False
+        self.guild = GUILD
+        self.roles = []
+        self.guild_permissions = FakePermissions(administrator)
+
+    def get_role(self, role_id: int):
+        return None
+
+
+class FakeChannel:
+    """送信のたびにREST呼び出しの遅延を模して待機するチャンネル"""
+
+    def __init__(self, channel_id: int, latency: float):
+        self.id = channel_id
+        self.guild_id = GUILD_ID
+        self.latency = latency
+        self.sent = 0
+        self.edited = 0
+
+    async def send(self, content=None, **kwargs):
+        await asyncio.sleep(self.latency)
+        self.sent += 1
+        return FakeMessage(next(_message_ids), self, None, content)
+
+    def get_partial_message(self, message_id: int) -> 'FakeMessage':
+        return FakeMessage(message_id, self, None, None)
+
+    async def create_thread(self, *, name: str, **kwargs) -> 'FakeChannel':
+        await asyncio.sleep(self.latency)
+        return FakeChannel(next(_thread_ids), self.latency)
+
+
+class FakeMessage:
+    def __init__(self, message_id: int, channel: FakeChannel, author: Optional[FakeMember], content: str):
+        self.id = message_id
+        self.channel = channel
+        self.author = author
+        self.content = content
+
+    async def delete(self):
+        await asyncio.sleep(self.channel.latency)
+
+    async def edit(self, **kwargs):
+        await asyncio.sleep(self.channel.latency)
+        self.channel.edited += 1
+
+
+class FakeResponse:
+    def __init__(self, interaction: 'FakeInteraction'):
+        self._interaction = interaction
+
+    async def send_message(self, content=None, *, embed=None, view=None, ephemeral=False, **kwargs):
+        await asyncio.sleep(self._interaction.channel.latency)
+        self._interaction.view = view
+        self._interaction.message = FakeMessage(
+            next(_message_ids), self._interaction.channel, None, content
+        )
+
+
+class FakeInteraction:
+    def __init__(self, user: FakeMember, channel: FakeChannel):
+        self.user = user
+        self.channel = channel
+        self.channel_id = channel.id
+        self.guild_id = channel.guild_id
+        self.guild = GUILD
+        self.response = FakeResponse(self)
+        self.view = None
+        self.message: Optional[FakeMessage] = None
+
+    async def original_response(self) -> FakeMessage:
+        return self.message
+
+
+# ===========================
+# イベント列
+# ===========================
+
+def generate_stream(channels: int, ramp: float, think: float, seed: int) -> List[Dict]:
+    """チャンネルごとのディベート1回分のイベント列を生成"""
+    rng = random.Random(seed)
+    events = []
+    for channel_id in range(1, channels + 1):
+        t = rng.uniform(0, ramp)
+        message_limit = rng.randint(2, 6)
+
+        def add(**event):
+            nonlocal t
+            event['t'] = round(t, 4)
+            event['c'] = channel_id
+            events.append(event)
+            t += rng.expovariate(1 / think)
+
+        add(type='create', u=ADMIN_ID, limit=message_limit)
+        participants = rng.sample(range(1000, 100000), rng.randint(2, 6))
+        for user_id in participants + rng.sample(participants, 1):  # 重複登録を1件含む
+            add(type='join', u=user_id)
+        add(type='close')
+
+        stopped_after = rng.randint(1, message_limit * 2) if rng.random() < 0.05 else None
+        turns = 0
+        while turns < message_limit * 2:
+            roll = rng.random()
+            if roll < 0.08:
+                add(type='message', role='other', text=corpus.message(rng, violation_rate=0.0))
+            elif roll < 0.11:
+                add(type='message', role='outsider', text=corpus.message(rng, violation_rate=0.0))
+            elif roll < 0.13:
+                add(type='message', role='turn', text=corpus.message(rng, violation_rate=1.0))
+            else:
+                add(type='message', role='turn', text=corpus.message(rng, violation_rate=0.0))
+                turns += 1
+            if stopped_after is not None and turns >= stopped_after:
+                add(type='stop', u=ADMIN_ID)
+                break
+
+    return events
+
+
+def save_stream(path: str, events: List[Dict]):
+    with open(path, 'w', encoding='utf-8') as f:
+        for event in events:
+            f.write(json.dumps(event, ensure_ascii=False) + '\n')
+
+
+def load_stream(path: str) -> List[Dict]:
+    with open(path, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+# ===========================
+# 計測
+# ===========================
+
+def current_rss_mb() -> Optional[float]:
+    """現在の常駐メモリ（MB）。/procがない環境では最大常駐メモリで代用"""
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError):
+        return debate_bot.resident_memory_mb()
+
+
+class Monitor:
+    """イベントループの遅延とメモリを定期的に記録"""
+
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self.lags: List[float] = []
+        self.rss: List[float] = []
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        self._task.cancel()
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        samples = 0
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.lags.append(max(0.0, loop.time() - expected))
+            samples += 1
+            if samples % 10 == 0:
+                rss = current_rss_mb()
+                if rss is not None:
+                    self.rss.append(rss)
+
+
+def percentile(values: List[float], p: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+
+
+class Replayer:
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.delays: List[float] = []  # 予定時刻からの開始の遅れ
+        self.skipped = 0
+        self.views: Dict[int, object] = {}
+
+    async def run_channel(self, channel_id: int, events: List[Dict], started: float):
+        loop = asyncio.get_running_loop()
+        channel = FakeChannel(channel_id, self.latency)
+        for event in events:
+            wait = started + event['t'] - loop.time()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self.delays.append(max(0.0, loop.time() - (started + event['t'])))
+
+            handler = self._handler(channel, event)
+            if handler is None:
+                self.skipped += 1
+                continue
+            begin = time.perf_counter()
+            await handler
+            self.latencies[event['type']].append(time.perf_counter() - begin)
+
+    def _handler(self, channel: FakeChannel, event: Dict):
+        kind = event['type']
+        if kind == 'create':
+            interaction = FakeInteraction(FakeMember(event['u'], administrator=True), channel)
+            return self._create(interaction, event.get('limit', debate_bot.DEFAULT_MESSAGE_LIMIT))
+        if kind == 'stop':
+            interaction = FakeInteraction(FakeMember(event['u'], administrator=True), channel)
+            return debate_bot.stop_debate.callback(interaction)
+
+        session = debate_bot.bot.active_sessions.get(channel.id)
+        if session is None:
+            return None
+        if kind == 'join':
+            view = self.views.get(channel.id)
+            if view is None:
+                return None
+            return view.join_button.callback(FakeInteraction(FakeMember(event['u']), channel))
+        if kind == 'close':
+            debate_bot.bot.scheduler.cancel(('recruit', channel.id))
+            return debate_bot.close_recruitment(session)
+        if kind == 'message':
+            author = self._resolve(session, event['role'])
+            if author is None:
+                return None
+            return debate_bot.on_message(FakeMessage(next(_message_ids), channel, author, event['text']))
+        return None
+
+    async def _create(self, interaction: FakeInteraction, message_limit: int):
+        await debate_bot.create_debate.callback(interaction, 3, message_limit, 500)
+        if interaction.view is not None:
+            self.views[interaction.channel_id] = interaction.view
+
+    @staticmethod
+    def _resolve(session, role: str) -> Optional[FakeMember]:
+        current = session.get_current_debater()
+        if current is None:
+            return None
+        if role == 'turn':
+            return FakeMember(current.id)
+        if role == 'other':
+            return FakeMember(session.get_opponent(current.id).id)
+        outsiders = [p for p in session.participants.values() if not session.is_debater(p.id)]
+        return FakeMember(outsiders[0].id if outsiders else 999999)
+
+
+async def run(events: List[Dict], latency: float, persist: bool):
+    bot = debate_bot.bot
+    temp_dir = tempfile.mkdtemp(prefix='debate-load-')
+    if persist:
+        bot.session_store = SessionStore(os.path.join(temp_dir, 'sessions.db'))
+        bot.archiver = TranscriptArchiver(os.path.join(temp_dir, 'logs'), 30)
+        bot.archiver.start()
+
+    by_channel: Dict[int, List[Dict]] = defaultdict(list)
+    for event in events:
+        by_channel[event['c']].append(event)
+    for channel_events in by_channel.values():
+        channel_events.sort(key=lambda event: event['t'])
+
+    gc.collect()
+    rss_before = current_rss_mb()
+    monitor = Monitor()
+    monitor.start()
+    replayer = Replayer(latency)
+
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    wall = time.perf_counter()
+    await asyncio.gather(*(
+        replayer.run_channel(channel_id, channel_events, started)
+        for channel_id, channel_events in by_channel.items()
+    ))
+    replay_time = time.perf_counter() - wall
+    await bot.outbound.drain()
+    if bot.archiver is not None:
+        await bot.archiver.close()
+    drain_time = time.perf_counter() - wall - replay_time
+    await monitor.stop()
+
+    replayer.views.clear()
+    gc.collect()
+    rss_after = current_rss_mb()
+
+    handled = sum(len(values) for values in replayer.latencies.values())
+    print(f"チャンネル数: {len(by_channel)}  イベント数: {len(events)}（処理 {handled} / 対象なし {replayer.skipped}）")
+    print(f"再生時間: {replay_time:.2f}秒（{handled / replay_time:,.0f}イベント/秒）  送信キューの排出: {drain_time:.2f}秒")
+    print(f"API呼び出し: {bot.outbound.api_calls}（要求 {bot.outbound.requested}）  残存セッション: {len(bot.active_sessions)}")
+    print()
+    print(f"{'イベント':<10} {'件数':>7} {'p50 µs':>9} {'p90 µs':>9} {'p99 µs':>9} {'max µs':>9}")
+    for kind in EVENT_TYPES:
+        values = replayer.latencies.get(kind, [])
+        if not values:
+            continue
+        print(
+            f"{kind:<10} {len(values):>7} {percentile(values, 0.5) * 1e6:>9.0f} "
+            f"{percentile(values, 0.9) * 1e6:>9.0f} {percentile(values, 0.99) * 1e6:>9.0f} "
+            f"{max(values) * 1e6:>9.0f}"
+        )
+    print()
+    print(
+        f"イベントループ遅延: p50 {percentile(monitor.lags, 0.5) * 1e3:.2f}ms  "
+        f"p99 {percentile(monitor.lags, 0.99) * 1e3:.2f}ms  max {max(monitor.lags, default=0) * 1e3:.2f}ms"
+    )
+    print(
+        f"予定時刻からの開始遅れ: p50 {percentile(replayer.delays, 0.5) * 1e3:.2f}ms  "
+        f"p99 {percentile(replayer.delays, 0.99) * 1e3:.2f}ms  "
+        f"平均 {statistics.fmean(replayer.delays) * 1e3 if replayer.delays else 0:.2f}ms"
+    )
+    if rss_before is not None and rss_after is not None:
+        peak = max(monitor.rss, default=rss_after)
+        print(
+            f"常駐メモリ: 開始 {rss_before:.1f}MB  最大 {peak:.1f}MB  終了 {rss_after:.1f}MB "
+            f"（増加 {rss_after - rss_before:+.1f}MB）"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description='イベント再生による負荷試験')
+    parser.add_argument('--channels', type=int, default=2000, help='同時に進行するチャンネル数')
+    parser.add_argument('--ramp', type=float, default=10.0, help='全チャンネルが開始するまでの秒数')
+    parser.add_argument('--think', type=float, default=0.5, help='チャンネル内のイベント間隔の平均（秒）')
+    parser.add_argument('--latency', type=float, default=0.05, help='送信1回あたりの擬似REST遅延（秒）')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-persist', action='store_true', help='セッションの永続化とアーカイブを行わない')
+    parser.add_argument('--record', help='生成したイベント列を保存するパス')
+    parser.add_argument('--replay', help='再生するイベント列のパス')
+    args = parser.parse_args()
+
+    if args.replay:
+        events = load_stream(args.replay)
+    else:
+        events = generate_stream(args.channels, args.ramp, args.think, args.seed)
+    if args.record:
+        save_stream(args.record, events)
+        print(f"イベント列を保存しました: {args.record}")
+
+    # 決定的な再生のため議題・ディベーターの選出を固定
+    debate_bot.random.seed(args.seed)
+    asyncio.run(run(events, args.latency, persist=not args.no_persist))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,213 @@
+"""
+ホットパスのマイクロベンチマーク
+禁止コンテンツチェック・ディベート評価・発言記録・utilsの補助関数を合成コーパスで計測し、
+ops/sec と1回あたりの一時メモリ（tracemallocのピーク）を保存済みのベースラインと比較する
+
+ベースラインは計測したマシンとPythonのバージョンに依存するため、同じ環境で保存・比較すること。
+
+使い方:
+    python benchmarks/microbench.py                  # 計測してベースラインと比較（悪化があれば終了コード1）
+    python benchmarks/microbench.py --save           # 計測結果をベースラインとして保存
+    python benchmarks/microbench.py --threshold 0.2  # 悪化とみなす割合（既定: 0.15）
+    python benchmarks/microbench.py moderation      # 名前に文字列を含むベンチマークだけを実行
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import corpus  # noqa: E402
+import bot as debate_bot  # noqa: E402
+from bot import DebateSession, MemberRef  # noqa: E402
+from config import ATTACK_PATTERNS, PROHIBITED_WORDS  # noqa: E402
+from moderation import ModerationEngine  # noqa: E402
+from scoring import evaluate_debate  # noqa: E402
+from utils import count_characters_without_whitespace, highlight_keywords, validate_debate_message  # noqa: E402
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+# 1回の計測の目安時間（秒）と繰り返し回数
+TARGET_TIME = 0.2
+REPEAT = 5
+
+# 一時メモリの比較で無視する差（バイト）
+MEMORY_SLACK = 256
+
+
+class _Channel:
+    id = 1
+
+
+def bench_cases() -> List[Tuple[str, Callable[[], Callable[[int], None]]]]:
+    """
+    (名前, 準備関数) の一覧
+    準備関数は入力を生成し、i番目の操作を1回実行する関数を返す
+    """
+    messages = corpus.messages(2000, seed=1)
+    rng = random.Random(2)
+    logs = [corpus.debate_log(rng, message_limit=rng.randint(1, 10)) for _ in range(200)]
+    keywords = list(corpus.SUBJECTS[:5])
+
+    def cached_find():
+        # 判定キャッシュ経由（計測を繰り返すため、ほぼすべてキャッシュから返る）
+        verdicts = debate_bot.bot.verdicts
+        engine = debate_bot.bot.runtime.moderation_engine
+        return lambda i: verdicts.find(engine, messages[i % len(messages)])
+
+    def engine_find():
+        # キャッシュを通さない照合（モデレーション本体のベースライン）
+        engine = ModerationEngine(PROHIBITED_WORDS, ATTACK_PATTERNS)
+        return lambda i: engine.find(messages[i % len(messages)])
+
+    def evaluate():
+        return lambda i: evaluate_debate(logs[i % len(logs)])
+
+    def log_message():
+        debaters = [MemberRef(1001, 'ディベーターA'), MemberRef(1002, 'ディベーターB')]
+        state = {'session': None}
+
+        def op(i):
+            # 発言制限の上限（10回×2名）ごとに新しいセッションにする
+            if i % 20 == 0:
+                session = state['session'] = DebateSession(_Channel(), 3, 10, 500)
+                session.set_debaters(debaters)
+            session = state['session']
+            session.log_message(debaters[i % 2], messages[i % len(messages)])
+            session.current_turn += 1
+        return op
+
+    def validate():
+        return lambda i: validate_debate_message(messages[i % len(messages)], 500)
+
+    def highlight():
+        return lambda i: highlight_keywords(messages[i % len(messages)], keywords)
+
+    def count_chars():
+        return lambda i: count_characters_without_whitespace(messages[i % len(messages)])
+
+    return [
+        ('moderation.verdict_cache_find', cached_find),
+        ('moderation.engine_find', engine_find),
+        ('scoring.evaluate_debate', evaluate),
+        ('session.log_message', log_message),
+        ('utils.validate_debate_message', validate),
+        ('utils.highlight_keywords', highlight),
+        ('utils.count_characters_without_whitespace', count_chars),
+    ]
+
+
+def _run(op: Callable[[int], None], count: int) -> float:
+    started = time.perf_counter()
+    for i in range(count):
+        op(i)
+    return time.perf_counter() - started
+
+
+def measure(prepare: Callable[[], Callable[[int], None]]) -> Dict:
+    """ops/sec（繰り返しの最良値）と1回あたりの一時メモリを計測"""
+    op = prepare()
+
+    # 目安時間に収まる回数を決める
+    count = 1
+    while _run(op, count) < TARGET_TIME / 10:
+        count *= 2
+    count *= 10
+
+    gc.collect()
+    best = min(_run(prepare(), count) for _ in range(REPEAT))
+
+    # 一時メモリは別の準備済みインスタンスで、操作ごとのピーク増分の平均を取る
+    op = prepare()
+    samples = min(count, 2000)
+    tracemalloc.start()
+    total_peak = 0
+    for i in range(samples):
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        op(i)
+        total_peak += tracemalloc.get_traced_memory()[1] - current
+    tracemalloc.stop()
+
+    return {
+        'ops_per_sec': count / best,
+        'bytes_per_op': total_peak / samples,
+    }
+
+
+def environment() -> Dict:
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'machine': platform.machine(),
+        'system': platform.system(),
+    }
+
+
+def compare(name: str, result: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """ベースラインと比べて悪化した項目"""
+    base = baseline.get(name)
+    if base is None:
+        return []
+    regressions = []
+    if result['ops_per_sec'] < base['ops_per_sec'] * (1 - threshold):
+        regressions.append(
+            f"ops/sec {base['ops_per_sec']:,.0f} → {result['ops_per_sec']:,.0f}"
+        )
+    if result['bytes_per_op'] > base['bytes_per_op'] * (1 + threshold) + MEMORY_SLACK:
+        regressions.append(
+            f"一時メモリ {base['bytes_per_op']:,.0f}B → {result['bytes_per_op']:,.0f}B"
+        )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='ホットパスのマイクロベンチマーク')
+    parser.add_argument('filter', nargs='?', default='', help='実行するベンチマーク名の一部')
+    parser.add_argument('--save', action='store_true', help='結果をベースラインとして保存')
+    parser.add_argument('--threshold', type=float, default=0.15, help='悪化とみなす割合')
+    parser.add_argument('--baseline', default=BASELINE_PATH, help='ベースラインのパス')
+    args = parser.parse_args()
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            saved = json.load(f)
+        if saved.get('environment') != environment():
+            print(f"⚠️ ベースラインの計測環境が異なります: {saved.get('environment')}")
+        baseline = saved.get('results', {})
+
+    results = {}
+    failed = False
+    print(f"{'ベンチマーク':<44} {'ops/sec':>12} {'B/op':>9} {'基準比':>7}")
+    for name, prepare in bench_cases():
+        if args.filter not in name:
+            continue
+        result = results[name] = measure(prepare)
+        base = baseline.get(name)
+        ratio = f"{result['ops_per_sec'] / base['ops_per_sec']:.2f}x" if base else '-'
+        print(f"{name:<44} {result['ops_per_sec']:>12,.0f} {result['bytes_per_op']:>9,.0f} {ratio:>7}")
+        for regression in compare(name, result, baseline, args.threshold):
+            print(f"  ❌ 悪化: {regression}")
+            failed = True
+
+    if args.save:
+        merged = dict(baseline)
+        merged.update(results)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump({'environment': environment(), 'results': merged}, f, ensure_ascii=False, indent=2)
+        print(f"ベースラインを保存しました: {args.baseline}")
+    elif failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
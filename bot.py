@@ -8,102 +8,492 @@ from discord import app_commands
 from discord.ui import Button, View
 import asyncio
 import random
-from datetime import datetime, timedelta
-from typing import Optional, List, Dict
-import json
-import re
+import sys
+import time
+from datetime import datetime
+from typing import Optional, List, Dict, Set
 
 # 設定インポート
 from config import (
     BOT_TOKEN,
     ALLOWED_CHANNEL_IDS,
-    DEBATE_TOPICS,
-    PROHIBITED_WORDS,
-    EVALUATION_CRITERIA,
-    MAX_DEBATE_ROUNDS,
+    GUILD_POLICY_OVERRIDES,
+    SCORING_STAGES,
+    SCORING_THREAD_WORKERS,
+    SCORING_PROCESS_WORKERS,
     DEFAULT_RECRUIT_TIME,
     DEFAULT_MESSAGE_LIMIT,
-    ADMIN_ROLE_NAMES
+    TURN_TIME_LIMIT,
+    TURN_REMINDER_BEFORE,
+    TOURNAMENT_CHANNEL_IDS,
+    TOURNAMENT_MAX_PARALLEL_MATCHES,
+    TOURNAMENT_RETRY_DELAY,
+    TOURNAMENT_MAX_START_FAILURES,
+    SPECTATOR_REACTIONS,
+    SCOREBOARD_UPDATE_INTERVAL,
+    MODERATION_CACHE_SIZE,
+    LEAN_GATEWAY_MODE,
+    SHARD_COUNT,
+    SHARD_IDS,
+    SESSION_DB_PATH,
+    SESSION_SNAPSHOT_INTERVAL,
+    LOG_DIRECTORY,
+    LOG_RETENTION_DAYS,
+    LOG_QUEUE_SIZE,
+    CHANNEL_MESSAGE_RATE_LIMIT,
+    CHANNEL_MESSAGE_RATE_PERIOD,
+    ROSTER_UPDATE_INTERVAL,
+    COMMAND_SYNC_STATE_PATH,
+    COMMAND_SYNC_GUILD_IDS,
+    FORCE_COMMAND_SYNC,
+    METRICS_HOST,
+    METRICS_PORT,
+    LIVE_CONFIG_PATH,
+    CONFIG_RELOAD_INTERVAL
 )
+from live_config import ConfigWatcher, RuntimeConfig
+from guild_policy import GuildPolicy, GuildPolicyCache
+from scorer_pipeline import ScoringPipeline, load_stages
+from tournament import Match, Tournament, decide_winner
+from spectators import ReactionTally
+from moderation import ModerationHit
+from verdict_cache import VerdictCache
+from scoring import DebateScorer
+from transcript import Transcript
+from archiver import TranscriptArchiver
+from scheduler import DeadlineScheduler
+from outbound import OutboundDispatcher, PRIORITY_MODERATION
+from command_sync import sync_commands
+from metrics import REGISTRY, MetricsServer
+from session_store import (
+    SessionStore,
+    paused_gc,
+    new_state,
+    EVENT_CREATE,
+    EVENT_MESSAGE,
+    EVENT_DEADLINE,
+    EVENT_JOIN,
+    EVENT_START,
+    EVENT_TURN,
+    EVENT_VIOLATION,
+    EVENT_FORFEIT,
+    EVENT_END
+)
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# 起動時刻（on_readyまでの所要時間の計測用）
+PROCESS_STARTED = time.perf_counter()
+
+
+def build_gateway_options(lean: bool) -> Dict:
+    """
+    ゲートウェイ接続のオプション（Intents・メンバーキャッシュ・起動時チャンキング）
+    
+    軽量モードではメンバー一覧を取得・保持しない。コマンド実行者とメッセージ送信者は
+    インタラクション・メッセージに含まれる情報から都度生成されるため、権限確認や
+    ディベーターの判定（ユーザーIDで比較）には影響しない。
+    """
+    if lean:
+        intents = discord.Intents.none()
+        intents.guilds = True
+        intents.guild_messages = True
+        intents.message_content = True
+        intents.guild_reactions = SPECTATOR_REACTIONS
+        return {
+            'intents': intents,
+            'member_cache_flags': discord.MemberCacheFlags.none(),
+            'chunk_guilds_at_startup': False,
+        }
+    
+    intents = discord.Intents.default()
+    intents.message_content = True
+    intents.members = True
+    intents.guild_reactions = SPECTATOR_REACTIONS
+    return {'intents': intents}
+
+
+def resident_memory_mb() -> Optional[float]:
+    """プロセスの最大常駐メモリ（MB）。取得できない環境ではNone"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linuxはキロバイト、macOSはバイト単位
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
 
-# Intents設定
-intents = discord.Intents.default()
-intents.message_content = True
-intents.members = True
 
 # Botクライアント
-class DebateBot(discord.Client):
+# 担当シャードのイベント（インタラクションを含む）だけを受け取るため、セッションは
+# 担当シャードに属するサーバーのものだけを保持する
+class DebateBot(discord.AutoShardedClient):
     def __init__(self):
-        super().__init__(intents=intents)
+        super().__init__(
+            shard_count=SHARD_COUNT,
+            shard_ids=SHARD_IDS,
+            **build_gateway_options(LEAN_GATEWAY_MODE)
+        )
         self.tree = app_commands.CommandTree(self)
         self.active_sessions: Dict[int, 'DebateSession'] = {}
+        self.tournaments: Dict[int, Tournament] = {}  # 開催チャンネルID: トーナメント
+        self.session_store: Optional[SessionStore] = None
+        # 前回のスナップショット以降にイベントを記録したチャンネル（次のスナップショットで状態を保存する）
+        self.snapshot_pending: Set[int] = set()
+        self.snapshot_task: Optional[asyncio.Task] = None
+        self.archiver: Optional[TranscriptArchiver] = None
+        self.metrics_server: Optional[MetricsServer] = None
+        self.scheduler = DeadlineScheduler()  # 募集締切などの締切を一括管理
+        self.outbound = OutboundDispatcher(
+            channel_limit=CHANNEL_MESSAGE_RATE_LIMIT,
+            channel_period=CHANNEL_MESSAGE_RATE_PERIOD,
+            global_limit=self.global_rate_limit_share()
+        )  # チャンネルへの通知を集約して送信
+        # 議題・禁止コンテンツ検出エンジン・管理者ロール名（設定ファイルの変更時に差し替え）
+        self.config_watcher = ConfigWatcher(LIVE_CONFIG_PATH, CONFIG_RELOAD_INTERVAL, self.apply_runtime_config)
+        self.runtime: RuntimeConfig = self.config_watcher.load_initial()
+        # サーバーごとの管理者ロールIDと許可チャンネル（ロールの変更・設定の再読み込みで破棄）
+        self.policies = GuildPolicyCache(ALLOWED_CHANNEL_IDS, GUILD_POLICY_OVERRIDES)
+        self.verdicts = VerdictCache(MODERATION_CACHE_SIZE)  # 禁止コンテンツ判定のキャッシュ
+        # 終了時の評価（追加の評価ステージはスレッド・プロセスで実行）
+        self.scoring = ScoringPipeline(
+            load_stages(SCORING_STAGES),
+            thread_workers=SCORING_THREAD_WORKERS,
+            process_workers=SCORING_PROCESS_WORKERS
+        )
+    
+    @property
+    def is_shard_group(self) -> bool:
+        """launcher.py から一部のシャードだけを担当するプロセスとして起動されたか"""
+        return SHARD_IDS is not None
+    
+    def global_rate_limit_share(self, limit: int = 50) -> int:
+        """Bot全体のレート制限（50回/秒）のうち、このプロセスが使える分"""
+        if not self.is_shard_group:
+            return limit
+        return max(1, limit * len(SHARD_IDS) // SHARD_COUNT)
+    
+    def apply_runtime_config(self, runtime: RuntimeConfig):
+        """
+        再読み込みした設定に差し替え
+        各イベントの処理は開始時に参照した設定を使い続けるため、代入1回で切り替わる
+        """
+        previous = self.runtime
+        self.runtime = runtime
+        # 管理者ロール名が変わりうるため、解決済みのロールIDを破棄
+        self.policies.clear()
+        # 判定キャッシュのキーはルールセットごとに異なるため、古い判定は参照されない（メモリだけ先に解放）
+        if previous.moderation_engine.ruleset_version != runtime.moderation_engine.ruleset_version:
+            self.verdicts.clear()
         
     async def setup_hook(self):
-        await self.tree.sync()
-        print("コマンドツリーを同期しました")
+        # ディベートログのアーカイブを開始
+        self.archiver = TranscriptArchiver(
+            LOG_DIRECTORY,
+            LOG_RETENTION_DAYS,
+            LOG_QUEUE_SIZE,
+            file_suffix=f"shard{SHARD_IDS[0]}" if self.is_shard_group else None
+        )
+        self.archiver.start()
+        
+        # 設定ファイルの監視を開始
+        self.config_watcher.start()
+        
+        # メトリクスの公開を開始
+        if METRICS_PORT:
+            port = METRICS_PORT + (SHARD_IDS[0] if self.is_shard_group else 0)
+            self.metrics_server = MetricsServer(REGISTRY, METRICS_HOST, port)
+            try:
+                await self.metrics_server.start()
+                print(f"メトリクスを http://{METRICS_HOST}:{port}/metrics で公開しています")
+            except OSError as e:
+                self.metrics_server = None
+                print(f"⚠️ メトリクスの公開を開始できませんでした: {e}")
+        
+        # 前回終了時に進行中だったセッションを復元（担当シャードの分のみ）
+        self.session_store = SessionStore(SESSION_DB_PATH, SHARD_IDS, SHARD_COUNT)
+        started = time.perf_counter()
+        with paused_gc():
+            restored = restore_sessions(self.session_store.recover())
+        print(f"セッションを{restored}件復元しました（{(time.perf_counter() - started) * 1000:.0f}ms）")
+        await save_snapshot(full=True)
+        self.snapshot_task = self.loop.create_task(self.snapshot_loop())
+        
+        # コマンドはBot全体で共通のため、シャード0を担当するプロセスだけが同期する
+        if self.is_shard_group and 0 not in SHARD_IDS:
+            return
+        
+        # コマンド定義が変わったときだけ同期
+        started = time.perf_counter()
+        synced = await sync_commands(
+            self.tree, COMMAND_SYNC_STATE_PATH, COMMAND_SYNC_GUILD_IDS, force=FORCE_COMMAND_SYNC
+        )
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if synced:
+            print(f"コマンドツリーを同期しました（{', '.join(synced)}、{elapsed_ms:.0f}ms）")
+        else:
+            print(f"コマンド定義に変更がないため同期を省略しました（{elapsed_ms:.0f}ms）")
+    
+    async def close(self):
+        # 書き込み待ちのディベートログを保存してから終了
+        await self.outbound.drain()
+        self.config_watcher.close()
+        self.scoring.close()
+        if self.archiver is not None:
+            await self.archiver.close()
+        if self.metrics_server is not None:
+            await self.metrics_server.close()
+        if self.snapshot_task is not None:
+            # ストアを閉じた後にスナップショットを取らないよう、先に止める
+            self.snapshot_task.cancel()
+            self.snapshot_task = None
+        if self.session_store is not None:
+            # 書き込み待ちのイベントを保存
+            await asyncio.to_thread(self.session_store.close)
+            self.session_store = None
+        await super().close()
+    
+    async def snapshot_loop(self):
+        """定期的にセッションのスナップショットを保存"""
+        while not self.is_closed():
+            await asyncio.sleep(SESSION_SNAPSHOT_INTERVAL)
+            await save_snapshot()
 
 
 bot = DebateBot()
 
+# メトリクス
+on_message_seconds = REGISTRY.histogram('debate_on_message_seconds', 'on_messageの処理時間（秒）')
+moderation_seconds = REGISTRY.histogram('debate_moderation_seconds', '禁止コンテンツチェックの処理時間（秒）')
+evaluation_seconds = REGISTRY.histogram('debate_evaluation_seconds', 'ディベート評価の処理時間（秒）')
+accepted_turns = REGISTRY.counter('debate_turns_total', '受理された発言数')
+violations = REGISTRY.counter('debate_violations_total', '規約違反の検出数', ['kind'])
+out_of_turn_warnings = REGISTRY.counter('debate_out_of_turn_warnings_total', 'ターン外の発言への警告数')
+spectator_reactions = REGISTRY.counter('debate_spectator_reactions_total', '集計した観客のリアクション数', ['action'])
+reactions_added = spectator_reactions.labels('add')
+reactions_removed = spectator_reactions.labels('remove')
+REGISTRY.gauge('debate_active_sessions', '進行中・募集中のセッション数', lambda: len(bot.active_sessions))
+REGISTRY.gauge('debate_moderation_cache_entries', '禁止コンテンツ判定キャッシュの件数', lambda: len(bot.verdicts))
+REGISTRY.gauge(
+    'debate_moderation_cache_hit_ratio', '禁止コンテンツ判定キャッシュのヒット率（起動時から）',
+    lambda: bot.verdicts.hit_ratio
+)
+REGISTRY.gauge(
+    'debate_tournament_matches_running', '進行中のトーナメントの試合数',
+    lambda: sum(len(tournament.running) for tournament in bot.tournaments.values())
+)
+
+
+class MemberRef:
+    """セッションのメンバー（IDと表示名のみ保持し、discord.Memberを参照し続けない）"""
+    
+    __slots__ = ('id', 'display_name')
+    
+    def __init__(self, user_id: int, display_name: str):
+        self.id = user_id
+        self.display_name = display_name
+    
+    @property
+    def mention(self) -> str:
+        return f"<@{self.id}>"
+
 
 class DebateSession:
     """ディベートセッション管理クラス"""
     
+    __slots__ = (
+        'channel',
+        'guild_id',
+        'recruit_time',
+        'message_limit',
+        'max_chars',
+        'participants',
+        'debaters',
+        'topic',
+        'current_turn',
+        'transcript',
+        'violations',
+        'forfeits',
+        'is_active',
+        'is_recruiting',
+        'scorer',
+        'opponents',
+        'recruit_deadline',
+        'recruit_message_id',
+        'tournament',
+        'reactions',
+        'turn_message_ids',
+    )
+    
     def __init__(
         self,
         channel: discord.TextChannel,
         recruit_time: int,
         message_limit: int,
-        max_chars: int
+        max_chars: int,
+        guild_id: Optional[int] = None
     ):
         self.channel = channel
+        self.guild_id = guild_id
         self.recruit_time = recruit_time
         self.message_limit = message_limit
         self.max_chars = max_chars
         
-        self.participants: List[discord.Member] = []
-        self.debaters: List[discord.Member] = []
+        self.participants: Dict[int, MemberRef] = {}  # user_id: 参加者（登録順）
+        self.debaters: List[MemberRef] = []
         self.topic: str = ""
         self.current_turn: int = 0
-        self.debate_log: List[Dict] = []
+        self.transcript = Transcript()  # 発言記録（列指向）
         self.violations: Dict[int, int] = {}  # user_id: violation_count
+        self.forfeits: Dict[int, int] = {}  # user_id: 持ち時間切れでパスになったターン数
         self.is_active: bool = False
         self.is_recruiting: bool = True
+        self.scorer = DebateScorer()  # 発言ごとに評価を積算
+        self.opponents: Dict[int, MemberRef] = {}  # user_id: 対戦相手
+        self.recruit_deadline: float = time.time() + recruit_time * 60  # 募集締切（UNIX時刻）
+        self.recruit_message_id: Optional[int] = None
+        self.tournament: Optional[Tournament] = None  # トーナメントの試合の場合は所属するトーナメント
+        self.reactions = ReactionTally()  # 観客のリアクションの集計（永続化しない）
+        self.turn_message_ids: Set[int] = set()  # 受理した発言のメッセージID（編集時の再チェック用、永続化しない）
         
-    def add_participant(self, member: discord.Member) -> bool:
+    def to_state(self) -> Dict:
+        """永続化用の状態（辞書形式）に変換"""
+        state = new_state(
+            self.channel.id,
+            self.guild_id,
+            self.recruit_time,
+            self.message_limit,
+            self.max_chars,
+            self.recruit_deadline,
+            self.recruit_message_id
+        )
+        state['p'] = [[member.id, member.display_name] for member in self.participants.values()]
+        state['d'] = [[member.id, member.display_name] for member in self.debaters]
+        state['t'] = self.topic
+        state['ct'] = self.current_turn
+        state['log'] = self.transcript.rows()
+        state['sc'] = self.scorer.to_state()
+        state['v'] = {str(user_id): count for user_id, count in self.violations.items()}
+        state['ff'] = {str(user_id): count for user_id, count in self.forfeits.items()}
+        state['act'] = self.is_active
+        state['rec'] = self.is_recruiting
+        return state
+    
+    @classmethod
+    def from_state(cls, channel, state: Dict) -> 'DebateSession':
+        """永続化した状態からセッションを復元"""
+        session = cls(
+            channel=channel,
+            recruit_time=state['rt'],
+            message_limit=state['ml'],
+            max_chars=state['mc'],
+            guild_id=state['g']
+        )
+        session.recruit_deadline = state['dl']
+        session.recruit_message_id = state['m']
+        session.participants = {user_id: MemberRef(user_id, name) for user_id, name in state['p']}
+        if state['d']:
+            session.set_debaters([MemberRef(user_id, name) for user_id, name in state['d']])
+        session.topic = state['t']
+        session.transcript = Transcript.from_rows(state['log'])
+        # スナップショット以降の発言のみ評価を積算し直す
+        if state['sc'] is not None:
+            session.scorer = DebateScorer.from_state(state['sc'])
+        for author_id, author_name, content, _, _ in state['log'][session.scorer.entry_count:]:
+            session.scorer.add_entry(author_id, author_name, content)
+        session.current_turn = state['ct']
+        session.violations = {int(user_id): count for user_id, count in state['v'].items()}
+        session.forfeits = {int(user_id): count for user_id, count in state.get('ff', {}).items()}
+        session.is_active = state['act']
+        session.is_recruiting = state['rec']
+        return session
+    
+    def is_debater(self, user_id: int) -> bool:
+        """ディベーターか確認"""
+        return user_id in self.opponents
+    
+    def add_participant(self, member: MemberRef) -> bool:
         """参加者を追加"""
-        if member not in self.participants:
-            self.participants.append(member)
-            return True
-        return False
+        if member.id in self.participants:
+            return False
+        self.participants[member.id] = member
+        return True
+    
+    def set_debaters(self, debaters: List[MemberRef]):
+        """ディベーターを設定"""
+        self.debaters = debaters
+        self.opponents = {
+            debaters[0].id: debaters[1],
+            debaters[1].id: debaters[0],
+        }
     
     def select_debaters(self) -> bool:
         """ランダムで2名のディベーターを選出"""
         if len(self.participants) < 2:
             return False
-        self.debaters = random.sample(self.participants, 2)
+        self.set_debaters(random.sample(list(self.participants.values()), 2))
         return True
     
-    def get_current_debater(self) -> Optional[discord.Member]:
+    def get_current_debater(self) -> Optional[MemberRef]:
         """現在のターンの発言者を取得"""
         if not self.debaters:
             return None
         return self.debaters[self.current_turn % 2]
     
+    def get_opponent(self, user_id: int) -> Optional[MemberRef]:
+        """対戦相手を取得"""
+        return self.opponents.get(user_id)
+    
+    def get_turn_count(self, user_id: int) -> int:
+        """発言回数を取得（持ち時間切れでパスになったターンを含む）"""
+        return self.transcript.count_for(user_id) + self.forfeits.get(user_id, 0)
+    
+    def get_remaining_turns(self, user_id: int) -> int:
+        """残り発言回数を取得"""
+        return self.message_limit - self.get_turn_count(user_id)
+    
+    def forfeit_turn(self) -> MemberRef:
+        """現在のターンをパスにして次のターンに進め、パスになったディベーターを返す"""
+        debater = self.get_current_debater()
+        self.forfeits[debater.id] = self.forfeits.get(debater.id, 0) + 1
+        self.current_turn += 1
+        return debater
+    
     def add_violation(self, user_id: int) -> int:
         """違反回数を記録"""
         self.violations[user_id] = self.violations.get(user_id, 0) + 1
         return self.violations[user_id]
     
-    def log_message(self, author: discord.Member, content: str):
-        """発言をログに記録"""
-        self.debate_log.append({
-            'author_id': author.id,
-            'author_name': author.display_name,
-            'content': content,
-            'timestamp': datetime.now().isoformat(),
-            'turn': self.current_turn
-        })
+    @property
+    def debate_log(self) -> List[Dict]:
+        """発言ログを辞書形式のリストで取得（呼び出しごとに生成）"""
+        return self.transcript.entries()
+    
+    def log_message(self, author: discord.Member, content: str) -> List:
+        """発言をログに記録し、記録した発言を row 形式で返す"""
+        self.transcript.append(author.id, author.display_name, content, self.current_turn)
+        self.scorer.add_entry(author.id, author.display_name, content)
+        return self.transcript.row(len(self.transcript) - 1)
+
+
+def build_consent_embed() -> discord.Embed:
+    """参加にあたっての確認事項（参加登録時に本人にのみ表示）"""
+    return discord.Embed(
+        title="📋 参加にあたっての確認事項",
+        description=(
+            "本ディベートは**娯楽・学習目的**です。\n\n"
+            "**以下の行為は禁止されています：**\n"
+            "• 人格攻撃・侮辱・誹謗中傷\n"
+            "• 実在人物・団体への言及\n"
+            "• 政治・宗教・差別的発言\n\n"
+            "**重要：**\n"
+            "Botによる評価は参考意見であり、\n"
+            "正誤や優劣を断定するものではありません。\n\n"
+            "上記に同意いただける場合のみ参加してください。"
+        ),
+        color=discord.Color.blue()
+    )
 
 
 class ParticipantView(View):
@@ -115,142 +505,368 @@ class ParticipantView(View):
     
     @discord.ui.button(label="参加する", style=discord.ButtonStyle.primary, custom_id="join_debate")
     async def join_button(self, interaction: discord.Interaction, button: Button):
-        # 同意メッセージを表示
-        consent_embed = discord.Embed(
-            title="📋 参加にあたっての確認事項",
-            description=(
-                "本ディベートは**娯楽・学習目的**です。\n\n"
-                "**以下の行為は禁止されています：**\n"
-                "• 人格攻撃・侮辱・誹謗中傷\n"
-                "• 実在人物・団体への言及\n"
-                "• 政治・宗教・差別的発言\n\n"
-                "**重要：**\n"
-                "Botによる評価は参考意見であり、\n"
-                "正誤や優劣を断定するものではありません。\n\n"
-                "上記に同意いただける場合のみ参加してください。"
-            ),
-            color=discord.Color.blue()
-        )
-        
-        # 既に参加済みかチェック
-        if interaction.user in self.session.participants:
+        # 参加登録（Memberオブジェクトは保持せず、IDと表示名のみ記録）
+        if not self.session.add_participant(MemberRef(interaction.user.id, interaction.user.display_name)):
             await interaction.response.send_message(
                 "✅ 既に参加登録されています。",
                 ephemeral=True
             )
             return
         
-        # 参加登録
-        self.session.add_participant(interaction.user)
+        record_event(
+            self.session.channel.id,
+            EVENT_JOIN,
+            {'u': [interaction.user.id, interaction.user.display_name]}
+        )
         
         await interaction.response.send_message(
-            embed=consent_embed,
+            embed=build_consent_embed(),
             ephemeral=True
         )
         
-        # 公開メッセージで参加を通知
-        await self.session.channel.send(
-            f"✅ {interaction.user.mention} が参加登録しました（現在 {len(self.session.participants)} 名）"
-        )
+        # 募集メッセージの参加人数を更新（参加が続いても一定間隔でまとめて編集する）
+        schedule_roster_update(self.session)
 
 
-def check_prohibited_content(text: str) -> tuple[bool, Optional[str]]:
-    """禁止コンテンツチェック"""
-    
-    # 禁止ワードチェック
-    for word in PROHIBITED_WORDS:
-        if word in text.lower():
-            return False, f"禁止ワード「{word}」が含まれています"
-    
-    # 人称攻撃パターンチェック
-    attack_patterns = [
-        r'お前[はが]',
-        r'あなた[はが].*?馬鹿',
-        r'君[はが].*?無知',
-        r'てめー',
-        r'貴様'
+def record_event(channel_id: int, kind: str, payload: Dict):
+    """セッションのイベントを永続化"""
+    if bot.session_store is not None:
+        bot.session_store.record(channel_id, kind, payload)
+        bot.snapshot_pending.add(channel_id)
+
+
+def remove_session(channel_id: int):
+    """セッションを削除"""
+    bot.scheduler.cancel(('recruit', channel_id))
+    bot.scheduler.cancel(('roster', channel_id))
+    bot.scheduler.cancel(('scoreboard', channel_id))
+    bot.scheduler.cancel(('turn', channel_id))
+    if bot.active_sessions.pop(channel_id, None) is not None:
+        record_event(channel_id, EVENT_END, {})
+
+
+def build_recruit_embed(session: DebateSession) -> discord.Embed:
+    """募集メッセージのEmbed（参加人数を含む）"""
+    return discord.Embed(
+        title="🎯 Debate Arena - 参加者募集",
+        description=(
+            f"**募集時間:** {session.recruit_time}分\n"
+            f"**発言制限:** {session.message_limit}回/人\n"
+            f"**最大文字数:** {session.max_chars}文字/発言\n"
+            f"**参加者:** {len(session.participants)}名\n\n"
+            "下のボタンから参加登録してください。\n"
+            "参加者の中からランダムで2名が選出されます。"
+        ),
+        color=discord.Color.green()
+    )
+
+
+def schedule_throttled(key: tuple, callback, interval: float = ROSTER_UPDATE_INTERVAL):
+    """
+    interval秒後の処理を予約
+    既に予約済みなら何もしないため、処理は一定間隔に1回までになる
+    """
+    if key not in bot.scheduler:
+        bot.scheduler.schedule(key, time.time() + interval, callback)
+
+
+def schedule_roster_update(session: DebateSession):
+    """募集メッセージの参加人数の更新を予約"""
+    schedule_throttled(('roster', session.channel.id), lambda: update_recruit_message(session))
+
+
+async def update_recruit_message(session: DebateSession):
+    """募集メッセージを現在の参加人数で編集"""
+    if bot.active_sessions.get(session.channel.id) is not session or session.recruit_message_id is None:
+        return
+    bot.outbound.edit(session.channel, session.recruit_message_id, embed=build_recruit_embed(session))
+
+
+def format_cheers(session: DebateSession) -> str:
+    """ディベーターごとの応援数と件数の多い絵文字"""
+    tally = session.reactions
+    lines = [
+        f"{debater.display_name}: {tally.cheers.get(debater.id, 0)}件" for debater in session.debaters
     ]
+    top = tally.top_emojis()
+    if top:
+        lines.append("  ".join(f"{emoji} {count}" for emoji, count in top))
+    return "\n".join(lines)
+
+
+def build_scoreboard_embed(session: DebateSession) -> discord.Embed:
+    """観客の応援のスコアボード"""
+    return discord.Embed(
+        title="📣 観客の応援",
+        description=(
+            f"{format_cheers(session)}\n\n"
+            "ディベーターの発言へのリアクションを応援として集計しています。\n"
+            "応援の数は勝敗・評価には影響しません。"
+        ),
+        color=discord.Color.gold()
+    )
+
+
+def schedule_scoreboard_update(session: DebateSession):
+    """スコアボードの更新を予約"""
+    schedule_throttled(
+        ('scoreboard', session.channel.id),
+        lambda: update_scoreboard(session),
+        SCOREBOARD_UPDATE_INTERVAL
+    )
+
+
+async def update_scoreboard(session: DebateSession):
+    """スコアボードを現在の集計で送信（2回目以降は編集）"""
+    tally = session.reactions
+    if bot.active_sessions.get(session.channel.id) is not session or tally.posting or not tally.dirty:
+        return
+    tally.mark_rendered()
+    embed = build_scoreboard_embed(session)
+    if tally.scoreboard_message_id is not None:
+        bot.outbound.edit(session.channel, tally.scoreboard_message_id, embed=embed)
+        return
     
-    for pattern in attack_patterns:
-        if re.search(pattern, text):
-            return False, "人格攻撃的な表現が含まれています"
-    
-    return True, None
+    # 以降の編集にメッセージIDが必要なため、初回は直接送信する
+    tally.posting = True
+    try:
+        message = await session.channel.send(embed=embed)
+    except discord.HTTPException as e:
+        print(f"⚠️ スコアボードの送信に失敗しました（チャンネル {session.channel.id}）: {e}")
+        return
+    finally:
+        tally.posting = False
+    tally.scoreboard_message_id = message.id
+    if tally.dirty:
+        # 送信中に届いたリアクションを反映
+        schedule_scoreboard_update(session)
 
 
-def evaluate_debate(log: List[Dict]) -> Dict:
+def schedule_recruitment_close(session: DebateSession):
+    """募集締切をスケジューラに登録"""
+    bot.scheduler.schedule(
+        ('recruit', session.channel.id),
+        session.recruit_deadline,
+        lambda: close_recruitment(session)
+    )
+
+
+def schedule_turn_deadline(session: DebateSession):
     """
-    ディベート評価関数
-    LLM不使用の基本的なヒューリスティック評価
+    現在の発言者の持ち時間を登録（受理した発言・パスのたびに置き換える）
+    リマインドと持ち時間切れは同じキーで順に登録するため、セッションあたりの締切は常に1件
+    """
+    if TURN_TIME_LIMIT <= 0:
+        return
+    turn = session.current_turn
+    deadline = time.time() + TURN_TIME_LIMIT
+    if 0 < TURN_REMINDER_BEFORE < TURN_TIME_LIMIT:
+        bot.scheduler.schedule(
+            ('turn', session.channel.id),
+            deadline - TURN_REMINDER_BEFORE,
+            lambda: remind_turn(session, turn, deadline)
+        )
+    else:
+        bot.scheduler.schedule(('turn', session.channel.id), deadline, lambda: expire_turn(session, turn))
+
+
+def is_current_turn(session: DebateSession, turn: int) -> bool:
+    """締切を登録したターンが進行中のままか"""
+    return (
+        bot.active_sessions.get(session.channel.id) is session
+        and session.is_active
+        and session.current_turn == turn
+    )
+
+
+async def remind_turn(session: DebateSession, turn: int, deadline: float):
+    """持ち時間の残りを通知し、持ち時間切れを登録"""
+    if not is_current_turn(session, turn):
+        return
+    bot.outbound.post(
+        session.channel,
+        f"⏰ {session.get_current_debater().mention} 持ち時間は残り{TURN_REMINDER_BEFORE}秒です。"
+    )
+    bot.scheduler.schedule(('turn', session.channel.id), deadline, lambda: expire_turn(session, turn))
+
+
+async def expire_turn(session: DebateSession, turn: int):
+    """持ち時間切れのターンをパスにして次に進める"""
+    if not is_current_turn(session, turn):
+        return
+    debater = session.forfeit_turn()
+    record_event(session.channel.id, EVENT_FORFEIT, {'u': debater.id, 'ct': session.current_turn})
+    bot.outbound.post(
+        session.channel,
+        f"⌛ {debater.mention} の持ち時間（{TURN_TIME_LIMIT}秒）が過ぎたため、このターンはパスになりました。"
+    )
+    await advance_turn(session, debater)
+
+
+async def archive_session(session: DebateSession, reason: str, scores: Optional[Dict] = None):
     """
+    ディベートの発言記録と評価をアーカイブ
     
-    # 各ディベーターのスコアを初期化
-    scores = {}
+    reason: 'completed'（発言制限到達）/ 'violation'（違反による強制終了）/ 'stopped'（管理者による終了）
+    """
+    if bot.archiver is None or not session.debaters:
+        return
     
-    for entry in log:
-        author_id = entry['author_id']
-        content = entry['content']
-        
-        if author_id not in scores:
-            scores[author_id] = {
-                'name': entry['author_name'],
-                'consistency': 0,
-                'clarity': 0,
-                'structure': 0,
-                'calmness': 0,
-                'total': 0
-            }
-        
-        # 論点の一貫性（文字数で簡易評価）
-        if len(content) > 50:
-            scores[author_id]['consistency'] += 2
-        
-        # 主張の明確さ（句点の数で評価）
-        scores[author_id]['clarity'] += min(content.count('。'), 5)
-        
-        # 構造性（接続詞の使用）
-        structure_words = ['しかし', 'したがって', 'なぜなら', 'つまり', 'また']
-        for word in structure_words:
-            if word in content:
-                scores[author_id]['structure'] += 1
-        
-        # 感情的表現の少なさ（感嘆符の少なさ）
-        exclamation_count = content.count('!') + content.count('!')
-        scores[author_id]['calmness'] += max(10 - exclamation_count * 2, 0)
-    
-    # 各項目を0-10に正規化
-    for author_id in scores:
-        max_cons = max(s['consistency'] for s in scores.values())
-        max_clar = max(s['clarity'] for s in scores.values())
-        max_struct = max(s['structure'] for s in scores.values())
-        
-        if max_cons > 0:
-            scores[author_id]['consistency'] = min(10, (scores[author_id]['consistency'] / max_cons) * 10)
-        if max_clar > 0:
-            scores[author_id]['clarity'] = min(10, (scores[author_id]['clarity'] / max_clar) * 10)
-        if max_struct > 0:
-            scores[author_id]['structure'] = min(10, (scores[author_id]['structure'] / max_struct) * 10)
-        
-        scores[author_id]['calmness'] = min(10, scores[author_id]['calmness'] / len(log) * 2)
+    await bot.archiver.submit({
+        'channel_id': session.channel.id,
+        'guild_id': session.guild_id,
+        'topic': session.topic,
+        'debaters': [
+            {'id': debater.id, 'name': debater.display_name} for debater in session.debaters
+        ],
+        'message_limit': session.message_limit,
+        'max_chars': session.max_chars,
+        'ended_at': datetime.now().isoformat(),
+        'end_reason': reason,
+        'violations': session.violations,
+        'reactions': session.reactions.to_record(),
+        'log': session.debate_log,
+        'scores': scores,
+    })
+
+
+async def save_snapshot(full: bool = False):
+    """
+    セッションのスナップショットを保存（書き込みはスレッドで実行）
+
+    前回のスナップショット以降にイベントを記録したセッションだけを状態に変換して保存する
+    （発言記録の変換はセッションの発言数に比例するため、変化のないセッションは変換しない）。
+    fullを指定するとすべてのセッションを保存し直す（復元直後に使う）。
+    """
+    store = bot.session_store
+    if store is None:
+        # 終了処理でストアを閉じた後
+        return
+    # 状態の取得までにイベントが追加されないよう、awaitを挟まずに取得する
+    flushed = store.flush()
+    changed = bot.snapshot_pending
+    bot.snapshot_pending = set()
+    if full:
+        states = {channel_id: session.to_state() for channel_id, session in bot.active_sessions.items()}
+        replaced = None
+    else:
+        states = {
+            channel_id: session.to_state()
+            for channel_id in changed
+            if (session := bot.active_sessions.get(channel_id)) is not None
+        }
+        replaced = changed
+    try:
+        await asyncio.to_thread(store.snapshot, states, flushed, replaced)
+    except BaseException:
+        # 保存できなかったセッションは次のスナップショットで保存する
+        bot.snapshot_pending |= changed
+        raise
+
+
+def restore_sessions(states: Dict[int, Dict]) -> int:
+    """永続化した状態からセッションを復元し、復元件数を返す"""
+    for channel_id, state in states.items():
+        channel = bot.get_partial_messageable(channel_id, guild_id=state['g'])
+        session = DebateSession.from_state(channel, state)
+        bot.active_sessions[channel_id] = session
         
-        # 合計スコア
-        scores[author_id]['total'] = (
-            scores[author_id]['consistency'] +
-            scores[author_id]['clarity'] +
-            scores[author_id]['structure'] +
-            scores[author_id]['calmness']
-        )
-    
-    return scores
+        if session.is_recruiting:
+            # 募集メッセージのボタンを再登録し、残り時間で締め切る
+            if session.recruit_message_id is not None:
+                bot.add_view(ParticipantView(session), message_id=session.recruit_message_id)
+            schedule_recruitment_close(session)
+        elif session.is_active:
+            # 停止中の時間は数えず、現在の発言者の持ち時間を改めて設定
+            schedule_turn_deadline(session)
+    
+    return len(states)
 
 
 @bot.event
 async def on_ready():
     print(f'✅ {bot.user} としてログインしました')
     print(f'Bot ID: {bot.user.id}')
+    
+    # 起動時間とメモリ使用量（モードごとの比較用）
+    mode = "軽量" if LEAN_GATEWAY_MODE else "通常"
+    memory = resident_memory_mb()
+    memory_text = f"{memory:.1f}MB" if memory is not None else "不明"
+    print(f"シャード: {', '.join(map(str, sorted(bot.shards)))}（全{bot.shard_count}シャード）")
+    print(
+        f"ゲートウェイ: {mode}モード / サーバー数 {len(bot.guilds)} / "
+        f"キャッシュ済みメンバー {sum(len(guild.members) for guild in bot.guilds)} / "
+        f"起動時間 {time.perf_counter() - PROCESS_STARTED:.2f}秒 / 最大常駐メモリ {memory_text}"
+    )
     print('準備完了！')
 
 
+def guild_policy(guild: Optional[discord.Guild]) -> GuildPolicy:
+    """サーバーのポリシー（管理者ロールID・許可チャンネル）を取得"""
+    return bot.policies.get(guild, bot.runtime.admin_role_names)
+
+
+def has_debate_permission(member: discord.Member) -> bool:
+    """管理者または指定ロールを持つか確認"""
+    return guild_policy(member.guild).is_admin(member)
+
+
+@bot.event
+async def on_guild_role_create(role: discord.Role):
+    bot.policies.invalidate(role.guild.id)
+
+
+@bot.event
+async def on_guild_role_update(before: discord.Role, after: discord.Role):
+    if before.name != after.name:
+        bot.policies.invalidate(after.guild.id)
+
+
+@bot.event
+async def on_guild_role_delete(role: discord.Role):
+    bot.policies.invalidate(role.guild.id)
+
+
+@bot.event
+async def on_guild_remove(guild: discord.Guild):
+    bot.policies.invalidate(guild.id)
+
+
+def spectated_session(payload: discord.RawReactionActionEvent) -> Optional[DebateSession]:
+    """
+    リアクションを集計するセッション
+    進行中のディベートで受理した発言への、観客（ディベーター本人とBot以外）のリアクションのみ
+    """
+    if not SPECTATOR_REACTIONS:
+        return None
+    session = bot.active_sessions.get(payload.channel_id)
+    if session is None or not session.is_active or payload.message_id not in session.reactions.message_authors:
+        return None
+    if session.is_debater(payload.user_id) or (bot.user is not None and payload.user_id == bot.user.id):
+        return None
+    return session
+
+
+@bot.event
+async def on_raw_reaction_add(payload: discord.RawReactionActionEvent):
+    """観客のリアクションを集計（送信はスコアボードの更新時にまとめて行う）"""
+    session = spectated_session(payload)
+    if session is not None:
+        session.reactions.add(payload.message_id, str(payload.emoji))
+        reactions_added.inc()
+        schedule_scoreboard_update(session)
+
+
+@bot.event
+async def on_raw_reaction_remove(payload: discord.RawReactionActionEvent):
+    """観客のリアクションの取り消しを集計"""
+    session = spectated_session(payload)
+    if session is not None:
+        session.reactions.remove(payload.message_id, str(payload.emoji))
+        reactions_removed.inc()
+        schedule_scoreboard_update(session)
+
+
 @bot.tree.command(name="debate", description="ディベートセッションを作成します（管理者のみ）")
 @app_commands.describe(
     recruit_time="募集時間（分）",
@@ -266,16 +882,7 @@ async def create_debate(
     """ディベートセッション作成コマンド"""
     
     # 権限チェック
-    has_permission = False
-    if interaction.user.guild_permissions.administrator:
-        has_permission = True
-    else:
-        for role in interaction.user.roles:
-            if role.name in ADMIN_ROLE_NAMES:
-                has_permission = True
-                break
-    
-    if not has_permission:
+    if not has_debate_permission(interaction.user):
         await interaction.response.send_message(
             "❌ このコマンドは管理者または指定ロールのみ実行可能です。",
             ephemeral=True
@@ -283,7 +890,7 @@ async def create_debate(
         return
     
     # チャンネルチェック
-    if ALLOWED_CHANNEL_IDS and interaction.channel_id not in ALLOWED_CHANNEL_IDS:
+    if not guild_policy(interaction.guild).allows_channel(interaction.channel_id):
         await interaction.response.send_message(
             "❌ このチャンネルではディベートを開催できません。",
             ephemeral=True
@@ -303,55 +910,68 @@ async def create_debate(
         channel=interaction.channel,
         recruit_time=recruit_time,
         message_limit=message_limit,
-        max_chars=max_chars
+        max_chars=max_chars,
+        guild_id=interaction.guild_id
     )
     
     bot.active_sessions[interaction.channel_id] = session
+    record_event(interaction.channel_id, EVENT_CREATE, session.to_state())
     
     # 募集メッセージ
-    recruit_embed = discord.Embed(
-        title="🎯 Debate Arena - 参加者募集",
-        description=(
-            f"**募集時間:** {recruit_time}分\n"
-            f"**発言制限:** {message_limit}回/人\n"
-            f"**最大文字数:** {max_chars}文字/発言\n\n"
-            "下のボタンから参加登録してください。\n"
-            "参加者の中からランダムで2名が選出されます。"
-        ),
-        color=discord.Color.green()
-    )
-    
     await interaction.response.send_message(
-        embed=recruit_embed,
+        embed=build_recruit_embed(session),
         view=ParticipantView(session)
     )
     
+    # 再起動後にボタンを再登録できるよう募集メッセージIDを記録
+    recruit_message = await interaction.original_response()
+    session.recruit_message_id = recruit_message.id
+    record_event(interaction.channel_id, EVENT_MESSAGE, {'m': recruit_message.id})
+    
     # 募集時間終了後の処理
-    await asyncio.sleep(recruit_time * 60)
+    schedule_recruitment_close(session)
+
+
+async def close_recruitment(session: DebateSession):
+    """募集を締め切り、ディベーターを選出して開始"""
     
-    # セッションが削除されていないかチェック
-    if interaction.channel_id not in bot.active_sessions:
+    channel_id = session.channel.id
+    
+    # セッションが削除・置き換えされていないかチェック
+    if bot.active_sessions.get(channel_id) is not session or not session.is_recruiting:
         return
     
-    session = bot.active_sessions[interaction.channel_id]
     session.is_recruiting = False
+    # 未反映の参加人数があれば確定した人数で募集メッセージを更新
+    bot.scheduler.fire_now(('roster', channel_id))
     
     # 参加者が2名未満の場合
     if len(session.participants) < 2:
-        await interaction.channel.send(
+        bot.outbound.post(
+            session.channel,
             "⚠️ 参加者が2名未満のため、ディベートを開始できませんでした。"
         )
-        del bot.active_sessions[interaction.channel_id]
+        remove_session(channel_id)
         return
     
     # ディベーター選出
     session.select_debaters()
-    session.topic = random.choice(DEBATE_TOPICS)
+    session.topic = random.choice(bot.runtime.topics)
     session.is_active = True
+    record_event(channel_id, EVENT_START, {
+        'd': [[debater.id, debater.display_name] for debater in session.debaters],
+        't': session.topic
+    })
     
     # 開始メッセージ
-    start_embed = discord.Embed(
-        title="⚔️ ディベート開始！",
+    bot.outbound.post(session.channel, embed=build_start_embed(session))
+    schedule_turn_deadline(session)
+
+
+def build_start_embed(session: DebateSession, title: str = "⚔️ ディベート開始！") -> discord.Embed:
+    """ディベート開始メッセージのEmbed"""
+    return discord.Embed(
+        title=title,
         description=(
             f"**議題:** {session.topic}\n\n"
             f"**ディベーター:**\n"
@@ -363,16 +983,47 @@ async def create_debate(
             "• 人格攻撃は禁止です\n"
             "• 議題から逸脱しないでください\n"
             "• 違反3回で強制終了となります"
+            + (f"\n• 1ターンの持ち時間は{TURN_TIME_LIMIT}秒です（過ぎるとパス）" if TURN_TIME_LIMIT > 0 else "")
         ),
         color=discord.Color.gold()
     )
-    
-    await interaction.channel.send(embed=start_embed)
 
 
 @bot.event
 async def on_message(message: discord.Message):
     """メッセージ監視（ディベート進行）"""
+    started = time.perf_counter()
+    try:
+        await handle_debate_message(message)
+    finally:
+        on_message_seconds.observe(time.perf_counter() - started)
+
+
+@bot.event
+async def on_raw_message_edit(payload: discord.RawMessageUpdateEvent):
+    """発言の編集を監視（メッセージキャッシュにない発言の編集も受け取る）"""
+    await handle_message_edit(payload.message)
+
+
+async def handle_message_edit(message: discord.Message):
+    """
+    受理済みの発言が編集された場合に、編集後の本文を判定キャッシュ経由で再チェック
+    評価には受理時の本文を使い、違反があれば新しい発言と同じく警告・無効化・強制終了を行う
+    """
+    session = bot.active_sessions.get(message.channel.id)
+    if session is None or not session.is_active or message.id not in session.turn_message_ids:
+        return
+    
+    hit = bot.verdicts.find(bot.runtime.moderation_engine, message.content)
+    if hit is None:
+        return
+    # 同じ発言の再編集や埋め込みの更新で重複して数えないよう、以降は再チェックしない
+    session.turn_message_ids.discard(message.id)
+    await handle_violation(session, message, hit)
+
+
+async def handle_debate_message(message: discord.Message):
+    """ディベート中の発言を処理"""
     
     # Bot自身のメッセージは無視
     if message.author.bot:
@@ -390,91 +1041,120 @@ async def on_message(message: discord.Message):
     
     # 発言者が現在のターンのディベーターか確認
     current_debater = session.get_current_debater()
-    if message.author != current_debater:
+    if message.author.id != current_debater.id:
         # ディベーター以外の場合は警告
-        if message.author in session.debaters:
-            await message.channel.send(
+        if session.is_debater(message.author.id):
+            out_of_turn_warnings.inc()
+            bot.outbound.post(
+                message.channel,
                 f"⚠️ {message.author.mention} さん、現在は {current_debater.mention} のターンです。"
             )
         return
     
     # 文字数チェック
     if len(message.content) > session.max_chars:
-        await message.channel.send(
+        bot.outbound.post(
+            message.channel,
             f"⚠️ {message.author.mention} 発言が文字数制限（{session.max_chars}文字）を超えています。"
         )
         return
     
     # 禁止コンテンツチェック
-    is_safe, reason = check_prohibited_content(message.content)
+    moderation_started = time.perf_counter()
+    hit = bot.verdicts.find(bot.runtime.moderation_engine, message.content)
+    moderation_seconds.observe(time.perf_counter() - moderation_started)
     
-    if not is_safe:
-        violation_count = session.add_violation(message.author.id)
-        
-        if violation_count >= 3:
-            # 3回目の違反で強制終了
-            end_embed = discord.Embed(
-                title="🚫 ディベート強制終了",
-                description=(
-                    f"{message.author.mention} が規約違反を3回行ったため、\n"
-                    "ディベートを強制終了しました。\n\n"
-                    "**勝敗判定は行いません。**"
-                ),
-                color=discord.Color.red()
-            )
-            await message.channel.send(embed=end_embed)
-            del bot.active_sessions[message.channel.id]
-            return
-        
-        elif violation_count == 2:
-            await message.channel.send(
-                f"⚠️ **警告（{violation_count}/3）:** {message.author.mention}\n"
-                f"理由: {reason}\n"
-                "この発言は無効化されました。次回の違反でセッション終了となります。"
-            )
-            await message.delete()
-            return
-        
-        else:
-            await message.channel.send(
-                f"⚠️ **警告（{violation_count}/3）:** {message.author.mention}\n"
-                f"理由: {reason}"
-            )
-            return
+    if hit is not None:
+        await handle_violation(session, message, hit)
+        return
     
-    # ログに記録
-    session.log_message(message.author, message.content)
+    # ログに記録（発言へのリアクションは発言者への応援として集計）
+    entry = session.log_message(message.author, message.content)
+    session.reactions.track(message.id, message.author.id)
+    session.turn_message_ids.add(message.id)
     
     # ターンを進める
     session.current_turn += 1
+    accepted_turns.inc()
+    record_event(message.channel.id, EVENT_TURN, {'e': entry, 'ct': session.current_turn})
+    await advance_turn(session, message.author)
+
+
+async def handle_violation(session: DebateSession, message: discord.Message, hit: ModerationHit):
+    """禁止コンテンツを含む発言（または編集後の発言）の警告・無効化・強制終了"""
+    reason = hit.reason
+    violations.labels(hit.kind).inc()
+    violation_count = session.add_violation(message.author.id)
+    record_event(message.channel.id, EVENT_VIOLATION, {'u': message.author.id})
+    
+    if violation_count >= 3:
+        # 3回目の違反で強制終了
+        end_embed = discord.Embed(
+            title="🚫 ディベート強制終了",
+            description=(
+                f"{message.author.mention} が規約違反を3回行ったため、\n"
+                "ディベートを強制終了しました。\n\n"
+                "**勝敗判定は行いません。**"
+            ),
+            color=discord.Color.red()
+        )
+        bot.outbound.post(message.channel, embed=end_embed, priority=PRIORITY_MODERATION)
+        remove_session(message.channel.id)
+        await archive_session(session, 'violation')
+        if session.tournament is not None:
+            # トーナメントの試合は違反した側の反則負け
+            await finish_match(session, None, 'violation', loser_id=message.author.id)
+    
+    elif violation_count == 2:
+        bot.outbound.post(
+            message.channel,
+            f"⚠️ **警告（{violation_count}/3）:** {message.author.mention}\n"
+            f"理由: {reason}\n"
+            "この発言は無効化されました。次回の違反でセッション終了となります。",
+            priority=PRIORITY_MODERATION
+        )
+        bot.outbound.delete(message)
+    
+    else:
+        bot.outbound.post(
+            message.channel,
+            f"⚠️ **警告（{violation_count}/3）:** {message.author.mention}\n"
+            f"理由: {reason}",
+            priority=PRIORITY_MODERATION
+        )
+
+
+async def advance_turn(session: DebateSession, author):
+    """発言（またはパス）後の終了判定と次の発言者の通知"""
     
     # 発言回数チェック
-    author_turn_count = sum(1 for entry in session.debate_log if entry['author_id'] == message.author.id)
+    author_turn_count = session.get_turn_count(author.id)
     
     if author_turn_count >= session.message_limit:
         # 両者が制限に達したかチェック
-        other_debater = session.debaters[1] if message.author == session.debaters[0] else session.debaters[0]
-        other_turn_count = sum(1 for entry in session.debate_log if entry['author_id'] == other_debater.id)
+        other_debater = session.get_opponent(author.id)
+        other_turn_count = session.get_turn_count(other_debater.id)
         
         if other_turn_count >= session.message_limit:
             # ディベート終了
             await end_debate(session)
             return
         else:
-            await message.channel.send(
-                f"ℹ️ {message.author.mention} は発言制限に達しました。\n"
+            bot.outbound.post(
+                session.channel,
+                f"ℹ️ {author.mention} は発言制限に達しました。\n"
                 f"{other_debater.mention} の最終発言をお待ちください。"
             )
     
     # 次のターンを通知
     next_debater = session.get_current_debater()
     if next_debater:
-        remaining = session.message_limit - sum(
-            1 for entry in session.debate_log if entry['author_id'] == next_debater.id
-        )
-        await message.channel.send(
+        remaining = session.get_remaining_turns(next_debater.id)
+        bot.outbound.post(
+            session.channel,
             f"💬 次の発言者: {next_debater.mention} （残り{remaining}回）"
         )
+        schedule_turn_deadline(session)
 
 
 async def end_debate(session: DebateSession):
@@ -482,8 +1162,18 @@ async def end_debate(session: DebateSession):
     
     session.is_active = False
     
-    # 評価実行
-    scores = evaluate_debate(session.debate_log)
+    # 評価実行（発言ごとに積算済みのため正規化のみ）
+    evaluation_started = time.perf_counter()
+    scores = session.scorer.scores()
+    if bot.scoring.stages:
+        # 追加の評価ステージはイベントループ外で実行し、失敗した分はヒューリスティック評価を使う
+        scores, skipped = await bot.scoring.run(session.debate_log, scores)
+        if skipped:
+            print(f"⚠️ 評価ステージ {', '.join(skipped)} を飛ばしました（チャンネル {session.channel.id}）")
+        # 評価中に強制終了された場合は結果を出さない
+        if bot.active_sessions.get(session.channel.id) is not session:
+            return
+    evaluation_seconds.observe(time.perf_counter() - evaluation_started)
     
     # 結果Embed作成
     result_embed = discord.Embed(
@@ -533,13 +1223,23 @@ async def end_debate(session: DebateSession):
         inline=False
     )
     
+    # 観客の応援（勝敗・評価には使わない）
+    if session.reactions.total:
+        result_embed.add_field(
+            name="📣 観客の応援",
+            value=format_cheers(session),
+            inline=False
+        )
+    
     result_embed.set_footer(text="お疲れ様でした！論理的思考の練習にご活用ください。")
     
-    await session.channel.send(embed=result_embed)
+    bot.outbound.post(session.channel, embed=result_embed)
     
     # セッション削除
-    if session.channel.id in bot.active_sessions:
-        del bot.active_sessions[session.channel.id]
+    remove_session(session.channel.id)
+    await archive_session(session, 'completed', scores)
+    if session.tournament is not None:
+        await finish_match(session, scores, 'completed')
 
 
 @bot.tree.command(name="debate_stop", description="進行中のディベートを強制終了します（管理者のみ）")
@@ -547,9 +1247,9 @@ async def stop_debate(interaction: discord.Interaction):
     """ディベート強制終了コマンド"""
     
     # 権限チェック
-    if not interaction.user.guild_permissions.administrator:
+    if not has_debate_permission(interaction.user):
         await interaction.response.send_message(
-            "❌ このコマンドは管理者のみ実行可能です。",
+            "❌ このコマンドは管理者または指定ロールのみ実行可能です。",
             ephemeral=True
         )
         return
@@ -563,11 +1263,429 @@ async def stop_debate(interaction: discord.Interaction):
         return
     
     # セッション削除
-    del bot.active_sessions[interaction.channel_id]
+    session = bot.active_sessions[interaction.channel_id]
+    remove_session(interaction.channel_id)
     
     await interaction.response.send_message(
         "🛑 ディベートを強制終了しました。"
     )
+    await archive_session(session, 'stopped')
+    if session.tournament is not None:
+        # トーナメントの試合はその時点の評価で勝者を決める
+        await finish_match(session, None, 'stopped')
+
+
+async def get_recruiting_session(interaction: discord.Interaction) -> Optional[DebateSession]:
+    """募集中のセッションを取得（権限・状態を確認し、問題があれば応答する）"""
+    
+    if not has_debate_permission(interaction.user):
+        await interaction.response.send_message(
+            "❌ このコマンドは管理者または指定ロールのみ実行可能です。",
+            ephemeral=True
+        )
+        return None
+    
+    session = bot.active_sessions.get(interaction.channel_id)
+    if session is None or not session.is_recruiting:
+        await interaction.response.send_message(
+            "ℹ️ このチャンネルで募集中のディベートはありません。",
+            ephemeral=True
+        )
+        return None
+    
+    return session
+
+
+@bot.tree.command(name="debate_close", description="参加者募集を締め切ってディベートを開始します（管理者のみ）")
+async def close_debate_recruitment(interaction: discord.Interaction):
+    """募集早期締切コマンド"""
+    
+    session = await get_recruiting_session(interaction)
+    if session is None:
+        return
+    
+    await interaction.response.send_message("⏰ 参加者募集を締め切りました。")
+    bot.scheduler.fire_now(('recruit', interaction.channel_id))
+
+
+@bot.tree.command(name="debate_extend", description="参加者募集の時間を延長します（管理者のみ）")
+@app_commands.describe(minutes="延長する時間（分）")
+async def extend_debate_recruitment(interaction: discord.Interaction, minutes: app_commands.Range[int, 1, 60]):
+    """募集延長コマンド"""
+    
+    session = await get_recruiting_session(interaction)
+    if session is None:
+        return
+    
+    session.recruit_deadline += minutes * 60
+    bot.scheduler.reschedule(('recruit', interaction.channel_id), session.recruit_deadline)
+    record_event(interaction.channel_id, EVENT_DEADLINE, {'dl': session.recruit_deadline})
+    
+    remaining = int(session.recruit_deadline - time.time()) // 60
+    await interaction.response.send_message(
+        f"⏰ 参加者募集を{minutes}分延長しました（残り約{remaining}分）。"
+    )
+
+
+# ===========================
+# トーナメント
+# ===========================
+
+class TournamentView(View):
+    """トーナメント参加登録ボタンUI"""
+    
+    def __init__(self, tournament: Tournament):
+        super().__init__(timeout=None)
+        self.tournament = tournament
+    
+    @discord.ui.button(label="トーナメントに参加する", style=discord.ButtonStyle.primary, custom_id="join_tournament")
+    async def join_button(self, interaction: discord.Interaction, button: Button):
+        tournament = self.tournament
+        if not tournament.add_participant(MemberRef(interaction.user.id, interaction.user.display_name)):
+            await interaction.response.send_message(
+                "✅ 既に参加登録されています。" if interaction.user.id in tournament.participants
+                else "ℹ️ 参加登録は締め切られました。",
+                ephemeral=True
+            )
+            return
+        
+        await interaction.response.send_message(
+            embed=build_consent_embed(),
+            ephemeral=True
+        )
+        
+        hub_id = tournament.hub_channel.id
+        schedule_throttled(('tournament_roster', hub_id), lambda: update_tournament_message(tournament))
+
+
+def build_tournament_embed(tournament: Tournament) -> discord.Embed:
+    """トーナメント募集メッセージのEmbed（参加人数を含む）"""
+    return discord.Embed(
+        title="🏆 Debate Arena - トーナメント参加者募集",
+        description=(
+            f"**募集時間:** {tournament.recruit_time}分\n"
+            f"**発言制限:** {tournament.message_limit}回/人\n"
+            f"**最大文字数:** {tournament.max_chars}文字/発言\n"
+            f"**同時に行う試合数:** 最大{tournament.max_parallel}試合\n"
+            f"**参加者:** {len(tournament.participants)}名\n\n"
+            "下のボタンから参加登録してください。\n"
+            "勝ち抜き戦で、各試合は構成評価の合計スコアが高い方が次に進みます。"
+        ),
+        color=discord.Color.green()
+    )
+
+
+async def update_tournament_message(tournament: Tournament):
+    """トーナメント募集メッセージを現在の参加人数で編集"""
+    hub_id = tournament.hub_channel.id
+    if bot.tournaments.get(hub_id) is not tournament or tournament.recruit_message_id is None:
+        return
+    bot.outbound.edit(
+        tournament.hub_channel,
+        tournament.recruit_message_id,
+        embed=build_tournament_embed(tournament)
+    )
+
+
+def round_label(tournament: Tournament, round_number: int) -> str:
+    """ラウンドの表示名"""
+    remaining = tournament.bracket.round_count - round_number
+    if remaining == 1:
+        return "決勝"
+    if remaining == 2:
+        return "準決勝"
+    return f"{round_number + 1}回戦"
+
+
+def remove_tournament(tournament: Tournament):
+    """トーナメントを削除"""
+    hub_id = tournament.hub_channel.id
+    bot.scheduler.cancel(('tournament', hub_id))
+    bot.scheduler.cancel(('tournament_roster', hub_id))
+    bot.scheduler.cancel(('tournament_retry', hub_id))
+    if bot.tournaments.get(hub_id) is tournament:
+        del bot.tournaments[hub_id]
+
+
+async def start_tournament(tournament: Tournament):
+    """募集を締め切ってブラケットを作成し、最初の試合を開始"""
+    hub_id = tournament.hub_channel.id
+    if bot.tournaments.get(hub_id) is not tournament or tournament.is_started:
+        return
+    bot.scheduler.fire_now(('tournament_roster', hub_id))
+    
+    if len(tournament.participants) < 2:
+        bot.outbound.post(
+            tournament.hub_channel,
+            "⚠️ 参加者が2名未満のため、トーナメントを開始できませんでした。"
+        )
+        remove_tournament(tournament)
+        return
+    
+    bracket = tournament.begin()
+    first_round = bracket.rounds[0]
+    byes = sum(1 for match in first_round if match.reason == 'bye')
+    bot.outbound.post(tournament.hub_channel, embed=discord.Embed(
+        title="🏆 トーナメント開始！",
+        description=(
+            f"**参加者:** {len(tournament.participants)}名（全{bracket.round_count}ラウンド）\n"
+            f"**1回戦:** {len(first_round) - byes}試合"
+            + (f"（不戦勝 {byes}名）" if byes else "") + "\n\n"
+            f"試合は最大{tournament.max_parallel}試合ずつ、対戦カードが決まった順に開始します。"
+        ),
+        color=discord.Color.gold()
+    ))
+    await launch_matches(tournament)
+
+
+async def launch_matches(tournament: Tournament):
+    """
+    同時進行数と空きチャンネルの範囲で、対戦カードが決まった試合を開始
+    開始できなかった試合は待ち行列に戻し、間隔を空けて再試行する
+    """
+    hub_id = tournament.hub_channel.id
+    failed = 0
+    matches = tournament.take_matches(lambda channel_id: channel_id in bot.active_sessions)
+    # 割り当てた試合（同時進行数の上限まで）のチャンネルをまとめて用意する
+    channels = await asyncio.gather(
+        *(open_match_channel(tournament, match) for match in matches), return_exceptions=True
+    )
+    returned = []  # 待ち行列に戻す試合
+    for match, channel in zip(matches, channels):
+        if isinstance(channel, BaseException):
+            print(f"⚠️ トーナメントの試合を開始できませんでした: {channel}")
+            returned.append(match)
+            failed += 1
+            continue
+        if bot.tournaments.get(hub_id) is not tournament or channel.id in bot.active_sessions:
+            # 準備中に中止された、またはチャンネルが他のセッションで使われた
+            returned.append(match)
+            continue
+        tournament.started(match, channel.id)
+        tournament.start_failures = 0
+        start_match(tournament, match, channel)
+    # 待ち行列の先頭に元の順で戻す
+    for match in reversed(returned):
+        tournament.start_failed(match)
+    
+    if bot.tournaments.get(hub_id) is not tournament or tournament.pending_count == 0:
+        return
+    if failed:
+        tournament.start_failures += 1
+        if tournament.start_failures >= TOURNAMENT_MAX_START_FAILURES:
+            bot.outbound.post(
+                tournament.hub_channel,
+                f"🛑 試合のチャンネルを{tournament.start_failures}回続けて用意できなかったため、トーナメントを中止しました。"
+            )
+            abort_tournament(tournament)
+            await end_running_matches(tournament)
+            return
+        delay = TOURNAMENT_RETRY_DELAY * 2 ** (tournament.start_failures - 1)
+        bot.outbound.post(
+            tournament.hub_channel,
+            f"⚠️ 試合{failed}件のチャンネルを用意できませんでした。{delay}秒後に再試行します。"
+        )
+    elif tournament.running:
+        # 進行中の試合が終了したときに改めて開始する
+        return
+    else:
+        # 空きチャンネルがすべて他のセッションで使われている
+        delay = TOURNAMENT_RETRY_DELAY
+    bot.scheduler.schedule(('tournament_retry', hub_id), time.time() + delay, lambda: launch_matches(tournament))
+
+
+async def open_match_channel(tournament: Tournament, match: Match):
+    """試合のチャンネル（指定チャンネル、なければ開催チャンネルのスレッド）を用意"""
+    if match.channel_id is not None:
+        return bot.get_channel(match.channel_id) or bot.get_partial_messageable(
+            match.channel_id, guild_id=tournament.guild_id
+        )
+    first, second = match.players
+    return await tournament.hub_channel.create_thread(
+        name=f"{round_label(tournament, match.round)} {first.display_name} vs {second.display_name}"[:100],
+        type=discord.ChannelType.public_thread
+    )
+
+
+def start_match(tournament: Tournament, match: Match, channel):
+    """試合のセッションを作成し、募集を経ずにディベートを開始"""
+    session = DebateSession(
+        channel=channel,
+        recruit_time=0,
+        message_limit=tournament.message_limit,
+        max_chars=tournament.max_chars,
+        guild_id=tournament.guild_id
+    )
+    session.tournament = tournament
+    session.is_recruiting = False
+    session.participants = {player.id: player for player in match.players}
+    bot.active_sessions[channel.id] = session
+    record_event(channel.id, EVENT_CREATE, session.to_state())
+    
+    session.set_debaters(list(match.players))
+    session.topic = random.choice(bot.runtime.topics)
+    session.is_active = True
+    record_event(channel.id, EVENT_START, {
+        'd': [[debater.id, debater.display_name] for debater in session.debaters],
+        't': session.topic
+    })
+    
+    bot.outbound.post(channel, embed=build_start_embed(
+        session, title=f"🏆 {round_label(tournament, match.round)} 開始！"
+    ))
+    schedule_turn_deadline(session)
+
+
+async def finish_match(
+    session: DebateSession,
+    scores: Optional[Dict],
+    reason: str,
+    loser_id: Optional[int] = None
+):
+    """
+    トーナメントの試合結果を記録し、勝者を次の試合へ進める
+    scoresがない場合（違反・管理者による終了）はその時点の評価を使う
+    """
+    tournament = session.tournament
+    channel_id = session.channel.id
+    if bot.tournaments.get(tournament.hub_channel.id) is not tournament or channel_id not in tournament.running:
+        return
+    
+    match = tournament.running[channel_id]
+    if scores is None:
+        scores = session.scorer.scores()
+    totals = {user_id: score['total'] for user_id, score in scores.items()}
+    if loser_id is not None:
+        winner = match.players[1] if match.players[0].id == loser_id else match.players[0]
+    else:
+        winner = decide_winner(match, totals, session.violations)
+    tournament.finish(channel_id, winner, totals, reason)
+    
+    first, second = match.players
+    note = {'violation': "（反則負け）", 'stopped': "（管理者による終了）"}.get(reason, "")
+    bot.outbound.post(
+        tournament.hub_channel,
+        f"🏅 {round_label(tournament, match.round)}: {first.display_name} vs {second.display_name} → "
+        f"**{winner.display_name}** が勝ち抜け（{totals.get(first.id, 0):.1f} - {totals.get(second.id, 0):.1f}）{note}"
+    )
+    
+    if tournament.is_finished:
+        bot.outbound.post(tournament.hub_channel, embed=discord.Embed(
+            title="🎉 トーナメント終了",
+            description=(
+                f"**優勝:** {tournament.bracket.champion.mention}\n\n"
+                "構成評価による結果です。正誤や優劣を示すものではありません。\n"
+                "参加いただいた皆さん、お疲れ様でした！"
+            ),
+            color=discord.Color.purple()
+        ))
+        remove_tournament(tournament)
+        return
+    
+    await launch_matches(tournament)
+
+
+@bot.tree.command(name="tournament", description="トーナメントを作成します（管理者のみ）")
+@app_commands.describe(
+    recruit_time="募集時間（分）",
+    message_limit="1試合で1人あたりの発言回数制限",
+    max_chars="1発言あたりの最大文字数",
+    max_parallel="同時に行う試合数の上限"
+)
+async def create_tournament(
+    interaction: discord.Interaction,
+    recruit_time: int = DEFAULT_RECRUIT_TIME,
+    message_limit: int = DEFAULT_MESSAGE_LIMIT,
+    max_chars: int = 500,
+    max_parallel: app_commands.Range[int, 1, TOURNAMENT_MAX_PARALLEL_MATCHES] = TOURNAMENT_MAX_PARALLEL_MATCHES
+):
+    """トーナメント作成コマンド"""
+    
+    if not has_debate_permission(interaction.user):
+        await interaction.response.send_message(
+            "❌ このコマンドは管理者または指定ロールのみ実行可能です。",
+            ephemeral=True
+        )
+        return
+    
+    if not guild_policy(interaction.guild).allows_channel(interaction.channel_id):
+        await interaction.response.send_message(
+            "❌ このチャンネルではディベートを開催できません。",
+            ephemeral=True
+        )
+        return
+    
+    if interaction.channel_id in bot.tournaments:
+        await interaction.response.send_message(
+            "⚠️ このチャンネルでは既にトーナメントが進行中です。",
+            ephemeral=True
+        )
+        return
+    
+    tournament = Tournament(
+        hub_channel=interaction.channel,
+        guild_id=interaction.guild_id,
+        recruit_time=recruit_time,
+        message_limit=message_limit,
+        max_chars=max_chars,
+        max_parallel=max_parallel,
+        channel_ids=TOURNAMENT_CHANNEL_IDS or None
+    )
+    bot.tournaments[interaction.channel_id] = tournament
+    
+    await interaction.response.send_message(
+        embed=build_tournament_embed(tournament),
+        view=TournamentView(tournament)
+    )
+    recruit_message = await interaction.original_response()
+    tournament.recruit_message_id = recruit_message.id
+    
+    bot.scheduler.schedule(
+        ('tournament', interaction.channel_id),
+        time.time() + recruit_time * 60,
+        lambda: start_tournament(tournament)
+    )
+
+
+@bot.tree.command(name="tournament_cancel", description="トーナメントを中止します（管理者のみ）")
+async def cancel_tournament(interaction: discord.Interaction):
+    """トーナメント中止コマンド"""
+    
+    if not has_debate_permission(interaction.user):
+        await interaction.response.send_message(
+            "❌ このコマンドは管理者または指定ロールのみ実行可能です。",
+            ephemeral=True
+        )
+        return
+    
+    tournament = bot.tournaments.get(interaction.channel_id)
+    if tournament is None:
+        await interaction.response.send_message(
+            "ℹ️ このチャンネルで進行中のトーナメントはありません。",
+            ephemeral=True
+        )
+        return
+    
+    abort_tournament(tournament)
+    await interaction.response.send_message("🛑 トーナメントを中止しました。")
+    await end_running_matches(tournament)
+
+
+def abort_tournament(tournament: Tournament):
+    """トーナメントを中止（以降の試合は開始しない）"""
+    tournament.cancelled = True
+    remove_tournament(tournament)
+
+
+async def end_running_matches(tournament: Tournament):
+    """中止したトーナメントの進行中の試合を終了"""
+    for channel_id in list(tournament.running):
+        session = bot.active_sessions.get(channel_id)
+        if session is None or session.tournament is not tournament:
+            continue
+        remove_session(channel_id)
+        bot.outbound.post(session.channel, "🛑 トーナメントが中止されたため、この試合を終了しました。")
+        await archive_session(session, 'stopped')
 
 
 @bot.tree.command(name="debate_help", description="Debate Arena Botの使い方を表示します")
@@ -584,7 +1702,11 @@ async def show_help(interaction: discord.Interaction):
         name="🎯 コマンド一覧",
         value=(
             "`/debate` - ディベートセッションを作成（管理者のみ）\n"
+            "`/debate_close` - 参加者募集を締め切って開始（管理者のみ）\n"
+            "`/debate_extend` - 参加者募集の時間を延長（管理者のみ）\n"
             "`/debate_stop` - 進行中のディベートを強制終了（管理者のみ）\n"
+            "`/tournament` - トーナメントを作成（管理者のみ）\n"
+            "`/tournament_cancel` - トーナメントを中止（管理者のみ）\n"
             "`/debate_help` - このヘルプを表示"
         ),
         inline=False
@@ -0,0 +1,84 @@
+"""
+コマンドツリーの同期
+コマンド定義をシリアライズしたハッシュをファイルに保存し、
+定義が変わったときだけDiscordへ同期する（同期のレート制限と起動時間の節約）
+"""
+
+import hashlib
+import json
+import os
+from typing import Dict, List, Optional
+
+import discord
+from discord import app_commands
+
+
+def command_hash(tree: app_commands.CommandTree, guild: Optional[discord.abc.Snowflake] = None) -> str:
+    """同期対象のコマンド定義（tree.sync() が送信するペイロード）のハッシュ"""
+    payload = sorted(
+        (command.to_dict(tree) for command in tree.get_commands(guild=guild)),
+        key=lambda command: (command.get('type', 1), command['name'])
+    )
+    serialized = json.dumps(payload, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(serialized.encode('utf-8')).hexdigest()
+
+
+def _load_hashes(path: str) -> Dict[str, str]:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        print(f"⚠️ コマンド同期状態の読み込みに失敗しました（再同期します）: {e}")
+        return {}
+
+
+def _save_hashes(path: str, hashes: Dict[str, str]):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(hashes, f, ensure_ascii=False, indent=2)
+    os.replace(temp_path, path)
+
+
+async def sync_commands(
+    tree: app_commands.CommandTree,
+    state_path: str,
+    guild_ids: Optional[List[int]] = None,
+    force: bool = False
+) -> List[str]:
+    """
+    コマンド定義が前回の同期から変わっていれば同期し、同期した範囲の一覧を返す
+
+    guild_idsを指定した場合はグローバルコマンドをそれらのサーバーにコピーして
+    サーバー単位で同期する（即時反映されるため、検証環境への展開向け）。
+    forceがTrueなら保存済みのハッシュに関係なく同期する。
+    """
+    application_id = tree.client.application_id
+    hashes = _load_hashes(state_path)
+
+    if guild_ids:
+        scopes = []
+        for guild_id in guild_ids:
+            guild = discord.Object(id=guild_id)
+            tree.copy_global_to(guild=guild)
+            scopes.append((f"guild:{guild_id}", guild))
+    else:
+        scopes = [("global", None)]
+
+    synced = []
+    for name, guild in scopes:
+        key = f"{application_id}:{name}"
+        digest = command_hash(tree, guild)
+        if not force and hashes.get(key) == digest:
+            continue
+        await tree.sync(guild=guild)
+        # 同期に成功した範囲だけ記録する（失敗時は次回起動で再同期）
+        hashes[key] = digest
+        _save_hashes(state_path, hashes)
+        synced.append(name)
+
+    return synced
@@ -4,7 +4,7 @@ Debate Arena Bot - 設定ファイル
 """
 
 import os
-from typing import List
+from typing import Dict, List
 
 # ===========================
 # Discord Bot設定
@@ -25,6 +25,31 @@ ADMIN_ROLE_NAMES: List[str] = [
     'Moderator',
 ]
 
+# サーバーごとの上書き設定（サーバーID: 設定）
+# admin_role_names: 管理者ロール名 / admin_role_ids: 管理者とするロールID /
+# allowed_channel_ids: 許可チャンネルID（省略した項目は上記の値を使用）
+GUILD_POLICY_OVERRIDES: Dict[int, Dict] = {
+    # 例: 123456789012345678: {'admin_role_names': ['運営'], 'allowed_channel_ids': [234567890123456789]},
+}
+
+# シャード設定（launcher.py が各プロセスに設定する）
+# 未設定の場合は1プロセスで必要なシャードをすべて担当する（AutoShardedClientの自動シャーディング）
+SHARD_COUNT = int(os.getenv('DEBATE_SHARD_COUNT', '0')) or None
+SHARD_IDS = [int(shard_id) for shard_id in os.getenv('DEBATE_SHARD_IDS', '').split(',') if shard_id.strip()] or None
+if SHARD_IDS is not None and SHARD_COUNT is None:
+    raise ValueError("DEBATE_SHARD_IDS を指定する場合は DEBATE_SHARD_COUNT も指定してください")
+if SHARD_IDS is not None and not all(0 <= shard_id < SHARD_COUNT for shard_id in SHARD_IDS):
+    raise ValueError(f"DEBATE_SHARD_IDS は 0 以上 DEBATE_SHARD_COUNT（{SHARD_COUNT}）未満で指定してください")
+
+# launcher.py で起動するプロセス数（シャードをこの数のグループに分ける）
+SHARD_PROCESS_COUNT = int(os.getenv('SHARD_PROCESS_COUNT', '2'))
+
+# 軽量ゲートウェイモード（大規模サーバー向け）
+# 有効にするとメンバー一覧の取得（チャンキング）とメンバーキャッシュを行わず、
+# インタラクションとメッセージに含まれるユーザー情報のみで動作する
+# （Developer Portalの SERVER MEMBERS INTENT も不要になる）
+LEAN_GATEWAY_MODE = os.getenv('LEAN_GATEWAY_MODE', '0').lower() in ('1', 'true', 'yes')
+
 # ===========================
 # ディベート設定
 # ===========================
@@ -35,9 +60,46 @@ DEFAULT_RECRUIT_TIME = 3
 # デフォルト発言制限回数
 DEFAULT_MESSAGE_LIMIT = 5
 
+# 1ターンの持ち時間（秒、既定の0は無制限）
+# 設定すると、過ぎた発言者のターンをパスにし、1回分の発言として数える
+TURN_TIME_LIMIT = int(os.getenv('DEBATE_TURN_TIME_LIMIT', '0'))
+
+# 持ち時間の終了前にリマインドを送るタイミング（残り秒数、0でリマインドなし）
+TURN_REMINDER_BEFORE = 30
+
 # ディベート最大ラウンド数
 MAX_DEBATE_ROUNDS = 10
 
+# ===========================
+# トーナメント設定
+# ===========================
+
+# トーナメントの試合に使うチャンネルID（空リストの場合は開催チャンネルに試合ごとのスレッドを作成）
+TOURNAMENT_CHANNEL_IDS: List[int] = [
+    # 例: 123456789012345678,
+]
+
+# 1つのトーナメントで同時に進行する試合数の上限（/tournament の max_parallel の上限）
+TOURNAMENT_MAX_PARALLEL_MATCHES = 50
+
+# 試合のチャンネル（スレッド）を用意できなかった場合に再試行するまでの秒数（失敗が続くごとに倍にする）
+TOURNAMENT_RETRY_DELAY = 10
+
+# 試合の開始に続けてこの回数失敗したらトーナメントを中止する
+TOURNAMENT_MAX_START_FAILURES = 5
+
+# ===========================
+# 観戦設定
+# ===========================
+
+# 進行中のディベートへのリアクションを応援として集計する
+# （無効にするとリアクションのイベントを受信しない。集計は勝敗・評価には影響しない）
+SPECTATOR_REACTIONS = os.getenv('DEBATE_SPECTATOR_REACTIONS', '1').lower() in ('1', 'true', 'yes')
+
+# 応援のスコアボードを更新する最小間隔（秒）
+# リアクションごとに編集せず、この間隔でまとめてスコアボードを編集する
+SCOREBOARD_UPDATE_INTERVAL = 5.0
+
 # ===========================
 # 安全な議題リスト
 # ===========================
@@ -88,6 +150,20 @@ PROHIBITED_WORDS: List[str] = [
     # サーバー内固有の禁止語があればここに追加
 ]
 
+# 人称攻撃パターン（正規表現）
+ATTACK_PATTERNS: List[str] = [
+    r'お前[はが]',
+    r'あなた[はが].*?馬鹿',
+    r'君[はが].*?無知',
+    r'てめー',
+    r'貴様',
+]
+
+# 禁止コンテンツ判定のキャッシュ件数（0で無効）
+# 正規化後の本文が同じ発言（再送・編集）は判定を再利用する。禁止ワード・パターンの変更時は自動で無効になる
+# 正規化済みの発言は1件1キー。全角英数字・半角カナなどを含む発言は再送されると2キーを使う
+MODERATION_CACHE_SIZE = 10000
+
 # ===========================
 # 評価基準
 # ===========================
@@ -115,6 +191,30 @@ EVALUATION_CRITERIA = {
     },
 }
 
+# 追加の評価ステージ（ヒューリスティック評価の結果に順に適用。scorer_pipeline.ScoringStage を継承したクラス）
+# mode: inline（イベントループ上）/ thread（スレッドプール）/ process（プロセスプール）
+# timeout秒以内に終わらない・失敗したステージは飛ばし、直前の評価をそのまま使う
+SCORING_STAGES: List[Dict] = [
+    # 例: {'path': 'my_scorer:LLMStage', 'mode': 'thread', 'timeout': 15.0, 'options': {'model': '...'}},
+]
+
+# 評価ステージを実行するスレッド数・プロセス数
+SCORING_THREAD_WORKERS = 4
+SCORING_PROCESS_WORKERS = 2
+
+# ===========================
+# 送信設定
+# ===========================
+
+# チャンネルごとの送信レート制限（CHANNEL_MESSAGE_RATE_PERIOD秒あたりの送信数）
+# Discordの制限に達する前に送信を待機させ、同時に発生した通知は1通にまとめる
+CHANNEL_MESSAGE_RATE_LIMIT = 5
+CHANNEL_MESSAGE_RATE_PERIOD = 5.0
+
+# 募集メッセージの参加人数を更新する最小間隔（秒）
+# 参加登録ごとに通知を送らず、この間隔でまとめて募集メッセージを編集する
+ROSTER_UPDATE_INTERVAL = 2.0
+
 # ===========================
 # ログ設定
 # ===========================
@@ -125,6 +225,54 @@ LOG_DIRECTORY = './logs'
 # ログ自動削除日数（日）
 LOG_RETENTION_DAYS = 30
 
+# 書き込み待ちログの最大件数（超えた場合は空きが出るまで待機）
+LOG_QUEUE_SIZE = 1000
+
+# ===========================
+# メトリクス設定
+# ===========================
+
+# Prometheus形式のメトリクスを公開するアドレスとポート（0で無効）
+# launcher.py で複数プロセスを起動した場合は、ポートに各プロセスの先頭シャード番号を加える
+METRICS_HOST = '127.0.0.1'
+METRICS_PORT = int(os.getenv('METRICS_PORT', '9108'))
+
+# ===========================
+# セッション永続化設定
+# ===========================
+
+# セッションのイベントログ（SQLite）の保存先
+SESSION_DB_PATH = './data/sessions.db'
+
+# スナップショット保存間隔（秒）
+SESSION_SNAPSHOT_INTERVAL = 300
+
+# ===========================
+# コマンド同期設定
+# ===========================
+
+# 前回同期したコマンド定義のハッシュの保存先（定義が変わらなければ起動時の同期を省略）
+COMMAND_SYNC_STATE_PATH = './data/command_sync.json'
+
+# サーバー単位で同期するサーバーID（空リストの場合はグローバルに同期）
+# 検証用サーバーを指定すると、コマンドの変更が即座に反映される
+COMMAND_SYNC_GUILD_IDS: List[int] = [
+    # 例: 123456789012345678,
+]
+
+# 定義が変わっていなくても起動時に必ず同期する
+FORCE_COMMAND_SYNC = os.getenv('FORCE_COMMAND_SYNC', '0').lower() in ('1', 'true', 'yes')
+
+# ===========================
+# 設定の再読み込み
+# ===========================
+
+# 議題・禁止ワード・人称攻撃パターン・管理者ロール名を上書きするJSONファイル
+# ファイルの変更はCONFIG_RELOAD_INTERVAL秒ごとに検出し、再起動せずに反映する
+# （ファイルがない場合や省略した項目は上記の値を使用）
+LIVE_CONFIG_PATH = os.getenv('DEBATE_LIVE_CONFIG', './data/live_config.json')
+CONFIG_RELOAD_INTERVAL = 5.0
+
 # ===========================
 # メッセージテンプレート
 # ===========================
@@ -0,0 +1,84 @@
+"""
+サーバーごとのポリシー
+管理者ロール名をロールIDの集合に解決し、許可チャンネルとあわせてサーバーごとにキャッシュする。
+コマンドの権限チェックはキャッシュ済みの集合を引くだけで済み、ロールの作成・変更・削除や
+設定の再読み込みがあったときだけ解決し直す。
+"""
+
+from typing import Dict, FrozenSet, Iterable, Optional
+
+import discord
+
+
+class GuildPolicy:
+    """サーバーの管理者ロールと許可チャンネル（構築後は変更しない）"""
+
+    __slots__ = ('admin_role_ids', 'allowed_channel_ids')
+
+    def __init__(self, admin_role_ids: FrozenSet[int], allowed_channel_ids: FrozenSet[int]):
+        self.admin_role_ids = admin_role_ids
+        self.allowed_channel_ids = allowed_channel_ids  # 空の場合は全チャンネル
+
+    def allows_channel(self, channel_id: int) -> bool:
+        """ディベートを開催できるチャンネルか"""
+        return not self.allowed_channel_ids or channel_id in self.allowed_channel_ids
+
+    def is_admin(self, member: discord.Member) -> bool:
+        """サーバーの管理者権限または管理者ロールを持つか"""
+        if member.guild_permissions.administrator:
+            return True
+        return any(member.get_role(role_id) is not None for role_id in self.admin_role_ids)
+
+
+class GuildPolicyCache:
+    """
+    サーバーIDごとの GuildPolicy のキャッシュ
+
+    overrides はサーバーIDごとの上書き設定で、次のキーを指定できる（省略した項目は既定値）:
+        admin_role_names: 管理者ロール名のリスト
+        admin_role_ids: 名前によらず管理者とするロールIDのリスト
+        allowed_channel_ids: 許可チャンネルIDのリスト（空リストで全チャンネル）
+    """
+
+    def __init__(self, allowed_channel_ids: Iterable[int], overrides: Dict[int, Dict]):
+        self.allowed_channel_ids = frozenset(allowed_channel_ids)
+        self.overrides = overrides
+        self._policies: Dict[int, GuildPolicy] = {}
+
+    def __len__(self) -> int:
+        return len(self._policies)
+
+    def get(self, guild: Optional[discord.Guild], admin_role_names: FrozenSet[str]) -> GuildPolicy:
+        """サーバーのポリシーを取得（未解決なら解決してキャッシュ）"""
+        if guild is None:
+            # サーバーがキャッシュにない場合はロールを解決できないため、キャッシュしない
+            return self._resolve(None, None, admin_role_names)
+        policy = self._policies.get(guild.id)
+        if policy is None:
+            policy = self._policies[guild.id] = self._resolve(guild.id, guild, admin_role_names)
+        return policy
+
+    def invalidate(self, guild_id: int):
+        """サーバーのポリシーを破棄（次回の取得時に解決し直す）"""
+        self._policies.pop(guild_id, None)
+
+    def clear(self):
+        """全サーバーのポリシーを破棄"""
+        self._policies.clear()
+
+    def _resolve(
+        self,
+        guild_id: Optional[int],
+        guild: Optional[discord.Guild],
+        admin_role_names: FrozenSet[str]
+    ) -> GuildPolicy:
+        override = self.overrides.get(guild_id, {}) if guild_id is not None else {}
+        names = frozenset(override.get('admin_role_names', admin_role_names))
+        role_ids = set(override.get('admin_role_ids', ()))
+        if guild is not None:
+            role_ids.update(role.id for role in guild.roles if role.name in names)
+        allowed = override.get('allowed_channel_ids')
+        return GuildPolicy(
+            frozenset(role_ids),
+            self.allowed_channel_ids if allowed is None else frozenset(allowed)
+        )
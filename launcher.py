@@ -0,0 +1,116 @@
+"""
+シャード分割ランチャー
+Botのシャードをグループに分け、グループごとに別プロセスで bot.py を起動する。
+各プロセスは担当シャードのサーバーのイベントだけを受け取り、そのセッションだけを保持する。
+
+使い方:
+    python launcher.py [プロセス数]
+"""
+
+import asyncio
+import os
+import signal
+import subprocess
+import sys
+import time
+from typing import List, Optional
+
+import discord
+
+from config import BOT_TOKEN, SHARD_COUNT, SHARD_PROCESS_COUNT
+
+# プロセスが異常終了した場合の再起動までの待ち時間（秒）
+RESTART_DELAY = 10
+
+# シャードごとの接続（IDENTIFY）間隔（秒）。Discordの制限に合わせる
+IDENTIFY_INTERVAL = 5
+
+BOT_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bot.py')
+
+
+async def fetch_gateway_info(token: str):
+    """推奨シャード数と同時接続数の上限をDiscordから取得"""
+    http = discord.http.HTTPClient(asyncio.get_running_loop())
+    try:
+        await http.static_login(token)
+        shards, _, session_start_limit = await http.get_bot_gateway()
+        return shards, session_start_limit.get('max_concurrency', 1)
+    finally:
+        await http.close()
+
+
+def split_shards(shard_count: int, process_count: int) -> List[List[int]]:
+    """シャードを連続した番号のグループに分割"""
+    process_count = max(1, min(process_count, shard_count))
+    size, remainder = divmod(shard_count, process_count)
+    groups = []
+    start = 0
+    for i in range(process_count):
+        end = start + size + (1 if i < remainder else 0)
+        groups.append(list(range(start, end)))
+        start = end
+    return groups
+
+
+class ShardProcess:
+    """1つのシャードグループを担当するbot.pyのプロセス"""
+
+    def __init__(self, shard_ids: List[int], shard_count: int):
+        self.shard_ids = shard_ids
+        self.shard_count = shard_count
+        self.process: Optional[subprocess.Popen] = None
+
+    @property
+    def name(self) -> str:
+        return f"シャード{self.shard_ids[0]}-{self.shard_ids[-1]}"
+
+    def start(self):
+        env = dict(os.environ)
+        env['DEBATE_SHARD_COUNT'] = str(self.shard_count)
+        env['DEBATE_SHARD_IDS'] = ','.join(map(str, self.shard_ids))
+        self.process = subprocess.Popen([sys.executable, BOT_SCRIPT], env=env)
+        print(f"{self.name} を起動しました（PID {self.process.pid}）")
+
+    def stop(self):
+        if self.process is not None and self.process.poll() is None:
+            self.process.send_signal(signal.SIGINT)
+
+
+def main():
+    process_count = int(sys.argv[1]) if len(sys.argv) > 1 else SHARD_PROCESS_COUNT
+
+    shard_count = SHARD_COUNT
+    max_concurrency = 1
+    if shard_count is None:
+        shard_count, max_concurrency = asyncio.run(fetch_gateway_info(BOT_TOKEN))
+    print(f"シャード数: {shard_count} / プロセス数: {min(process_count, shard_count)}")
+
+    processes = [ShardProcess(group, shard_count) for group in split_shards(shard_count, process_count)]
+
+    # 各プロセスは担当シャードを順に接続するため、前のグループの接続が終わる頃に次を起動する
+    for process in processes:
+        process.start()
+        time.sleep(IDENTIFY_INTERVAL * len(process.shard_ids) / max_concurrency)
+
+    try:
+        while True:
+            time.sleep(1)
+            for process in processes:
+                code = process.process.poll()
+                if code is None:
+                    continue
+                print(f"⚠️ {process.name} が終了しました（終了コード {code}）。{RESTART_DELAY}秒後に再起動します")
+                time.sleep(RESTART_DELAY)
+                process.start()
+    except KeyboardInterrupt:
+        print("全プロセスを停止します")
+    finally:
+        for process in processes:
+            process.stop()
+        for process in processes:
+            if process.process is not None:
+                process.process.wait()
+
+
+if __name__ == '__main__':
+    main()
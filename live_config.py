@@ -0,0 +1,176 @@
+"""
+設定の再読み込み
+議題・禁止ワード・人称攻撃パターン・管理者ロール名を外部のJSONファイルで上書きし、
+ファイルの変更を検出したら再起動せずに反映する。
+
+モデレーションエンジンの構築などの重い処理はイベントループ外のスレッドで行い、
+完成した RuntimeConfig を属性の代入1回で差し替える。処理中の発言は差し替え前の
+設定で最後まで処理されるため、発言の処理を止めることはない。
+
+ファイルの形式（キーはすべて省略可能で、省略した項目は config.py の値を使う）:
+    {
+        "debate_topics": ["議題1", "議題2"],
+        "prohibited_words": ["禁止ワード"],
+        "attack_patterns": ["お前[はが]"],
+        "admin_role_names": ["Debate Admin"]
+    }
+"""
+
+import asyncio
+import json
+import os
+import re
+import time
+from typing import Callable, Dict, FrozenSet, List, Optional, Tuple
+
+from config import ADMIN_ROLE_NAMES, ATTACK_PATTERNS, DEBATE_TOPICS, PROHIBITED_WORDS
+from metrics import REGISTRY
+from moderation import ModerationEngine, normalize_text
+
+
+# ファイルのキーと config.py の既定値
+CONFIG_KEYS = {
+    'debate_topics': DEBATE_TOPICS,
+    'prohibited_words': PROHIBITED_WORDS,
+    'attack_patterns': ATTACK_PATTERNS,
+    'admin_role_names': ADMIN_ROLE_NAMES,
+}
+
+reload_seconds = REGISTRY.histogram('debate_config_reload_seconds', '設定の再読み込みにかかった時間（秒）')
+reloads = REGISTRY.counter('debate_config_reloads_total', '設定の再読み込み回数', ['result'])
+
+
+class RuntimeConfig:
+    """実行中に差し替え可能な設定（構築後は変更しない）"""
+
+    __slots__ = ('version', 'topics', 'moderation_engine', 'admin_role_names')
+
+    def __init__(
+        self,
+        version: int,
+        topics: Tuple[str, ...],
+        moderation_engine: ModerationEngine,
+        admin_role_names: FrozenSet[str]
+    ):
+        self.version = version
+        self.topics = topics
+        self.moderation_engine = moderation_engine
+        self.admin_role_names = admin_role_names
+
+
+def build_runtime_config(overrides: Dict[str, List[str]], version: int = 0) -> RuntimeConfig:
+    """上書き設定（省略した項目は既定値）から RuntimeConfig を構築"""
+    values = {key: overrides.get(key, default) for key, default in CONFIG_KEYS.items()}
+    if not values['debate_topics']:
+        raise ValueError("debate_topics が空です")
+    return RuntimeConfig(
+        version,
+        tuple(values['debate_topics']),
+        ModerationEngine(list(values['prohibited_words']), list(values['attack_patterns'])),
+        frozenset(values['admin_role_names'])
+    )
+
+
+def load_overrides(path: str) -> Dict[str, List[str]]:
+    """設定ファイルを読み込んで検証（ファイルがなければ空の辞書）"""
+    try:
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return {}
+
+    if not isinstance(data, dict):
+        raise ValueError("設定ファイルの最上位はオブジェクトである必要があります")
+    for key, value in data.items():
+        if key not in CONFIG_KEYS:
+            raise ValueError(f"不明なキーです: {key}")
+        if not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+            raise ValueError(f"{key} は文字列のリストである必要があります")
+    for word in data.get('prohibited_words', ()):
+        if not normalize_text(word):
+            # 正規化すると空になるワードはすべての発言に一致するため受け付けない
+            raise ValueError(f"禁止ワード「{word}」は区切り文字だけのため使用できません")
+    for pattern in data.get('attack_patterns', ()):
+        try:
+            re.compile(pattern)
+        except re.error as e:
+            raise ValueError(f"人称攻撃パターンが不正です: {pattern}（{e}）") from None
+    return data
+
+
+def _file_signature(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class ConfigWatcher:
+    """
+    設定ファイルの監視
+
+    interval秒ごとにファイルの更新時刻とサイズを確認し、変わっていればスレッドで
+    設定を構築してから on_reload に渡す。読み込みに失敗した場合は現在の設定を使い続ける。
+    ファイルが削除された場合は config.py の値に戻す。
+    """
+
+    def __init__(self, path: str, interval: float, on_reload: Callable[[RuntimeConfig], None]):
+        self.path = path
+        self.interval = interval
+        self.on_reload = on_reload
+        self._signature = _file_signature(path)
+        self._version = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def load_initial(self) -> RuntimeConfig:
+        """起動時の設定を構築（読み込みに失敗した場合は既定値）"""
+        try:
+            return build_runtime_config(load_overrides(self.path))
+        except Exception as e:
+            print(f"⚠️ 設定ファイルを読み込めないため既定値を使用します: {e}")
+            return build_runtime_config({})
+
+    def start(self):
+        self._task = asyncio.create_task(self._watch_loop())
+
+    def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _watch_loop(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                signature = _file_signature(self.path)
+                if signature != self._signature:
+                    self._signature = signature
+                    await self.reload()
+            except Exception as e:
+                # 監視を止めない（次のファイル変更で再度読み込む）
+                print(f"⚠️ 設定ファイルの監視中にエラーが発生しました: {e}")
+
+    async def reload(self) -> bool:
+        """設定を読み込み直して差し替える"""
+        started = time.perf_counter()
+        version = self._version + 1
+        try:
+            runtime = await asyncio.to_thread(
+                lambda: build_runtime_config(load_overrides(self.path), version)
+            )
+        except Exception as e:
+            reloads.labels('error').inc()
+            print(f"⚠️ 設定の再読み込みに失敗しました（現在の設定を継続します）: {e}")
+            return False
+
+        self._version = version
+        self.on_reload(runtime)
+        elapsed = time.perf_counter() - started
+        reload_seconds.observe(elapsed)
+        reloads.labels('ok').inc()
+        print(
+            f"設定を再読み込みしました（議題 {len(runtime.topics)}件・"
+            f"禁止ワード {len(runtime.moderation_engine.words)}件、{elapsed * 1000:.0f}ms）"
+        )
+        return True
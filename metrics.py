@@ -0,0 +1,236 @@
+"""
+メトリクス
+処理時間のヒストグラム・カウンター・ゲージを保持し、Prometheusのテキスト形式で公開する。
+記録はイベントループ上から呼び出す前提で、ロックを取らない（1回あたり1µs未満）。
+"""
+
+import asyncio
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+
+# 処理時間ヒストグラムの既定のバケット（秒）
+DEFAULT_BUCKETS = (
+    0.000005, 0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25,
+)
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class Counter:
+    """単調増加するカウンター"""
+
+    __slots__ = ('value',)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount: float = 1):
+        self.value += amount
+
+
+class Histogram:
+    """固定バケットのヒストグラム（各バケットの件数は累積せずに保持し、出力時に累積する）"""
+
+    __slots__ = ('bounds', 'counts', 'sum')
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.bounds = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+
+class _Family:
+    """ラベルの組ごとに子メトリクスを持つメトリクス"""
+
+    kind = ''
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        if not self.labelnames:
+            self._unlabeled = self._child(())
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def _child(self, values: Tuple[str, ...]):
+        child = self._children.get(values)
+        if child is None:
+            child = self._children[values] = self._new_child()
+        return child
+
+    def labels(self, *values: str):
+        """ラベル値に対応する子メトリクス（ホットパスでは取得した子を保持して使う）"""
+        return self._child(values)
+
+    def render(self) -> List[str]:
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+        for values, child in self._children.items():
+            lines.extend(self._render_child(values, child))
+        return lines
+
+    def _render_child(self, values, child) -> List[str]:
+        raise NotImplementedError
+
+
+class CounterFamily(_Family):
+    kind = 'counter'
+
+    def _new_child(self):
+        return Counter()
+
+    def inc(self, amount: float = 1):
+        self._unlabeled.value += amount
+
+    def _render_child(self, values, child) -> List[str]:
+        return [f'{self.name}{_format_labels(self.labelnames, values)} {_format_value(child.value)}']
+
+
+class HistogramFamily(_Family):
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return Histogram(self.buckets)
+
+    def observe(self, value: float):
+        self._unlabeled.observe(value)
+
+    def _render_child(self, values, child) -> List[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(child.bounds + (float('inf'),), child.counts):
+            cumulative += count
+            labels = _format_labels(self.labelnames, values, f'le="{_format_value(bound)}"')
+            lines.append(f'{self.name}_bucket{labels} {cumulative}')
+        labels = _format_labels(self.labelnames, values)
+        lines.append(f'{self.name}_sum{labels} {_format_value(child.sum)}')
+        lines.append(f'{self.name}_count{labels} {cumulative}')
+        return lines
+
+
+class GaugeFamily(_Family):
+    """出力時に関数を呼び出して値を取得するゲージ"""
+
+    kind = 'gauge'
+
+    def __init__(self, name: str, documentation: str, function: Callable[[], float]):
+        self.function = function
+        super().__init__(name, documentation)
+
+    def _new_child(self):
+        return None
+
+    def _render_child(self, values, child) -> List[str]:
+        return [f'{self.name} {_format_value(self.function())}']
+
+
+class Registry:
+    """メトリクスの登録先"""
+
+    def __init__(self):
+        self._families: Dict[str, _Family] = {}
+
+    def _register(self, family: _Family) -> _Family:
+        if family.name in self._families:
+            raise ValueError(f"メトリクス {family.name} は登録済みです")
+        self._families[family.name] = family
+        return family
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> CounterFamily:
+        return self._register(CounterFamily(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> HistogramFamily:
+        return self._register(HistogramFamily(name, documentation, labelnames, buckets))
+
+    def gauge(self, name: str, documentation: str, function: Callable[[], float]) -> GaugeFamily:
+        return self._register(GaugeFamily(name, documentation, function))
+
+    def render(self) -> str:
+        """Prometheusのテキスト形式（version 0.0.4）で出力"""
+        lines = []
+        for family in self._families.values():
+            lines.extend(family.render())
+        return '\n'.join(lines) + '\n'
+
+
+# Bot全体で共有するレジストリ
+REGISTRY = Registry()
+
+
+class MetricsServer:
+    """GET /metrics にPrometheusのテキスト形式で応答するHTTPサーバー"""
+
+    def __init__(self, registry: Registry, host: str, port: int):
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self._server: Optional[asyncio.base_events.Server] = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), timeout=5)
+            # ヘッダーは読み捨てる
+            while True:
+                line = await asyncio.wait_for(reader.readline(), timeout=5)
+                if line in (b'\r\n', b'\n', b''):
+                    break
+
+            parts = request_line.decode('latin-1').split()
+            if len(parts) >= 2 and parts[0] == 'GET' and parts[1].split('?')[0] == '/metrics':
+                status = '200 OK'
+                body = self.registry.render().encode('utf-8')
+                content_type = 'text/plain; version=0.0.4; charset=utf-8'
+            else:
+                status = '404 Not Found'
+                body = b'not found\n'
+                content_type = 'text/plain; charset=utf-8'
+
+            writer.write(
+                f'HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\n'
+                f'Content-Length: {len(body)}\r\nConnection: close\r\n\r\n'.encode('latin-1') + body
+            )
+            await writer.drain()
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+        finally:
+            writer.close()
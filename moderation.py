@@ -0,0 +1,311 @@
+"""
+禁止コンテンツ検出エンジン
+禁止ワードのAho-Corasickオートマトンと人称攻撃パターンの正規表現を
+起動時に一度だけ構築し、禁止ワードは各メッセージを1パスで走査する
+"""
+
+import hashlib
+import re
+import unicodedata
+from collections import deque
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+
+# 人称攻撃検出時の理由メッセージ
+ATTACK_REASON = "人格攻撃的な表現が含まれています"
+
+
+# 伏せ字・区切りとして挿入されがちな文字（「バ○カ」「バ・カ」「バ カ」など）
+FILLER_CHARACTERS = (
+    ' \t\r\n\u3000'
+    '\u200b\u200c\u200d\u2060\ufeff'
+    '○◯●〇◎□■◇◆△▲▽▼☆★※'
+    '*・･.,_-~〜|/\\\'"`'
+)
+
+# 区切り文字を除去する正規表現
+_FILLER_RE = re.compile(f'[{re.escape(FILLER_CHARACTERS)}]+')
+
+# ひらがな→カタカナ変換表
+_KANA_FOLD: Dict[str, str] = {
+    chr(code): chr(code + 0x60)
+    for code in list(range(0x3041, 0x3097)) + [0x309D, 0x309E]
+}
+_KANA_FOLD_TABLE = str.maketrans(_KANA_FOLD)
+
+
+def normalize_width(text: str) -> str:
+    """
+    NFKC正規化（全角・半角の統一）のみを行う
+    人称攻撃パターンはこのテキストに対して照合する（空白・改行・記号・大文字小文字はそのまま残る）
+    """
+    if not unicodedata.is_normalized('NFKC', text):
+        # 正規化済みの判定は正規化より桁違いに速い（全角記号を含まない発言の多くは正規化済み）
+        text = unicodedata.normalize('NFKC', text)
+    return text
+
+
+def _strip_normalized(text: str) -> str:
+    """normalize_width() 済みのテキストを小文字化し、区切り文字を除去"""
+    return _FILLER_RE.sub('', text.lower())
+
+
+def strip_fillers(text: str) -> str:
+    """NFKC正規化と小文字化を行い、区切り文字を除去"""
+    return _strip_normalized(normalize_width(text))
+
+
+def fold_kana(text: str) -> str:
+    """ひらがなをカタカナに統一"""
+    return text.translate(_KANA_FOLD_TABLE)
+
+
+def normalize_text(text: str) -> str:
+    """
+    禁止ワード照合用の正規化
+    NFKC → 小文字化 → 区切り文字除去 → ひらがな/カタカナ統一
+    """
+    return fold_kana(strip_fillers(text))
+
+
+def _min_index(a: int, b: int) -> int:
+    """-1を「一致なし」として扱う最小値"""
+    if a == -1:
+        return b
+    if b == -1:
+        return a
+    return min(a, b)
+
+
+class ModerationHit(NamedTuple):
+    """検出結果"""
+    kind: str   # 'word' または 'pattern'
+    rule: str   # 一致した禁止ワード、または正規表現パターン
+    index: int  # 禁止ワードリスト／パターンリスト内の位置
+
+    @property
+    def reason(self) -> str:
+        """ユーザー向けの理由メッセージ"""
+        if self.kind == 'word':
+            return f"禁止ワード「{self.rule}」が含まれています"
+        return ATTACK_REASON
+
+
+class ModerationEngine:
+    """
+    禁止コンテンツ検出エンジン
+
+    禁止ワードはAho-Corasickオートマトンで、人称攻撃パターンは個別にコンパイルした正規表現で照合する。
+    （パターンを1本の正規表現に結合すると、先頭の固定文字列による高速な検索が効かなくなり、
+    既定の5パターンでも個別の照合より数倍遅い）
+    禁止ワードはメッセージと同じ方法で事前に正規化しておき、
+    別表記（「バ○カ」「ﾊﾞｶ」「ばか」など）も同じワードとして検出する。
+    人称攻撃パターンはNFKC正規化のみ行った本文に照合し、パターンに書いたとおりの意味で評価する。
+    複数の禁止ワードが含まれる場合はリストの先頭に近いものを報告する。
+    正規化すると空になる禁止ワード（「・」「〜」など区切り文字だけのもの）は照合しない。
+    """
+
+    def __init__(self, words: Sequence[str], patterns: Sequence[str]):
+        self.words: Tuple[str, ...] = tuple(words)
+        self.patterns: Tuple[str, ...] = tuple(patterns)
+        # 禁止ワード・人称攻撃パターン（順序を含む）が同じなら同じ値になる（判定キャッシュのキーに使用）
+        self.ruleset_version: bytes = hashlib.blake2b(
+            ('\x00'.join(self.words) + '\x01' + '\x00'.join(self.patterns)).encode('utf-8'),
+            digest_size=16
+        ).digest()
+
+        self._build_automaton()
+
+        # 人称攻撃パターン（不正なパターンは re.error を送出する）
+        self._pattern_res: List[re.Pattern] = [re.compile(pattern) for pattern in self.patterns]
+
+    def _build_automaton(self):
+        """禁止ワードからAho-Corasickオートマトンを構築"""
+        goto: List[Dict[str, int]] = [{}]
+        # 各ノードで終端する禁止ワードの最小インデックス（なければ-1）
+        terminal: List[int] = [-1]
+        # 各ノードで終端する禁止ワードのすべてのインデックス（正規化後に同じになるワードを含む）
+        terminals: Dict[int, List[int]] = {}
+
+        for index, word in enumerate(self.words):
+            normalized = normalize_text(word)
+            if not normalized:
+                # 空のワードはすべての発言に一致してしまう
+                print(f"⚠️ 禁止ワード「{word}」は区切り文字だけのため照合しません")
+                continue
+            node = 0
+            for char in normalized:
+                next_node = goto[node].get(char)
+                if next_node is None:
+                    next_node = len(goto)
+                    goto[node][char] = next_node
+                    goto.append({})
+                    terminal.append(-1)
+                node = next_node
+            if terminal[node] == -1:
+                terminal[node] = index
+            terminals.setdefault(node, []).append(index)
+
+        # 失敗遷移をBFSで計算し、出力リンクを辿った最小インデックスを畳み込む
+        fail = [0] * len(goto)
+        best = list(terminal)
+        # 失敗遷移を辿って最初に到達する終端ノード（find_all用の出力リンク、なければ0）
+        output_link = [0] * len(goto)
+        queue = deque()
+        for child in goto[0].values():
+            best[child] = _min_index(best[child], best[0])
+            queue.append(child)
+
+        while queue:
+            node = queue.popleft()
+            for char, child in goto[node].items():
+                state = fail[node]
+                while state and char not in goto[state]:
+                    state = fail[state]
+                fail[child] = goto[state].get(char, 0)
+                best[child] = _min_index(best[child], best[fail[child]])
+                output_link[child] = fail[child] if fail[child] in terminals else output_link[fail[child]]
+                queue.append(child)
+
+        self._goto = goto
+        self._fail = fail
+        self._best = best
+        self._terminals = terminals
+        self._output_link = output_link
+
+        # ルート状態で禁止ワードの先頭文字まで一気に読み飛ばすための正規表現
+        # （カタカナで始まるワードは対応するひらがなも対象にする）
+        kana_unfold = {v: k for k, v in _KANA_FOLD.items()}
+        first_chars = ''.join(sorted(
+            set(goto[0]) | {kana_unfold[c] for c in goto[0] if c in kana_unfold}
+        ))
+        self._skip_re = re.compile(f'[{re.escape(first_chars)}]') if first_chars else None
+
+    def find_word(self, text: str) -> Optional[ModerationHit]:
+        """
+        禁止ワードを検索（テキストは呼び出し側でstrip_fillers済みであること）
+        ひらがな/カタカナの統一は走査中に行う
+
+        Returns:
+            一致した禁止ワードのうちリストの先頭に最も近いもの
+        """
+        goto = self._goto
+        fail = self._fail
+        best = self._best
+        kana_fold = _KANA_FOLD
+
+        skip_re = self._skip_re
+        if skip_re is None:
+            return None
+        found = -1
+
+        node = 0
+        position = 0
+        length = len(text)
+        while position < length:
+            if node == 0:
+                match = skip_re.search(text, position)
+                if match is None:
+                    break
+                position = match.start()
+
+            char = text[position]
+            char = kana_fold.get(char, char)
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+
+            candidate = best[node]
+            if candidate != -1 and (found == -1 or candidate < found):
+                found = candidate
+                if found == 0:
+                    break
+            position += 1
+
+        if found == -1:
+            return None
+        return ModerationHit('word', self.words[found], found)
+
+    def find_pattern(self, text: str) -> Optional[ModerationHit]:
+        """
+        人称攻撃パターンを検索（テキストは呼び出し側でnormalize_width済みであること）
+        最も左で一致したもの、同じ位置ならリストの先頭に近いものを返す
+        """
+        found = -1
+        found_start = -1
+        for index, pattern_re in enumerate(self._pattern_res):
+            match = pattern_re.search(text)
+            if match is not None and (found == -1 or match.start() < found_start):
+                found = index
+                found_start = match.start()
+                if found_start == 0:
+                    break
+        if found == -1:
+            return None
+        return ModerationHit('pattern', self.patterns[found], found)
+
+    def find_all_words(self, text: str) -> List[int]:
+        """
+        一致したすべての禁止ワードのインデックスを昇順で返す
+        （テキストは呼び出し側でstrip_fillers済みであること）
+        """
+        goto = self._goto
+        fail = self._fail
+        terminals = self._terminals
+        output_link = self._output_link
+        kana_fold = _KANA_FOLD
+
+        found = set()
+        node = 0
+        for char in text:
+            char = kana_fold.get(char, char)
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+
+            state = node if node in terminals else output_link[node]
+            while state:
+                found.update(terminals[state])
+                state = output_link[state]
+
+        return sorted(found)
+
+    def find_all(self, text: str) -> List[ModerationHit]:
+        """
+        一致したすべての禁止ワードと人称攻撃パターンを返す（アーカイブの再検査用）
+        禁止ワード→人称攻撃パターンの順で、それぞれリストの順に並ぶ
+        """
+        normalized = normalize_width(text)
+        hits = [
+            ModerationHit('word', self.words[index], index)
+            for index in self.find_all_words(_strip_normalized(normalized))
+        ]
+
+        for index, pattern_re in enumerate(self._pattern_res):
+            if pattern_re.search(normalized):
+                hits.append(ModerationHit('pattern', self.patterns[index], index))
+
+        return hits
+
+    def find(self, text: str) -> Optional[ModerationHit]:
+        """禁止ワード→人称攻撃パターンの順に検索"""
+        return self.find_normalized(normalize_width(text))
+
+    def find_normalized(self, normalized: str) -> Optional[ModerationHit]:
+        """find() と同じ検索（テキストは呼び出し側でnormalize_width済みであること）"""
+        hit = self.find_word(_strip_normalized(normalized))
+        if hit is not None:
+            return hit
+        return self.find_pattern(normalized)
+
+    def check(self, text: str) -> Tuple[bool, Optional[str]]:
+        """
+        禁止コンテンツチェック
+
+        Returns:
+            (is_safe, reason)
+        """
+        hit = self.find(text)
+        if hit is None:
+            return True, None
+        return False, hit.reason
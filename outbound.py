@@ -0,0 +1,249 @@
+"""
+送信パイプライン
+チャンネルごとにキューを持ち、同じティック内に発行された通知を1通にまとめて送信する。
+Discordのレート制限を先回りで守り、モデレーション操作を優先する。
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional
+
+import discord
+
+
+# 優先度（小さいほど先に処理）
+PRIORITY_MODERATION = 0
+PRIORITY_NORMAL = 1
+
+# Discordのメッセージ上限
+MAX_CONTENT_LENGTH = 2000
+MAX_EMBEDS = 10
+MAX_EMBED_TOTAL_LENGTH = 6000  # 1メッセージ内のEmbedの文字数（タイトル・説明・フィールドなど）の合計
+
+
+class RateLimitBucket:
+    """
+    スライディングウィンドウ方式のレート制限バケット
+    period秒あたりlimit回を超えないよう、次の送信までの待ち時間を予約する
+    """
+
+    __slots__ = ('limit', 'period', '_sent')
+
+    def __init__(self, limit: int, period: float):
+        self.limit = limit
+        self.period = period
+        self._sent: Deque[float] = deque()
+
+    def reserve(self, now: Optional[float] = None) -> float:
+        """送信枠を1つ予約し、送信可能になるまでの秒数を返す"""
+        now = time.monotonic() if now is None else now
+        sent = self._sent
+        while sent and sent[0] <= now - self.period:
+            sent.popleft()
+
+        if len(sent) < self.limit:
+            sent.append(now)
+            return 0.0
+
+        start = sent[-self.limit] + self.period
+        sent.append(start)
+        return start - now
+
+    def idle(self, now: Optional[float] = None) -> bool:
+        """予約済みの送信枠がすべて期限切れか"""
+        now = time.monotonic() if now is None else now
+        return not self._sent or self._sent[-1] <= now - self.period
+
+
+class _Item:
+    __slots__ = ('priority', 'content', 'embed', 'message', 'edit_id')
+
+    def __init__(self, priority: int, content: Optional[str] = None,
+                 embed: Optional[discord.Embed] = None, message: Optional[discord.Message] = None,
+                 edit_id: Optional[int] = None):
+        self.priority = priority
+        self.content = content
+        self.embed = embed
+        self.message = message
+        self.edit_id = edit_id
+
+
+class _ChannelQueue:
+    __slots__ = ('channel', 'items', 'send_bucket', 'delete_bucket', 'task')
+
+    def __init__(self, channel, send_bucket: RateLimitBucket, delete_bucket: RateLimitBucket):
+        self.channel = channel
+        self.items: List[_Item] = []
+        self.send_bucket = send_bucket
+        self.delete_bucket = delete_bucket
+        self.task: Optional[asyncio.Task] = None
+
+
+class OutboundDispatcher:
+    """
+    チャンネル別の送信キュー
+
+    post() / delete() / edit() は待たずにキューへ積むだけで、実際の送信はチャンネルごとの
+    タスクが次のティックで行う。そのため1つのイベント処理中に発行した通知は
+    まとめて1通になる。削除と警告などのモデレーション操作は通常の通知より先に処理する。
+    同じメッセージへの編集が溜まっている場合は最後の内容だけを反映する。
+    """
+
+    def __init__(
+        self,
+        channel_limit: int = 5,
+        channel_period: float = 5.0,
+        delete_limit: int = 5,
+        delete_period: float = 1.0,
+        global_limit: int = 50,
+        global_period: float = 1.0
+    ):
+        self._channel_limit = channel_limit
+        self._channel_period = channel_period
+        self._delete_limit = delete_limit
+        self._delete_period = delete_period
+        self._global_bucket = RateLimitBucket(global_limit, global_period)
+        self._channels: Dict[int, _ChannelQueue] = {}
+        self._buckets: Dict[int, tuple] = {}  # channel_id: (送信バケット, 削除バケット)
+        self._purge_threshold = 1024  # バケット数がこれを超えたら期限切れのバケットを破棄
+
+        # 統計
+        self.requested = 0   # post() / delete() の呼び出し回数
+        self.api_calls = 0   # 実際のAPI呼び出し回数
+
+    def post(
+        self,
+        channel,
+        content: Optional[str] = None,
+        *,
+        embed: Optional[discord.Embed] = None,
+        priority: int = PRIORITY_NORMAL
+    ):
+        """メッセージ送信をキューに追加"""
+        self._enqueue(channel, _Item(priority, content=content, embed=embed))
+
+    def delete(self, message: discord.Message):
+        """メッセージ削除をキューに追加（モデレーション優先度）"""
+        self._enqueue(message.channel, _Item(PRIORITY_MODERATION, message=message))
+
+    def edit(self, channel, message_id: int, *, embed: discord.Embed):
+        """送信済みメッセージのEmbed編集をキューに追加"""
+        self._enqueue(channel, _Item(PRIORITY_NORMAL, embed=embed, edit_id=message_id))
+
+    async def drain(self):
+        """キューに積まれた送信がすべて完了するまで待機"""
+        while self._channels:
+            tasks = [queue.task for queue in self._channels.values() if queue.task is not None]
+            if not tasks:
+                break
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _enqueue(self, channel, item: _Item):
+        self.requested += 1
+        queue = self._channels.get(channel.id)
+        if queue is None:
+            buckets = self._buckets.get(channel.id)
+            if buckets is None:
+                if len(self._buckets) > self._purge_threshold:
+                    self._purge_idle_buckets()
+                buckets = self._buckets[channel.id] = (
+                    RateLimitBucket(self._channel_limit, self._channel_period),
+                    RateLimitBucket(self._delete_limit, self._delete_period),
+                )
+            queue = self._channels[channel.id] = _ChannelQueue(channel, *buckets)
+        queue.items.append(item)
+        if queue.task is None:
+            queue.task = asyncio.create_task(self._run(queue))
+
+    def _purge_idle_buckets(self):
+        """
+        送信枠がすべて期限切れになったチャンネルのバケットを破棄
+        多数のチャンネルが同時に送信中で破棄できない場合に走査を繰り返さないよう、
+        次の走査は残ったバケット数と同じだけ増えてから行う
+        """
+        now = time.monotonic()
+        for channel_id in [
+            channel_id for channel_id, (send_bucket, delete_bucket) in self._buckets.items()
+            if channel_id not in self._channels and send_bucket.idle(now) and delete_bucket.idle(now)
+        ]:
+            del self._buckets[channel_id]
+        self._purge_threshold = len(self._buckets) + max(1024, len(self._buckets))
+
+    async def _run(self, queue: _ChannelQueue):
+        try:
+            while queue.items:
+                items = sorted(queue.items, key=lambda item: item.priority)
+                queue.items = []
+
+                edits: Dict[int, _Item] = {}
+                for item in items:
+                    if item.message is not None:
+                        await self._wait(queue.delete_bucket)
+                        await self._call(item.message.delete())
+                    elif item.edit_id is not None:
+                        edits[item.edit_id] = item
+
+                for message_id, item in edits.items():
+                    await self._wait(queue.send_bucket)
+                    await self._call(queue.channel.get_partial_message(message_id).edit(embed=item.embed))
+
+                for content, embeds in _compose(items):
+                    await self._wait(queue.send_bucket)
+                    if embeds:
+                        await self._call(queue.channel.send(content=content, embeds=embeds))
+                    else:
+                        await self._call(queue.channel.send(content=content))
+        finally:
+            queue.task = None
+            channel_id = queue.channel.id
+            if not queue.items and self._channels.get(channel_id) is queue:
+                del self._channels[channel_id]
+
+    async def _wait(self, bucket: RateLimitBucket):
+        now = time.monotonic()
+        delay = max(bucket.reserve(now), self._global_bucket.reserve(now))
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def _call(self, coro):
+        self.api_calls += 1
+        try:
+            await coro
+        except discord.NotFound:
+            pass
+        except discord.HTTPException as e:
+            print(f"⚠️ メッセージの送信・削除に失敗しました: {e}")
+
+
+def _compose(items: List[_Item]):
+    """通知を本文2000文字・Embed10件（合計6000文字）の上限内でまとめ、(content, embeds) を順に返す"""
+    lines: List[str] = []
+    length = 0
+    embeds: List[discord.Embed] = []
+    embed_length = 0
+
+    for item in items:
+        if item.message is not None or item.edit_id is not None:
+            continue
+
+        content = item.content
+        if content is not None:
+            added = len(content) + (1 if lines else 0)
+            if lines and length + added > MAX_CONTENT_LENGTH:
+                yield '\n'.join(lines), embeds
+                lines, length, embeds, embed_length = [], 0, [], 0
+                added = len(content)
+            lines.append(content)
+            length += added
+
+        if item.embed is not None:
+            added = len(item.embed)
+            if embeds and (len(embeds) >= MAX_EMBEDS or embed_length + added > MAX_EMBED_TOTAL_LENGTH):
+                yield ('\n'.join(lines) or None), embeds
+                lines, length, embeds, embed_length = [], 0, [], 0
+            embeds.append(item.embed)
+            embed_length += added
+
+    if lines or embeds:
+        yield ('\n'.join(lines) or None), embeds
@@ -0,0 +1,254 @@
+"""
+アーカイブ済みディベートのモデレーション再検査（オフライン）
+禁止ワードや人称攻撃パターンを追加したときに、過去のディベートで新しいルールが
+どの発言に一致したかを確認する。
+
+アーカイブを1件ずつ読みながら発言をチャンクにまとめ、プロセスプールで並列に検査する。
+未完了のチャンクはワーカー数の2倍までに抑えるため、アーカイブが大きくてもメモリ使用量は増えない。
+各発言は ModerationEngine.find_all で検査し、最初の1件だけでなく一致したすべてのルールを数える。
+
+既定では稼働中のBotと同じく、config.py のルールを LIVE_CONFIG_PATH の設定ファイルで上書きしたものを使う。
+
+使い方:
+    python rescan_archives.py                               # 稼働中と同じルールで LOG_DIRECTORY を再検査
+    python rescan_archives.py --live-config ''              # 設定ファイルを使わず config.py のルールで再検査
+    python rescan_archives.py --words new_words.txt         # ファイルのワードを追加して再検査（1行1件）
+    python rescan_archives.py --only-added --patterns new_patterns.txt
+    python rescan_archives.py --workers 8 --output report.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from archiver import iter_archive_files, read_archive
+from config import LIVE_CONFIG_PATH, LOG_DIRECTORY
+from live_config import CONFIG_KEYS, load_overrides
+from moderation import ModerationEngine
+
+
+# 1チャンクあたりの発言数の目安（ディベートの途中では分割しない）
+DEFAULT_CHUNK_SIZE = 2000
+
+# ルールごとに保持する該当例の数
+EXAMPLE_LIMIT = 3
+
+# 該当例として保存する本文の最大文字数
+EXAMPLE_CHARS = 80
+
+# ディベートの識別情報（終了日時, チャンネルID）と発言本文のリスト
+DebateContents = Tuple[Tuple[Optional[str], Optional[int]], List[str]]
+
+# ルールの識別子（'word' / 'pattern', リスト内のインデックス）
+RuleKey = Tuple[str, int]
+
+# ワーカープロセスごとのモデレーションエンジン
+_engine: Optional[ModerationEngine] = None
+
+
+def _init_worker(words: List[str], patterns: List[str]):
+    global _engine
+    _engine = ModerationEngine(words, patterns)
+
+
+def scan_chunk(chunk: List[DebateContents]) -> Tuple[int, Dict[RuleKey, List]]:
+    """
+    チャンク内の発言を検査する（ワーカープロセスで実行）
+    発言数と、ルールごとの [該当発言数, 該当ディベート数, 該当例] を返す
+    """
+    engine = _engine
+    scanned = 0
+    hits: Dict[RuleKey, List] = {}
+    for (ended_at, channel_id), contents in chunk:
+        matched = set()
+        for turn, content in enumerate(contents):
+            scanned += 1
+            for hit in engine.find_all(content):
+                key = (hit.kind, hit.index)
+                stats = hits.get(key)
+                if stats is None:
+                    stats = hits[key] = [0, 0, []]
+                stats[0] += 1
+                if key not in matched:
+                    matched.add(key)
+                    stats[1] += 1
+                if len(stats[2]) < EXAMPLE_LIMIT:
+                    stats[2].append({
+                        'ended_at': ended_at,
+                        'channel_id': channel_id,
+                        'turn': turn,
+                        'content': content[:EXAMPLE_CHARS],
+                    })
+    return scanned, hits
+
+
+def iter_chunks(directory: str, chunk_size: int) -> Iterator[List[DebateContents]]:
+    """アーカイブを読みながら、発言数がchunk_size程度になるようディベートをまとめる"""
+    chunk: List[DebateContents] = []
+    size = 0
+    for path in iter_archive_files(directory):
+        for record in read_archive(path):
+            log = record.get('log')
+            if not log:
+                continue
+            chunk.append((
+                (record.get('ended_at'), record.get('channel_id')),
+                [entry['content'] for entry in log]
+            ))
+            size += len(log)
+            if size >= chunk_size:
+                yield chunk
+                chunk, size = [], 0
+    if chunk:
+        yield chunk
+
+
+class RescanReport:
+    """ルールごとの集計"""
+
+    def __init__(self, words: List[str], patterns: List[str]):
+        self.words = words
+        self.patterns = patterns
+        self.debates = 0
+        self.messages = 0
+        self.hits: Dict[RuleKey, List] = {}
+
+    def merge(self, debates: int, messages: int, hits: Dict[RuleKey, List]):
+        self.debates += debates
+        self.messages += messages
+        for key, (message_hits, debate_hits, examples) in hits.items():
+            stats = self.hits.get(key)
+            if stats is None:
+                self.hits[key] = [message_hits, debate_hits, examples[:EXAMPLE_LIMIT]]
+                continue
+            stats[0] += message_hits
+            stats[1] += debate_hits
+            stats[2].extend(examples[:EXAMPLE_LIMIT - len(stats[2])])
+
+    def rule(self, key: RuleKey) -> str:
+        kind, index = key
+        return self.words[index] if kind == 'word' else self.patterns[index]
+
+    def rows(self) -> List[Dict]:
+        """該当発言数の多い順にルールごとの集計を返す"""
+        return [
+            {
+                'kind': key[0],
+                'rule': self.rule(key),
+                'messages': message_hits,
+                'debates': debate_hits,
+                'examples': examples,
+            }
+            for key, (message_hits, debate_hits, examples) in sorted(
+                self.hits.items(), key=lambda item: (-item[1][0], item[0])
+            )
+        ]
+
+
+def rescan(
+    directory: str,
+    words: List[str],
+    patterns: List[str],
+    workers: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> RescanReport:
+    """
+    アーカイブ全体をプロセスプールで再検査する
+    未完了のチャンクはワーカー数の2倍までに抑え、完了したものから集計する
+    """
+    workers = workers or os.cpu_count() or 1
+    report = RescanReport(words, patterns)
+    pending = {}  # future: チャンク内のディベート数
+
+    def collect(done):
+        for future in done:
+            debates = pending.pop(future)
+            scanned, hits = future.result()
+            report.merge(debates, scanned, hits)
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(words, patterns)) as pool:
+        for chunk in iter_chunks(directory, chunk_size):
+            if len(pending) >= workers * 2:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                collect(done)
+            pending[pool.submit(scan_chunk, chunk)] = len(chunk)
+        collect(wait(pending).done)
+
+    return report
+
+
+def load_rules(path: str) -> List[str]:
+    """1行1件のルールファイルを読み込む（空行と#で始まる行は無視）"""
+    with open(path, encoding='utf-8') as f:
+        return [line.rstrip('\n') for line in f if line.strip() and not line.startswith('#')]
+
+
+def print_report(report: RescanReport, added_words: int, added_patterns: int):
+    print(f"{'種別':<8} {'該当発言':>8} {'ディベート':>10}  ルール")
+    for key, (message_hits, debate_hits, _) in sorted(report.hits.items(), key=lambda item: (-item[1][0], item[0])):
+        kind, index = key
+        added = index >= len(report.words) - added_words if kind == 'word' \
+            else index >= len(report.patterns) - added_patterns
+        label = f"{report.rule(key)}{'（追加）' if added else ''}"
+        print(f"{kind:<8} {message_hits:>8} {debate_hits:>10}  {label}")
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description='アーカイブ済みディベートのモデレーション再検査')
+    parser.add_argument('--directory', default=LOG_DIRECTORY, help='アーカイブのディレクトリ')
+    parser.add_argument(
+        '--live-config', default=LIVE_CONFIG_PATH,
+        help='ルールを上書きする設定ファイル（空文字で config.py のルールのみ）'
+    )
+    parser.add_argument('--words', help='追加する禁止ワードのファイル（1行1件）')
+    parser.add_argument('--patterns', help='追加する人称攻撃パターンのファイル（1行1件の正規表現）')
+    parser.add_argument('--only-added', action='store_true', help='追加したルールだけで検査する')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='ワーカープロセス数')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='1チャンクあたりの発言数')
+    parser.add_argument('--output', help='集計を書き出すJSONのパス')
+    args = parser.parse_args(argv)
+
+    added_words = load_rules(args.words) if args.words else []
+    added_patterns = load_rules(args.patterns) if args.patterns else []
+    if args.only_added:
+        if not added_words and not added_patterns:
+            print("❌ --only-added には --words または --patterns が必要です")
+            sys.exit(1)
+        words, patterns = added_words, added_patterns
+    else:
+        # 稼働中のBotと同じく、設定ファイルにない項目は config.py の値を使う
+        try:
+            overrides = load_overrides(args.live_config) if args.live_config else {}
+        except (OSError, ValueError) as e:
+            print(f"❌ 設定ファイルを読み込めません: {args.live_config}（{e}）")
+            sys.exit(1)
+        words = list(overrides.get('prohibited_words', CONFIG_KEYS['prohibited_words'])) + added_words
+        patterns = list(overrides.get('attack_patterns', CONFIG_KEYS['attack_patterns'])) + added_patterns
+
+    started = time.perf_counter()
+    report = rescan(args.directory, words, patterns, args.workers, args.chunk_size)
+    elapsed = time.perf_counter() - started
+    print(
+        f"ディベート {report.debates}件・発言 {report.messages}件を再検査しました"
+        f"（{elapsed:.2f}秒 / {report.messages / elapsed if elapsed else 0:,.0f}発言/秒 / "
+        f"ワーカー {args.workers}）"
+    )
+    print_report(report, len(added_words), len(added_patterns))
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({
+                'directory': args.directory,
+                'debates': report.debates,
+                'messages': report.messages,
+                'rules': report.rows(),
+            }, f, ensure_ascii=False, indent=1)
+        print(f"集計を書き出しました: {args.output}")
+
+
+if __name__ == '__main__':
+    main()
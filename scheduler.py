@@ -0,0 +1,168 @@
+"""
+締切スケジューラ
+募集締切などの締切をすべて1つのヒープで管理し、
+最も早い締切に合わせたタイマーを1つだけ張る
+"""
+
+import asyncio
+import heapq
+import itertools
+import time
+from typing import Awaitable, Callable, Dict, Hashable, List, Optional, Set
+
+
+# 締切到達時に呼び出すコールバック（コルーチンを返す）
+DeadlineCallback = Callable[[], Awaitable[None]]
+
+# 無効化済みエントリがこの割合を超えたらヒープを再構築する
+_COMPACT_RATIO = 0.5
+
+# 1回のタイマー発火で実行するコールバックの上限
+# 多数の締切が同時に到達しても、残りは次のループ反復に回して他のイベントを止めない
+_MAX_FIRE_PER_TICK = 256
+
+
+class _Entry:
+    __slots__ = ('when', 'seq', 'key', 'callback', 'active')
+
+    def __init__(self, when: float, seq: int, key: Hashable, callback: DeadlineCallback):
+        self.when = when
+        self.seq = seq
+        self.key = key
+        self.callback = callback
+        self.active = True
+
+    def __lt__(self, other: '_Entry') -> bool:
+        return (self.when, self.seq) < (other.when, other.seq)
+
+
+class DeadlineScheduler:
+    """
+    キー付き締切のスケジューラ
+
+    締切はUNIX時刻（time.time()）で指定するため、永続化した締切をそのまま再登録できる。
+    同じキーで登録し直すと以前の締切は取り消される。取り消しはエントリを無効化するだけで
+    ヒープからは遅延削除するため、登録・変更・取り消しはいずれもO(log n)以下。
+    """
+
+    def __init__(self):
+        self._heap: List[_Entry] = []
+        self._entries: Dict[Hashable, _Entry] = {}
+        self._counter = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._timer_when: Optional[float] = None
+        self._running: Set[asyncio.Task] = set()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def deadline(self, key: Hashable) -> Optional[float]:
+        """登録済みの締切を取得"""
+        entry = self._entries.get(key)
+        return entry.when if entry is not None else None
+
+    def schedule(self, key: Hashable, when: float, callback: DeadlineCallback):
+        """締切を登録（同じキーの締切は置き換える）"""
+        self._discard(key)
+        entry = _Entry(when, next(self._counter), key, callback)
+        self._entries[key] = entry
+        heapq.heappush(self._heap, entry)
+        self._arm()
+
+    def reschedule(self, key: Hashable, when: float) -> bool:
+        """締切を変更"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return False
+        self.schedule(key, when, entry.callback)
+        return True
+
+    def extend(self, key: Hashable, seconds: float) -> bool:
+        """締切を延長（負の値で短縮）"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return False
+        return self.reschedule(key, entry.when + seconds)
+
+    def cancel(self, key: Hashable) -> bool:
+        """締切を取り消し"""
+        if not self._discard(key):
+            return False
+        self._arm()
+        return True
+
+    def fire_now(self, key: Hashable) -> bool:
+        """締切を待たずに直ちにコールバックを実行"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return False
+        self._discard(key)
+        self._run(entry)
+        self._arm()
+        return True
+
+    def _discard(self, key: Hashable) -> bool:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        entry.active = False
+        if len(self._heap) > 64 and len(self._entries) < len(self._heap) * _COMPACT_RATIO:
+            self._heap = [e for e in self._heap if e.active]
+            heapq.heapify(self._heap)
+        return True
+
+    def _arm(self):
+        """最も早い締切に合わせてタイマーを張り直す"""
+        heap = self._heap
+        while heap and not heap[0].active:
+            heapq.heappop(heap)
+
+        if not heap:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+                self._timer_when = None
+            return
+
+        when = heap[0].when
+        if self._timer is not None:
+            if self._timer_when <= when:
+                # 既に張られているタイマーの方が早い（発火時に張り直す）
+                return
+            self._timer.cancel()
+
+        loop = asyncio.get_running_loop()
+        self._timer = loop.call_later(max(0.0, when - time.time()), self._on_timer)
+        self._timer_when = when
+
+    def _on_timer(self):
+        self._timer = None
+        self._timer_when = None
+
+        now = time.time()
+        heap = self._heap
+        fired = 0
+        while heap and (not heap[0].active or heap[0].when <= now):
+            if heap[0].active and fired >= _MAX_FIRE_PER_TICK:
+                break
+            entry = heapq.heappop(heap)
+            if entry.active:
+                del self._entries[entry.key]
+                entry.active = False
+                self._run(entry)
+                fired += 1
+
+        self._arm()
+
+    def _run(self, entry: _Entry):
+        task = asyncio.create_task(entry.callback())
+        self._running.add(task)
+        task.add_done_callback(self._on_done)
+
+    def _on_done(self, task: asyncio.Task):
+        self._running.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            print(f"⚠️ 締切処理でエラーが発生しました: {task.exception()!r}")
@@ -0,0 +1,152 @@
+"""
+評価パイプライン
+ディベート終了時の評価を、ヒューリスティック評価（scoring.py）の結果に追加の評価ステージを
+順に適用する形で行う。LLMや自然言語処理による評価のような重い処理は、ステージごとに
+スレッドプール・プロセスプールで実行してイベントループを止めない。
+
+ステージが時間切れ・例外・不正な結果になった場合は、そのステージを飛ばして
+直前の評価（最終的にはヒューリスティック評価）をそのまま使う。
+"""
+
+import asyncio
+import importlib
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, List, Tuple
+
+from metrics import REGISTRY
+from scoring import evaluate_debate
+
+
+# ステージの実行方法
+MODE_INLINE = 'inline'    # イベントループ上で直接実行（軽い処理のみ）
+MODE_THREAD = 'thread'    # スレッドプール（I/O待ちの多い処理。外部APIの呼び出しなど）
+MODE_PROCESS = 'process'  # プロセスプール（CPUを使う処理。ステージと結果はpickle可能であること）
+MODES = (MODE_INLINE, MODE_THREAD, MODE_PROCESS)
+
+# 評価結果の各ディベーターに必要なキー
+SCORE_KEYS = ('consistency', 'clarity', 'structure', 'calmness', 'total')
+
+stage_seconds = REGISTRY.histogram('debate_scoring_stage_seconds', '評価ステージの処理時間（秒）', ['stage'])
+fallbacks = REGISTRY.counter('debate_scoring_fallbacks_total', '評価ステージを飛ばした回数', ['stage', 'reason'])
+
+
+class ScoringStage:
+    """
+    評価ステージの基底クラス
+
+    evaluate() はディベートログ（evaluate_debate と同じ形式）と直前のステージまでの評価を受け取り、
+    同じ形式（{author_id: {'name', 'consistency', 'clarity', 'structure', 'calmness', 'total'}}）の
+    評価を返す。スレッド・プロセスで実行されるため、セッションやBotの状態には触れないこと。
+    """
+
+    name = 'stage'
+
+    def __init__(self, mode: str = MODE_INLINE, timeout: float = 10.0):
+        if mode not in MODES:
+            raise ValueError(f"不明な実行方法です: {mode}")
+        self.mode = mode
+        self.timeout = timeout
+
+    def evaluate(self, log: List[Dict], scores: Dict) -> Dict:
+        raise NotImplementedError
+
+
+class HeuristicStage(ScoringStage):
+    """ヒューリスティック評価をログから計算し直すステージ（動作確認・負荷試験用）"""
+
+    name = 'heuristic'
+
+    def evaluate(self, log: List[Dict], scores: Dict) -> Dict:
+        return evaluate_debate(log)
+
+
+def load_stages(specs: List[Dict]) -> List[ScoringStage]:
+    """
+    設定からステージを生成
+    各要素は {'path': 'モジュール:クラス名', 'mode': 'thread', 'timeout': 10.0, 'options': {...}}
+    """
+    stages = []
+    for spec in specs:
+        module_name, _, class_name = spec['path'].partition(':')
+        stage_class = getattr(importlib.import_module(module_name), class_name)
+        stages.append(stage_class(
+            mode=spec.get('mode', MODE_INLINE),
+            timeout=spec.get('timeout', 10.0),
+            **spec.get('options', {})
+        ))
+    return stages
+
+
+def _is_valid(result, scores: Dict) -> bool:
+    """ステージの結果が直前の評価と同じディベーター・項目を持つか"""
+    if not isinstance(result, dict) or result.keys() != scores.keys():
+        return False
+    return all(
+        isinstance(values, dict) and all(isinstance(values.get(key), (int, float)) for key in SCORE_KEYS)
+        for values in result.values()
+    )
+
+
+class ScoringPipeline:
+    """
+    評価ステージを順に適用するパイプライン
+
+    スレッドプール・プロセスプールはそのモードのステージがある場合だけ作成する。
+    時間切れになったステージの処理は中断されずに実行し続けるため、プールの大きさが
+    重い評価の同時実行数の上限になる（超えた分はプールの空きを待ち、時間切れになりうる）。
+    """
+
+    def __init__(self, stages: List[ScoringStage], thread_workers: int = 4, process_workers: int = 2):
+        self.stages = stages
+        self.thread_workers = thread_workers
+        self.process_workers = process_workers
+        self._executors: Dict[str, Executor] = {}
+
+    def _executor(self, mode: str) -> Executor:
+        executor = self._executors.get(mode)
+        if executor is None:
+            if mode == MODE_THREAD:
+                executor = ThreadPoolExecutor(self.thread_workers, thread_name_prefix='scoring')
+            else:
+                executor = ProcessPoolExecutor(self.process_workers)
+            self._executors[mode] = executor
+        return executor
+
+    async def run(self, log: List[Dict], scores: Dict) -> Tuple[Dict, List[str]]:
+        """
+        ヒューリスティック評価の結果 scores に各ステージを適用し、
+        (最終的な評価, 飛ばしたステージ名のリスト) を返す
+        """
+        skipped: List[str] = []
+        loop = asyncio.get_running_loop()
+        for stage in self.stages:
+            started = loop.time()
+            try:
+                if stage.mode == MODE_INLINE:
+                    result = stage.evaluate(log, scores)
+                else:
+                    result = await asyncio.wait_for(
+                        loop.run_in_executor(self._executor(stage.mode), stage.evaluate, log, scores),
+                        stage.timeout
+                    )
+            except asyncio.TimeoutError:
+                reason = 'timeout'
+            except Exception as e:
+                print(f"⚠️ 評価ステージ {stage.name} でエラーが発生しました: {e!r}")
+                reason = 'error'
+            else:
+                reason = None if _is_valid(result, scores) else 'invalid'
+            stage_seconds.labels(stage.name).observe(loop.time() - started)
+
+            if reason is None:
+                scores = result
+            else:
+                fallbacks.labels(stage.name, reason).inc()
+                skipped.append(stage.name)
+        return scores, skipped
+
+    def close(self, wait: bool = False):
+        """プールを停止"""
+        for executor in self._executors.values():
+            executor.shutdown(wait=wait, cancel_futures=True)
+        self._executors.clear()
@@ -0,0 +1,136 @@
+"""
+ディベート評価
+LLM不使用の基本的なヒューリスティック評価
+"""
+
+from typing import Dict, List
+
+
+# 構造性の評価に使う接続詞
+STRUCTURE_WORDS = ('しかし', 'したがって', 'なぜなら', 'つまり', 'また')
+
+# 積算値リストの添字
+_NAME, _CONSISTENCY, _CLARITY, _STRUCTURE, _CALMNESS = range(5)
+
+
+class DebateScorer:
+    """
+    ストリーミング評価器
+
+    発言ごとに各ディベーターの素点を積算しておき、
+    scores() では正規化のみを行う（O(ディベーター数)）。
+    途中経過の表示にもそのまま使える。
+    """
+
+    __slots__ = ('_totals', 'entry_count')
+
+    def __init__(self):
+        # author_id: [表示名, 一貫性, 明確さ, 構造性, 冷静さ]
+        self._totals: Dict[int, List] = {}
+        self.entry_count = 0
+
+    def add_entry(self, author_id: int, author_name: str, content: str):
+        """発言1件分の素点を加算"""
+        totals = self._totals.get(author_id)
+        if totals is None:
+            totals = self._totals[author_id] = [author_name, 0, 0, 0, 0]
+        self.entry_count += 1
+
+        # 論点の一貫性（文字数で簡易評価）
+        if len(content) > 50:
+            totals[_CONSISTENCY] += 2
+
+        # 主張の明確さ（句点の数で評価）
+        totals[_CLARITY] += min(content.count('。'), 5)
+
+        # 構造性（接続詞の使用）
+        for word in STRUCTURE_WORDS:
+            if word in content:
+                totals[_STRUCTURE] += 1
+
+        # 感情的表現の少なさ（感嘆符の少なさ）
+        exclamation_count = content.count('!') + content.count('!')
+        totals[_CALMNESS] += max(10 - exclamation_count * 2, 0)
+
+    def to_state(self) -> List:
+        """永続化用の状態 [発言数, [[author_id, 表示名, 一貫性, 明確さ, 構造性, 冷静さ], ...]]"""
+        return [
+            self.entry_count,
+            [[author_id] + totals for author_id, totals in self._totals.items()]
+        ]
+
+    @classmethod
+    def from_state(cls, state: List) -> 'DebateScorer':
+        """to_state() の状態から復元"""
+        scorer = cls()
+        scorer.entry_count = state[0]
+        for row in state[1]:
+            scorer._totals[row[0]] = row[1:]
+        return scorer
+
+    def scores(self) -> Dict:
+        """
+        各項目を0-10に正規化した評価結果を返す
+        積算値は変更しないため、何度でも呼び出せる
+        """
+        author_ids = list(self._totals)
+        rows = [self._totals[author_id] for author_id in author_ids]
+
+        consistencies = _normalize_relative([row[_CONSISTENCY] for row in rows])
+        clarities = _normalize_relative([row[_CLARITY] for row in rows])
+        structures = _normalize_relative([row[_STRUCTURE] for row in rows])
+
+        scores = {}
+        for i, author_id in enumerate(author_ids):
+            consistency = consistencies[i]
+            clarity = clarities[i]
+            structure = structures[i]
+            calmness = min(10, rows[i][_CALMNESS] / self.entry_count * 2)
+
+            scores[author_id] = {
+                'name': rows[i][_NAME],
+                'consistency': consistency,
+                'clarity': clarity,
+                'structure': structure,
+                'calmness': calmness,
+                # 合計スコア
+                'total': consistency + clarity + structure + calmness
+            }
+
+        return scores
+
+
+def _normalize_relative(values: List) -> List:
+    """
+    最大値を10として正規化
+
+    従来の実装はディベーターを順に正規化しながら毎回最大値を取り直しており、
+    i番目の最大値は「正規化済みの0〜i-1番目」と「未正規化のi番目以降」から求まる。
+    同じ結果を接頭辞・接尾辞の最大値でO(n)で再現する。
+    """
+    count = len(values)
+    suffix_max = list(values)
+    for i in range(count - 2, -1, -1):
+        suffix_max[i] = max(suffix_max[i], suffix_max[i + 1])
+
+    result = []
+    prefix_max = None
+    for i, value in enumerate(values):
+        current_max = suffix_max[i] if prefix_max is None else max(prefix_max, suffix_max[i])
+        if current_max > 0:
+            value = min(10, (value / current_max) * 10)
+        result.append(value)
+        prefix_max = value if prefix_max is None else max(prefix_max, value)
+
+    return result
+
+
+def evaluate_debate(log: List[Dict]) -> Dict:
+    """
+    ディベート評価関数
+    LLM不使用の基本的なヒューリスティック評価
+    """
+    scorer = DebateScorer()
+    for entry in log:
+        scorer.add_entry(entry['author_id'], entry['author_name'], entry['content'])
+    return scorer.scores()
@@ -0,0 +1,368 @@
+"""
+セッション永続化
+SQLite（WALモード）にセッションのイベントを追記し、定期的にスナップショットを取る。
+再起動時はスナップショットにそれ以降のイベントを適用してセッション状態を復元する。
+イベントの書き込みは専用スレッドで行い、イベントループではディスクI/Oを待たない。
+複数プロセスでシャードを分担する場合も同じデータベースを共有し、各プロセスは
+自分のシャードに属するサーバーのセッションだけを読み書きする。
+"""
+
+import gc
+import json
+import os
+import queue
+import sqlite3
+import threading
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+# イベント種別
+EVENT_CREATE = 'create'
+EVENT_MESSAGE = 'message'
+EVENT_DEADLINE = 'deadline'
+EVENT_JOIN = 'join'
+EVENT_START = 'start'
+EVENT_TURN = 'turn'
+EVENT_VIOLATION = 'violation'
+EVENT_FORFEIT = 'forfeit'
+EVENT_END = 'end'
+
+# 書き込みスレッドが1トランザクションでまとめる最大件数
+WRITE_BATCH_SIZE = 500
+
+# 書き込みスレッドの停止を指示する値
+_STOP = object()
+
+_INSERT_EVENT = 'INSERT INTO events (channel_id, kind, payload, guild_id) VALUES (?, ?, ?, ?)'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    channel_id INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    guild_id INTEGER
+);
+CREATE TABLE IF NOT EXISTS snapshots (
+    channel_id INTEGER PRIMARY KEY,
+    seq INTEGER NOT NULL,
+    state TEXT NOT NULL,
+    guild_id INTEGER
+);
+"""
+
+# guild_id列のない旧形式のデータベースを移行
+_MIGRATION = """
+ALTER TABLE events ADD COLUMN guild_id INTEGER;
+ALTER TABLE snapshots ADD COLUMN guild_id INTEGER;
+UPDATE snapshots SET guild_id = json_extract(state, '$.g');
+UPDATE events SET guild_id = json_extract(payload, '$.g') WHERE kind = 'create';
+UPDATE events SET guild_id = COALESCE(
+    (SELECT s.guild_id FROM snapshots s WHERE s.channel_id = events.channel_id),
+    (SELECT e.guild_id FROM events e
+     WHERE e.channel_id = events.channel_id AND e.kind = 'create' AND e.seq < events.seq
+     ORDER BY e.seq DESC LIMIT 1)
+) WHERE guild_id IS NULL;
+"""
+
+
+@contextmanager
+def paused_gc():
+    """
+    循環GCを一時停止
+    復元時は大量のコンテナを一度に生成するため、世代別GCの走査が支配的になる
+    """
+    was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if was_enabled:
+            gc.enable()
+
+
+def _dumps(data) -> str:
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+
+
+def new_state(
+    channel_id: int,
+    guild_id: Optional[int],
+    recruit_time: int,
+    message_limit: int,
+    max_chars: int,
+    recruit_deadline: float,
+    recruit_message_id: Optional[int] = None
+) -> Dict:
+    """
+    セッション状態（辞書形式）を作成
+
+    キー:
+        c/g: チャンネルID/ギルドID
+        rt/ml/mc: 募集時間/発言制限/最大文字数
+        dl/m: 募集締切（UNIX時刻）/募集メッセージID
+        p/d: 参加者/ディベーター（[user_id, 表示名] のリスト）
+        t/ct: 議題/現在のターン
+        log: 発言（[user_id, 表示名, 本文, ターン, UNIX時刻] のリスト）
+        sc: 評価の積算値（DebateScorer.to_state()、logの先頭から積算済みの分のみ）
+        v: 違反回数（{user_id: 回数}）
+        ff: 持ち時間切れでパスになったターン数（{user_id: 回数}）
+        act/rec: 進行中/募集中
+    """
+    return {
+        'c': channel_id,
+        'g': guild_id,
+        'rt': recruit_time,
+        'ml': message_limit,
+        'mc': max_chars,
+        'dl': recruit_deadline,
+        'm': recruit_message_id,
+        'p': [],
+        'd': [],
+        't': '',
+        'ct': 0,
+        'log': [],
+        'sc': None,
+        'v': {},
+        'ff': {},
+        'act': False,
+        'rec': True,
+    }
+
+
+def apply_event(states: Dict[int, Dict], channel_id: int, kind: str, payload: Dict):
+    """イベントをセッション状態に適用"""
+    if kind == EVENT_CREATE:
+        states[channel_id] = payload
+        return
+
+    state = states.get(channel_id)
+    if state is None:
+        return
+
+    if kind == EVENT_MESSAGE:
+        state['m'] = payload['m']
+    elif kind == EVENT_DEADLINE:
+        state['dl'] = payload['dl']
+    elif kind == EVENT_JOIN:
+        state['p'].append(payload['u'])
+    elif kind == EVENT_START:
+        state['d'] = payload['d']
+        state['t'] = payload['t']
+        state['act'] = True
+        state['rec'] = False
+    elif kind == EVENT_TURN:
+        state['log'].append(payload['e'])
+        state['ct'] = payload['ct']
+    elif kind == EVENT_VIOLATION:
+        user_id = str(payload['u'])
+        state['v'][user_id] = state['v'].get(user_id, 0) + 1
+    elif kind == EVENT_FORFEIT:
+        user_id = str(payload['u'])
+        forfeits = state.setdefault('ff', {})
+        forfeits[user_id] = forfeits.get(user_id, 0) + 1
+        state['ct'] = payload['ct']
+    elif kind == EVENT_END:
+        del states[channel_id]
+
+
+class SessionStore:
+    """
+    セッションのイベントログとスナップショットを管理
+
+    record() はイベントをその場でJSONにして書き込み待ちキューに積むだけで、専用スレッドが
+    キューに溜まった分をまとめて1トランザクションでコミットする（WALモード・synchronous=NORMALのため
+    コミットごとのfsyncは発生しない）。コミット済みのイベントはプロセスが落ちても失われないが、
+    キューに残っていた分（通常は数ミリ秒分）は失われる。close() はキューを書き切ってから閉じる。
+
+    shard_ids/shard_countを指定すると、そのシャードに属するサーバーのセッションだけを
+    復元・スナップショット・削除の対象にする（他のプロセスの行には触れない）。
+    """
+
+    def __init__(self, path: str, shard_ids: Optional[List[int]] = None, shard_count: Optional[int] = None):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.path = path
+        self.shard_ids = shard_ids
+        self.shard_count = shard_count
+        self._guilds: Dict[int, Optional[int]] = {}  # channel_id: guild_id
+        self._conn = self._connect()
+        self._conn.executescript(_SCHEMA)
+        self._migrate()
+        # 書き込みスレッドがコミットした最後のイベント番号
+        self.last_seq: int = self._conn.execute(
+            'SELECT COALESCE(MAX(seq), 0) FROM events'
+        ).fetchone()[0]
+        self._queue: queue.Queue = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, name='session-store-writer', daemon=True)
+        self._writer.start()
+
+    def _migrate(self):
+        columns = [row[1] for row in self._conn.execute('PRAGMA table_info(events)')]
+        if 'guild_id' in columns:
+            return
+        with self._conn:
+            self._conn.execute('BEGIN IMMEDIATE')
+            # 別プロセスが先に移行した場合は何もしない
+            columns = [row[1] for row in self._conn.execute('PRAGMA table_info(events)')]
+            if 'guild_id' not in columns:
+                for statement in _MIGRATION.strip().split(';\n'):
+                    self._conn.execute(statement)
+
+    def _shard_filter(self) -> Tuple[str, Tuple]:
+        """担当シャードに属する行を選ぶWHERE句と引数"""
+        if self.shard_ids is None or self.shard_count is None:
+            return '1', ()
+        placeholders = ', '.join('?' * len(self.shard_ids))
+        return (
+            f'((COALESCE(guild_id, 0) >> 22) % ?) IN ({placeholders})',
+            (self.shard_count, *self.shard_ids)
+        )
+
+    def _guild_for(self, channel_id: int, kind: str, payload: Dict) -> Optional[int]:
+        if kind == EVENT_CREATE:
+            self._guilds[channel_id] = payload['g']
+            return payload['g']
+        if kind == EVENT_END:
+            return self._guilds.pop(channel_id, None)
+        return self._guilds.get(channel_id)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, isolation_level=None, timeout=30)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    def close(self):
+        """書き込み待ちのイベントをすべて書き込んでから閉じる（ブロックする）"""
+        self._queue.put(_STOP)
+        self._writer.join()
+        self._conn.close()
+
+    def record(self, channel_id: int, kind: str, payload: Dict):
+        """イベントを書き込み待ちキューに追加"""
+        self._queue.put((channel_id, kind, _dumps(payload), self._guild_for(channel_id, kind, payload)))
+
+    def record_many(self, events: Iterable[Tuple[int, str, Dict]]):
+        """複数のイベントを書き込み待ちキューに追加"""
+        for channel_id, kind, payload in events:
+            self.record(channel_id, kind, payload)
+
+    def flush(self) -> Future:
+        """
+        ここまでに追加したイベントの書き込み完了を待つFuture
+        結果は書き込み完了時点の最後のイベント番号（以降に追加したイベントは含まない）
+        """
+        future: Future = Future()
+        self._queue.put(future)
+        return future
+
+    def _write_loop(self):
+        conn = self._connect()
+        try:
+            while True:
+                rows, marker = self._next_batch()
+                if rows:
+                    self._write_rows(conn, rows)
+                if marker is _STOP:
+                    return
+                if marker is not None:
+                    marker.set_result(self.last_seq)
+        finally:
+            conn.close()
+
+    def _next_batch(self):
+        """書き込み待ちのイベントと、その直後のflush()のFutureまたは停止指示（なければNone）"""
+        rows: List[Tuple] = []
+        while len(rows) < WRITE_BATCH_SIZE:
+            try:
+                item = self._queue.get(block=not rows)
+            except queue.Empty:
+                break
+            if not isinstance(item, tuple):
+                return rows, item
+            rows.append(item)
+        return rows, None
+
+    def _write_rows(self, conn: sqlite3.Connection, rows: List[Tuple]):
+        try:
+            with conn:
+                conn.execute('BEGIN')
+                conn.executemany(_INSERT_EVENT, rows)
+                self.last_seq = conn.execute('SELECT last_insert_rowid()').fetchone()[0]
+        except Exception as e:
+            # 書き込みスレッドは止めない（以降のイベントは書き込む）
+            print(f"⚠️ セッションのイベント{len(rows)}件を保存できませんでした: {e}")
+
+    def snapshot(self, states: Dict[int, Dict], flushed: Future, changed: Optional[Iterable[int]] = None):
+        """
+        セッションのスナップショットを保存し、取り込み済みのイベントを削除
+
+        flushedはstatesを取得する直前（イベントを追加しないうち）に呼び出したflush()の結果であること。
+        flushedまでのイベントを削除する。
+        changedを省略した場合、statesは担当シャードのすべてのセッション状態で、スナップショットを置き換える。
+        changedを指定した場合は、そのチャンネルのスナップショットだけを置き換える（statesはchangedのうち
+        進行中のセッションの状態で、含まれないチャンネルは終了したものとして削除する）。changedには
+        前回のスナップショット以降にイベントを記録したすべてのチャンネルを含めること。
+        専用の接続を使うため、イベントループ外のスレッドから呼び出す。
+        書き込みロックを保持する時間を短くするため、状態のJSON化はトランザクションの前に行う。
+        """
+        rows = [(channel_id, _dumps(state), state['g']) for channel_id, state in states.items()]
+        upto_seq = flushed.result()
+        where, params = self._shard_filter()
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute('BEGIN IMMEDIATE')
+                if changed is None:
+                    conn.execute(f'DELETE FROM snapshots WHERE {where}', params)
+                else:
+                    conn.executemany(
+                        'DELETE FROM snapshots WHERE channel_id = ?',
+                        ((channel_id,) for channel_id in changed)
+                    )
+                conn.executemany(
+                    'INSERT INTO snapshots (channel_id, seq, state, guild_id) VALUES (?, ?, ?, ?)',
+                    ((channel_id, upto_seq, state, guild_id) for channel_id, state, guild_id in rows)
+                )
+                conn.execute(f'DELETE FROM events WHERE seq <= ? AND {where}', (upto_seq, *params))
+        finally:
+            conn.close()
+
+    def recover(self) -> Dict[int, Dict]:
+        """スナップショットとイベントログからセッション状態を復元"""
+        with paused_gc():
+            return self._recover()
+
+    def _recover(self) -> Dict[int, Dict]:
+        where, params = self._shard_filter()
+        states: Dict[int, Dict] = {}
+        # シャードの割り当てが変わった場合、スナップショットの取得時点はチャンネルごとに異なりうる
+        snapshot_seqs: Dict[int, int] = {}
+        for channel_id, seq, state in self._conn.execute(
+            f'SELECT channel_id, seq, state FROM snapshots WHERE {where}', params
+        ):
+            states[channel_id] = json.loads(state)
+            snapshot_seqs[channel_id] = seq
+
+        # スナップショット済みのイベントは削除されているため、残っているイベントはすべて読む
+        loads = json.loads
+        for seq, channel_id, kind, payload in self._conn.execute(
+            f'SELECT seq, channel_id, kind, payload FROM events WHERE {where} ORDER BY seq', params
+        ):
+            if seq <= snapshot_seqs.get(channel_id, 0):
+                continue
+            apply_event(states, channel_id, kind, loads(payload))
+
+        self._guilds = {channel_id: state['g'] for channel_id, state in states.items()}
+        return states
+
+    def pending_events(self) -> int:
+        """スナップショットに取り込まれていないイベント数（担当シャード分）"""
+        where, params = self._shard_filter()
+        return self._conn.execute(f'SELECT COUNT(*) FROM events WHERE {where}', params).fetchone()[0]
+
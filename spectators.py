@@ -0,0 +1,87 @@
+"""
+観戦者のリアクション集計
+進行中のディベートで受理した発言へのリアクションをセッションごとのカウンターに積算する。
+リアクション1件ごとには送信・編集を行わず、スコアボードの更新は呼び出し側が間引いて行う。
+集計結果は表示とアーカイブにのみ使い、勝敗・評価には影響させない。
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+
+class ReactionTally:
+    """
+    1セッション分のリアクションの集計
+
+    絵文字ごとの件数に加え、発言へのリアクションを発言者への応援として数える。
+    集計の対象は track() で登録した発言のみで、呼び出し側で判定する（ディベーター2名の発言数が上限のため小さい）。
+    """
+
+    __slots__ = (
+        'emoji_counts',
+        'cheers',
+        'message_authors',
+        'total',
+        'scoreboard_message_id',
+        'posting',
+        '_version',
+        '_rendered_version',
+    )
+
+    def __init__(self):
+        self.emoji_counts: Dict[str, int] = {}      # 絵文字: 件数
+        self.cheers: Dict[int, int] = {}            # user_id: 発言へのリアクション数
+        self.message_authors: Dict[int, int] = {}   # message_id: 発言者のuser_id
+        self.total = 0
+        self.scoreboard_message_id: Optional[int] = None
+        self.posting = False  # スコアボードの初回送信中
+        self._version = 0
+        self._rendered_version = 0
+
+    @property
+    def dirty(self) -> bool:
+        """前回のスコアボード更新以降に変化があったか"""
+        return self._version != self._rendered_version
+
+    def track(self, message_id: int, author_id: int):
+        """ディベーターの発言を登録"""
+        self.message_authors[message_id] = author_id
+
+    def add(self, message_id: int, emoji: str):
+        """リアクションの追加を記録"""
+        self.emoji_counts[emoji] = self.emoji_counts.get(emoji, 0) + 1
+        author_id = self.message_authors.get(message_id)
+        if author_id is not None:
+            self.cheers[author_id] = self.cheers.get(author_id, 0) + 1
+        self.total += 1
+        self._version += 1
+
+    def remove(self, message_id: int, emoji: str):
+        """リアクションの取り消しを記録（集計開始前のリアクションは無視）"""
+        count = self.emoji_counts.get(emoji, 0)
+        if count == 0:
+            return
+        if count == 1:
+            del self.emoji_counts[emoji]
+        else:
+            self.emoji_counts[emoji] = count - 1
+        author_id = self.message_authors.get(message_id)
+        if self.cheers.get(author_id, 0) > 0:
+            self.cheers[author_id] -= 1
+        self.total -= 1
+        self._version += 1
+
+    def mark_rendered(self):
+        """現在の集計をスコアボードに反映した"""
+        self._rendered_version = self._version
+
+    def top_emojis(self, limit: int = 10) -> List[Tuple[str, int]]:
+        """件数の多い絵文字"""
+        return sorted(self.emoji_counts.items(), key=lambda item: item[1], reverse=True)[:limit]
+
+    def to_record(self) -> Dict:
+        """アーカイブ用の集計結果"""
+        return {
+            'total': self.total,
+            'emojis': dict(self.emoji_counts),
+            'cheers': dict(self.cheers),
+        }
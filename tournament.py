@@ -0,0 +1,223 @@
+"""
+トーナメント
+参加者からシングルエリミネーションのブラケットを作り、対戦カードが決まった試合から順に
+チャンネル（またはスレッド）へ割り当てる。試合の終了は呼び出し側が finish() で通知するため、
+試合ごとに状態を監視するタスクは持たない。
+"""
+
+import random
+from collections import deque
+from typing import Deque, Dict, List, Optional
+
+
+class Match:
+    """ブラケットの1試合"""
+
+    __slots__ = ('round', 'index', 'players', 'winner', 'channel_id', 'totals', 'reason')
+
+    def __init__(self, round_number: int, index: int):
+        self.round = round_number   # 0始まりのラウンド
+        self.index = index          # ラウンド内の位置
+        self.players: List = [None, None]
+        self.winner = None
+        self.channel_id: Optional[int] = None
+        self.totals: Dict[int, float] = {}  # user_id: 合計スコア
+        self.reason: Optional[str] = None   # 'completed' / 'violation' / 'stopped' / 'bye'
+
+    @property
+    def is_ready(self) -> bool:
+        return self.winner is None and self.players[0] is not None and self.players[1] is not None
+
+
+class Bracket:
+    """
+    シングルエリミネーションのブラケット
+
+    参加者をシャッフルして2のべき乗の枠に並べ、足りない枠は不戦勝にする。
+    1回戦の各試合には少なくとも1名が入るため、不戦勝同士の試合は発生しない。
+    """
+
+    def __init__(self, players: List, rng: Optional[random.Random] = None):
+        if len(players) < 2:
+            raise ValueError("トーナメントには2名以上の参加者が必要です")
+        players = list(players)
+        (rng or random).shuffle(players)
+
+        size = 1
+        while size < len(players):
+            size *= 2
+        self.rounds: List[List[Match]] = []
+        count = size // 2
+        round_number = 0
+        while count >= 1:
+            self.rounds.append([Match(round_number, index) for index in range(count)])
+            count //= 2
+            round_number += 1
+
+        half = size // 2
+        self._initially_ready: List[Match] = []
+        for index, match in enumerate(self.rounds[0]):
+            match.players[0] = players[index]
+            match.players[1] = players[index + half] if index + half < len(players) else None
+        for match in self.rounds[0]:
+            if match.players[1] is None:
+                match.reason = 'bye'
+                self._decide(match, match.players[0])
+            elif match.is_ready:
+                self._initially_ready.append(match)
+
+    @property
+    def round_count(self) -> int:
+        return len(self.rounds)
+
+    @property
+    def champion(self):
+        return self.rounds[-1][0].winner
+
+    def initial_matches(self) -> List[Match]:
+        """対戦カードが決まっている最初の試合（不戦勝の結果も反映済み）"""
+        return [match for match in self._initially_ready if match.is_ready]
+
+    def report(self, match: Match, winner) -> Optional[Match]:
+        """試合結果を記録し、次の試合の対戦カードが揃えばその試合を返す"""
+        if match.winner is not None:
+            raise ValueError("結果が記録済みの試合です")
+        return self._decide(match, winner)
+
+    def _decide(self, match: Match, winner) -> Optional[Match]:
+        match.winner = winner
+        if match.round + 1 >= len(self.rounds):
+            return None
+        following = self.rounds[match.round + 1][match.index // 2]
+        following.players[match.index % 2] = winner
+        if following.is_ready:
+            if match.round == 0 and match.reason == 'bye':
+                # ブラケットの構築中（不戦勝同士が2回戦で当たる場合）
+                self._initially_ready.append(following)
+            return following
+        return None
+
+
+class Tournament:
+    """
+    トーナメントの進行状態
+
+    対戦カードが決まった試合を待ち行列に積み、同時進行数の上限（max_parallel）と
+    空きチャンネルの範囲で割り当てる。チャンネルを指定しない場合（channel_ids=None）は
+    呼び出し側が試合ごとにスレッドを作成する。
+    """
+
+    def __init__(
+        self,
+        hub_channel,
+        guild_id: Optional[int],
+        recruit_time: int,
+        message_limit: int,
+        max_chars: int,
+        max_parallel: int,
+        channel_ids: Optional[List[int]] = None
+    ):
+        self.hub_channel = hub_channel
+        self.guild_id = guild_id
+        self.recruit_time = recruit_time
+        self.message_limit = message_limit
+        self.max_chars = max_chars
+        self.max_parallel = max_parallel
+        self.participants: Dict = {}  # user_id: 参加者（登録順）
+        self.bracket: Optional[Bracket] = None
+        self.recruit_message_id: Optional[int] = None
+        self.cancelled = False
+        self.start_failures = 0  # 試合の開始に続けて失敗した回数
+        self.running: Dict[int, Match] = {}  # channel_id: 進行中の試合
+        self._pending: Deque[Match] = deque()
+        self._starting = 0  # 割り当て済みでチャンネルの準備中の試合数
+        self._free_channels: Optional[Deque[int]] = deque(channel_ids) if channel_ids is not None else None
+
+    @property
+    def is_started(self) -> bool:
+        return self.bracket is not None
+
+    @property
+    def is_finished(self) -> bool:
+        return self.bracket is not None and self.bracket.champion is not None
+
+    @property
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    def add_participant(self, member) -> bool:
+        if self.is_started or member.id in self.participants:
+            return False
+        self.participants[member.id] = member
+        return True
+
+    def begin(self, rng: Optional[random.Random] = None) -> Bracket:
+        """参加者からブラケットを作成"""
+        self.bracket = Bracket(list(self.participants.values()), rng)
+        self._pending.extend(self.bracket.initial_matches())
+        return self.bracket
+
+    def take_matches(self, is_busy=lambda channel_id: False) -> List[Match]:
+        """
+        開始できる試合を割り当てる（チャンネル指定時は match.channel_id も設定）
+        is_busy はチャンネルが他のセッションで使用中かを返す関数
+        """
+        taken = []
+        while self._pending and len(self.running) + self._starting < self.max_parallel and not self.cancelled:
+            if self._free_channels is not None:
+                channel_id = self._acquire_channel(is_busy)
+                if channel_id is None:
+                    break
+                self._pending[0].channel_id = channel_id
+            taken.append(self._pending.popleft())
+            self._starting += 1
+        return taken
+
+    def _acquire_channel(self, is_busy) -> Optional[int]:
+        for _ in range(len(self._free_channels)):
+            channel_id = self._free_channels.popleft()
+            if not is_busy(channel_id):
+                return channel_id
+            self._free_channels.append(channel_id)
+        return None
+
+    def started(self, match: Match, channel_id: int):
+        """試合のチャンネルの準備が完了した"""
+        self._starting -= 1
+        match.channel_id = channel_id
+        self.running[channel_id] = match
+
+    def start_failed(self, match: Match):
+        """チャンネルの準備に失敗した試合を待ち行列に戻す"""
+        self._starting -= 1
+        if self._free_channels is not None and match.channel_id is not None:
+            self._free_channels.append(match.channel_id)
+        match.channel_id = None
+        self._pending.appendleft(match)
+
+    def finish(self, channel_id: int, winner, totals: Dict[int, float], reason: str) -> Optional[Match]:
+        """試合の終了を記録し、対戦カードが揃った次の試合があれば返す"""
+        match = self.running.pop(channel_id)
+        match.totals = totals
+        match.reason = reason
+        if self._free_channels is not None:
+            self._free_channels.append(channel_id)
+        following = self.bracket.report(match, winner)
+        if following is not None:
+            self._pending.append(following)
+        return following
+
+
+def decide_winner(match: Match, totals: Dict[int, float], violations: Dict[int, int]):
+    """
+    合計スコアの高い方を勝者とする
+    同点の場合は違反の少ない方、それも同じ場合はブラケットの上側（players[0]）
+    """
+    return max(
+        match.players,
+        key=lambda player: (
+            totals.get(player.id, 0),
+            -violations.get(player.id, 0),
+            player is match.players[0]
+        )
+    )
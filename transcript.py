@@ -0,0 +1,122 @@
+"""
+ディベートの発言記録
+発言者インデックス・ターン・時刻を配列で、本文を1本のリストで保持する列指向ストア
+"""
+
+import sys
+import time
+from array import array
+from datetime import datetime
+from typing import Dict, List, Optional
+
+
+class Transcript:
+    """
+    列指向の発言記録
+
+    発言者のID・表示名・発言回数は発言者ごとに1回だけ登録（表示名はintern）し、
+    各発言は発言者インデックス・ターン・UNIX時刻の配列と本文リストに追記する。
+    辞書形式の発言データは評価やエクスポートの際に必要な分だけ生成する。
+    """
+
+    __slots__ = (
+        'author_ids',
+        'author_names',
+        'author_counts',
+        'authors',
+        'turns',
+        'timestamps',
+        'contents',
+    )
+
+    def __init__(self):
+        self.author_ids: List[int] = []
+        self.author_names: List[str] = []
+        self.author_counts = array('I')  # 発言者ごとの発言回数
+
+        self.authors = array('H')      # 発言者インデックス
+        self.turns = array('I')        # ターン番号
+        self.timestamps = array('d')   # UNIX時刻
+        self.contents: List[str] = []  # 本文
+
+    def __len__(self) -> int:
+        return len(self.contents)
+
+    def author_slot(self, author_id: int, author_name: str) -> int:
+        """発言者を登録してインデックスを返す（登録済みならそのまま返す）"""
+        # 発言者はディベーター2名のみのため線形探索で十分
+        author_ids = self.author_ids
+        for index in range(len(author_ids)):
+            if author_ids[index] == author_id:
+                return index
+        self.author_ids.append(author_id)
+        self.author_names.append(sys.intern(author_name))
+        self.author_counts.append(0)
+        return len(author_ids) - 1
+
+    def count_for(self, author_id: int) -> int:
+        """発言者の発言回数を取得"""
+        author_ids = self.author_ids
+        for index in range(len(author_ids)):
+            if author_ids[index] == author_id:
+                return self.author_counts[index]
+        return 0
+
+    def append(
+        self,
+        author_id: int,
+        author_name: str,
+        content: str,
+        turn: int,
+        timestamp: Optional[float] = None
+    ):
+        """発言を追記"""
+        author = self.author_slot(author_id, author_name)
+        self.author_counts[author] += 1
+        self.authors.append(author)
+        self.turns.append(turn)
+        self.timestamps.append(time.time() if timestamp is None else timestamp)
+        self.contents.append(content)
+
+    @classmethod
+    def from_rows(cls, rows: List[List]) -> 'Transcript':
+        """rows() 形式のリストから一括で復元"""
+        transcript = cls()
+        authors = [transcript.author_slot(row[0], row[1]) for row in rows]
+        for author in authors:
+            transcript.author_counts[author] += 1
+        transcript.authors.extend(authors)
+        transcript.turns.extend([row[3] for row in rows])
+        transcript.timestamps.extend([row[4] for row in rows])
+        transcript.contents.extend([row[2] for row in rows])
+        return transcript
+
+    def row(self, index: int) -> List:
+        """index番目の発言を [user_id, 表示名, 本文, ターン, UNIX時刻] で取得"""
+        author = self.authors[index]
+        return [
+            self.author_ids[author],
+            self.author_names[author],
+            self.contents[index],
+            self.turns[index],
+            self.timestamps[index],
+        ]
+
+    def rows(self) -> List[List]:
+        """全発言を row() 形式のリストで取得"""
+        return [self.row(i) for i in range(len(self.contents))]
+
+    def entry(self, index: int) -> Dict:
+        """index番目の発言を辞書形式で取得"""
+        author = self.authors[index]
+        return {
+            'author_id': self.author_ids[author],
+            'author_name': self.author_names[author],
+            'content': self.contents[index],
+            'timestamp': datetime.fromtimestamp(self.timestamps[index]).isoformat(),
+            'turn': self.turns[index]
+        }
+
+    def entries(self) -> List[Dict]:
+        """全発言を辞書形式のリストで取得"""
+        return [self.entry(i) for i in range(len(self.contents))]
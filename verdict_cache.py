@@ -0,0 +1,99 @@
+"""
+禁止コンテンツ判定のキャッシュ
+正規化後の本文とルールセットのバージョンから作ったハッシュをキーに、判定結果を上限付きのLRUで保持する。
+ほぼ同じ反論の再送や編集された発言の再チェックでは、オートマトンと正規表現の走査を省略する。
+禁止ワード・人称攻撃パターンが変わるとキーも変わるため、古い判定は参照されずに追い出される。
+
+判定の処理時間の大半は正規化（NFKC）が占めるため、まず受け取った本文のままのハッシュで引き、
+本文がそのまま同じ再送や本文の変わらない編集イベントでは正規化も省略する。
+"""
+
+import hashlib
+from collections import OrderedDict
+from typing import Optional
+
+from metrics import REGISTRY
+from moderation import ModerationEngine, ModerationHit, normalize_width
+
+
+lookups = REGISTRY.counter('debate_moderation_cache_total', '禁止コンテンツ判定キャッシュの参照数', ['result'])
+_hit_counter = lookups.labels('hit')
+_miss_counter = lookups.labels('miss')
+
+# 判定が「違反なし」だったことを表す値（Noneはキャッシュにないことを表す）
+_CLEAN = False
+
+class VerdictCache:
+    """
+    禁止コンテンツ判定のLRUキャッシュ
+
+    キーは本文の blake2b（ルールセットのバージョンを鍵とする16バイトのダイジェスト）で、本文そのものは
+    保持しない。判定は normalize_width()（NFKC）後の本文のキー1つで登録し、全角・半角の違いだけの発言は
+    このキーで一致する。正規化で変わる本文（全角英数字・半角カナなど）は、正規化後のキーで一致したときに
+    限り元の本文のキーも追加する（その本文の次の再送から正規化を省略する）。
+    正規化済みの本文（多くの発言）は1判定1キーのため、maxsize はほぼそのまま保持できる判定の件数になる。
+    maxsize（キーの件数）が0以下の場合はキャッシュせずに毎回判定する。
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._verdicts: 'OrderedDict[bytes, object]' = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._verdicts)
+
+    @property
+    def hit_ratio(self) -> float:
+        """これまでの参照のうちキャッシュから返した割合"""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def find(self, engine: ModerationEngine, text: str) -> Optional[ModerationHit]:
+        """engine.find(text) と同じ結果を返す（キャッシュにあれば走査しない）"""
+        if self.maxsize <= 0:
+            return engine.find(text)
+
+        raw_key = self._key(engine, text)
+        verdict = self._get(raw_key)
+        if verdict is None:
+            normalized = normalize_width(text)
+            if normalized is text:
+                # 正規化済みの本文は正規化後のキーも同じ
+                key = raw_key
+            else:
+                key = self._key(engine, normalized)
+                verdict = self._get(key)
+            if verdict is None:
+                self.misses += 1
+                _miss_counter.inc()
+                hit = engine.find_normalized(normalized)
+                self._put(key, hit if hit is not None else _CLEAN)
+                return hit
+            self._put(raw_key, verdict)
+
+        self.hits += 1
+        _hit_counter.inc()
+        return verdict or None
+
+    @staticmethod
+    def _key(engine: ModerationEngine, text: str) -> bytes:
+        # 正規化済みの本文では正規化前後のキーが一致するため、両者を区別しない
+        return hashlib.blake2b(text.encode('utf-8'), digest_size=16, key=engine.ruleset_version).digest()
+
+    def _get(self, key: bytes):
+        verdict = self._verdicts.get(key)
+        if verdict is not None:
+            self._verdicts.move_to_end(key)
+        return verdict
+
+    def _put(self, key: bytes, verdict):
+        verdicts = self._verdicts
+        verdicts[key] = verdict
+        if len(verdicts) > self.maxsize:
+            verdicts.popitem(last=False)
+
+    def clear(self):
+        """すべての判定を破棄"""
+        self._verdicts.clear()